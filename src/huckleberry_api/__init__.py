@@ -2,6 +2,11 @@
 from __future__ import annotations
 
 from .api import HuckleberryAPI
+from .async_api import AsyncHuckleberryAPI
+from .history_import import read_history_csv, read_history_jsonl
+from .interval_store import SQLiteIntervalStore
+from .listener_dispatcher import ListenerDispatcher
+from .token_store import FileTokenStore, TokenStore
 from .types import (
     ChildData,
     DiaperData,
@@ -9,24 +14,51 @@ from .types import (
     FeedDocumentData,
     FeedIntervalData,
     FeedTimerData,
+    FieldChange,
     GrowthData,
     HealthDocumentData,
+    HistoryImportEntry,
+    HistoryImportResult,
+    IntervalChange,
+    IntervalPage,
+    ListenerDispatcherStats,
+    ListenerRestartResult,
+    ListenerStatus,
     SleepDocumentData,
     SleepIntervalData,
     SleepTimerData,
+    StoredTokens,
+    TokenRefresherStats,
 )
 
 __all__ = [
     "HuckleberryAPI",
+    "AsyncHuckleberryAPI",
+    "FileTokenStore",
+    "ListenerDispatcher",
+    "SQLiteIntervalStore",
+    "TokenStore",
+    "read_history_csv",
+    "read_history_jsonl",
     "ChildData",
     "DiaperData",
     "DiaperDocumentData",
     "FeedDocumentData",
     "FeedIntervalData",
     "FeedTimerData",
+    "FieldChange",
     "GrowthData",
     "HealthDocumentData",
+    "HistoryImportEntry",
+    "HistoryImportResult",
+    "IntervalChange",
+    "IntervalPage",
+    "ListenerDispatcherStats",
+    "ListenerRestartResult",
+    "ListenerStatus",
     "SleepDocumentData",
     "SleepIntervalData",
     "SleepTimerData",
+    "StoredTokens",
+    "TokenRefresherStats",
 ]
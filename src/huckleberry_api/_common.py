@@ -0,0 +1,1758 @@
+"""Helpers and state shared by the sync and async Huckleberry API clients."""
+from __future__ import annotations
+
+import base64
+import copy
+import heapq
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from datetime import datetime, timezone
+from fnmatch import fnmatchcase
+from operator import itemgetter
+from typing import Any, Callable, Iterable, Iterator, Literal, TypeVar, cast
+from zoneinfo import ZoneInfo
+
+from google.auth.credentials import Credentials
+from google.auth.exceptions import RefreshError
+from google.cloud import firestore
+from google.cloud.firestore_v1.field_path import FieldPath
+from google.cloud.firestore_v1.watch import ChangeType
+
+from .listener_dispatcher import ListenerDispatcher
+from .types import (
+    BottleType,
+    ChildData,
+    DiaperDocumentData,
+    FeedDocumentData,
+    FieldChange,
+    FirebaseBottleInterval,
+    FirebaseDiaperInterval,
+    FirebaseFeedDocument,
+    FirebaseGrowthData,
+    FirebaseSleepDocument,
+    GrowthData,
+    HealthDocumentData,
+    HistoryImportEntry,
+    IntervalChange,
+    ListenerStatus,
+    LastBottleData,
+    LastDiaperData,
+    LastNursingData,
+    LastSideData,
+    LastSleepData,
+    SleepDocumentData,
+    StoredTokens,
+    TokenRefresherStats,
+    VolumeUnits,
+)
+
+# Type aliases for known string values
+CollectionName = Literal["sleep", "feed", "health", "diaper"]
+FeedSide = Literal["left", "right"]
+DiaperMode = Literal["pee", "poo", "both", "dry"]
+DiaperAmount = Literal["little", "medium", "big"]
+PooColor = Literal["yellow", "brown", "black", "green", "red", "gray"]
+PooConsistency = Literal["solid", "loose", "runny", "mucousy", "hard", "pebbles", "diarrhea"]
+MeasurementUnits = Literal["metric", "imperial"]
+
+# Union type for all document data types used in listeners
+DocumentData = SleepDocumentData | FeedDocumentData | HealthDocumentData | DiaperDocumentData
+TDocumentData = TypeVar('TDocumentData', SleepDocumentData, FeedDocumentData, HealthDocumentData, DiaperDocumentData)
+T = TypeVar("T")
+
+_LOGGER = logging.getLogger(__name__)
+
+# Interval subcollection per tracker (health is the only one using "data")
+INTERVAL_SUBCOLLECTIONS: dict[CollectionName, str] = {
+    "sleep": "intervals",
+    "feed": "intervals",
+    "diaper": "intervals",
+    "health": "data",
+}
+
+# Fields of childs/{child_id} documents that are mapped into ChildData
+CHILD_DOCUMENT_FIELDS: list[str] = [
+    "name",
+    "childsName",
+    "birthdate",
+    "picture",
+    "gender",
+    "color",
+    "createdAt",
+    "nightStart",
+    "morningCutoff",
+    "naps",
+    "categories",
+]
+
+# Trackers included in get_calendar_events, in result order
+CALENDAR_COLLECTIONS: tuple[CollectionName, ...] = ("sleep", "feed", "diaper", "health")
+
+# Label used in error logs when an interval query fails
+_INTERVAL_LABELS: dict[CollectionName, str] = {
+    "sleep": "sleep intervals",
+    "feed": "feed intervals",
+    "diaper": "diaper intervals",
+    "health": "health entries",
+}
+
+# Fields read from interval documents to build events; other fields are not downloaded
+INTERVAL_EVENT_FIELDS: dict[CollectionName, list[str]] = {
+    "sleep": ["start", "duration"],
+    "feed": ["start", "leftDuration", "rightDuration"],
+    "diaper": ["start", "mode", "pooColor", "pooConsistency", "amount"],
+    "health": ["start", "weight", "height", "head"],
+}
+
+# Optional fields copied into diaper/health events when present
+_OPTIONAL_EVENT_FIELDS: dict[CollectionName, tuple[str, ...]] = {
+    "sleep": (),
+    "feed": (),
+    "diaper": ("pooColor", "pooConsistency", "amount"),
+    "health": ("weight", "height", "head"),
+}
+
+# History entry type -> (tracker collection, prefs field holding the latest entry)
+HISTORY_TRACKERS: dict[str, tuple[CollectionName, str]] = {
+    "diaper": ("diaper", "lastDiaper"),
+    "bottle": ("feed", "lastBottle"),
+    "growth": ("health", "lastGrowthEntry"),
+}
+
+# Attempts per interval write before a bulk import gives up on it
+BULK_WRITE_MAX_ATTEMPTS = 10
+
+# Most document ids in one `in` filter, i.e. children per multiplexed watch stream
+MULTIPLEX_MAX_DOCUMENTS = 30
+
+# Tokens expiring within this many seconds are refreshed before use
+TOKEN_REFRESH_MARGIN = 300
+
+# Shortest wait between background refreshes, even if lead_time exceeds the token lifetime
+MIN_TOKEN_REFRESH_INTERVAL = 60.0
+
+
+def _new_session_uuid() -> str:
+    """Generate a unique session UUID (16 hex characters like the app)."""
+    return uuid.uuid4().hex[:16]
+
+
+def _new_interval_id(now: float) -> str:
+    """Create interval document ID (format: timestamp-random)."""
+    return f"{int(now * 1000)}-{uuid.uuid4().hex[:20]}"
+
+
+def _timezone_offset_minutes(tz: ZoneInfo, at: float | None = None) -> float:
+    """Get offset of a timezone in minutes (now, or at a Unix timestamp), negative for UTC+ timezones."""
+    offset = (datetime.now(tz) if at is None else datetime.fromtimestamp(at, tz)).utcoffset()
+    if offset is None:
+        return 0.0
+    return -offset.total_seconds() / 60
+
+
+def _child_from_document(child_id: str, child_data: dict) -> ChildData:
+    """Map a childs/{child_id} document to ChildData."""
+    # Name may appear as 'childsName' in some documents
+    display_name = child_data.get("name") or child_data.get("childsName") or "Unknown"
+
+    return {
+        "uid": child_id,
+        "name": display_name,
+        "birthday": child_data.get("birthdate"),
+        "picture": child_data.get("picture"),
+        "gender": child_data.get("gender"),
+        "color": child_data.get("color"),
+        "created_at": child_data.get("createdAt"),
+        "night_start_min": child_data.get("nightStart"),
+        "morning_cutoff_min": child_data.get("morningCutoff"),
+        "expected_naps": child_data.get("naps"),
+        "categories": child_data.get("categories"),
+    }
+
+
+def _child_ids_from_user(user_data: dict | None) -> list[str]:
+    """Get child ids from the childList of a users/{uid} document.
+
+    Returns an empty list if the document or any child id is missing.
+    """
+    if user_data is None:
+        _LOGGER.error("User document not found")
+        return []
+
+    if not user_data:
+        _LOGGER.error("User document has no data")
+        return []
+
+    child_list = user_data.get("childList")
+    if not child_list:
+        _LOGGER.error("No childList found in user document")
+        return []
+
+    child_ids = []
+    for child in child_list:
+        child_id = child.get("cid")
+        if not child_id:
+            _LOGGER.warning("Child id not found in childList")
+            return []
+        child_ids.append(child_id)
+    return child_ids
+
+
+def _children_from_snapshots(child_ids: list[str], snapshots: Iterable) -> list[ChildData]:
+    """Map batch-read child snapshots to ChildData in childList order.
+
+    Returns an empty list if any child document is missing or empty.
+    """
+    child_docs = {snapshot.id: snapshot for snapshot in snapshots}
+
+    children = []
+    for child_id in child_ids:
+        child_doc = child_docs.get(child_id)
+        if child_doc is None or not child_doc.exists:
+            _LOGGER.error("Child document not found: %s", child_id)
+            return []
+
+        child_data = child_doc.to_dict()
+        if not child_data:
+            _LOGGER.error("Child document has no data: %s", child_id)
+            return []
+
+        children.append(_child_from_document(child_id, child_data))
+    return children
+
+def _sleep_timer_document(now: float) -> FirebaseSleepDocument:
+    """Build an active sleep timer matching the structure from the Huckleberry app."""
+    return {
+        "timer": {
+            "active": True,
+            "paused": False,
+            "timestamp": {"seconds": now},
+            "local_timestamp": now,
+            "timerStartTime": now * 1000,  # Milliseconds timestamp
+            "uuid": _new_session_uuid(),  # Unique session identifier
+            "details": {
+                "startSleepCondition": {
+                    "happy": False,
+                    "longTimeToFallAsleep": False,
+                    "10-20_minutes": False,
+                    "upset": False,
+                    "under_10_minutes": False,
+                },
+                "sleepLocations": {
+                    "car": False,
+                    "nursing": False,
+                    "wornOrHeld": False,
+                    "stroller": False,
+                    "coSleep": False,
+                    "nextToCarer": False,
+                    "onOwnInBed": False,
+                    "bottle": False,
+                    "swing": False,
+                },
+                "endSleepCondition": {
+                    "happy": False,
+                    "wokeUpChild": False,
+                    "upset": False,
+                },
+            },
+        }
+    }
+
+
+def _feed_timer_document(now: float, side: FeedSide) -> FirebaseFeedDocument:
+    """Build an active feeding timer."""
+    return {
+        "timer": {
+            "active": True,
+            "paused": False,
+            "timestamp": {"seconds": now},
+            "local_timestamp": now,
+            "feedStartTime": now,
+            "timerStartTime": now,
+            "uuid": _new_session_uuid(),
+            "leftDuration": 0.0,
+            "rightDuration": 0.0,
+            "lastSide": "left",  # Always start with lastSide as left
+            "activeSide": side,  # activeSide indicates which side is currently feeding
+        }
+    }
+
+
+def _inactive_timer(session_uuid: str, now: float) -> dict:
+    """Build an inactive timer (don't delete it - app expects it to remain)."""
+    return {
+        "active": False,
+        "paused": False,
+        "timestamp": {"seconds": now},
+        "timerStartTime": None,
+        "uuid": session_uuid,
+        "local_timestamp": now,
+    }
+
+
+def _session_uuid_from(data: dict | None) -> str:
+    """Get session UUID from a timer document, generating one if missing."""
+    timer = (data or {}).get("timer") or {}
+    return timer.get("uuid", _new_session_uuid())
+
+
+def _accumulate_feed_durations(timer: dict, now: float) -> tuple[str, float, float]:
+    """Add time elapsed since timerStartTime to the currently active side.
+
+    Returns:
+        Tuple of (current side, left duration, right duration) in seconds
+    """
+    current_side = timer.get("activeSide", timer.get("lastSide", "left"))
+    elapsed = now - timer.get("timerStartTime", now)
+
+    left_duration = timer.get("leftDuration", 0.0)
+    right_duration = timer.get("rightDuration", 0.0)
+
+    if current_side == "left":
+        left_duration += elapsed
+    else:
+        right_duration += elapsed
+
+    return current_side, left_duration, right_duration
+
+
+def _diaper_interval(
+    now: float,
+    offset: float,
+    mode: DiaperMode,
+    pee_amount: DiaperAmount | None,
+    poo_amount: DiaperAmount | None,
+    color: PooColor | None,
+    consistency: PooConsistency | None,
+    diaper_rash: bool,
+    notes: str | None,
+) -> FirebaseDiaperInterval:
+    """Build diaper interval data (matching app behavior - minimal fields by default)."""
+    interval_data: FirebaseDiaperInterval = {
+        "start": now,
+        "lastUpdated": now,
+        "mode": mode,
+        "offset": offset,
+    }
+
+    # Add quantity field if amounts are specified
+    # App uses: 0.0 = "little", 50.0 = "medium", 100.0 = "big"
+    # Other values are treated as no quantity indicator
+    amount_map = {"little": 0.0, "medium": 50.0, "big": 100.0}
+    quantity = {}
+    if pee_amount and pee_amount in amount_map:
+        quantity["pee"] = amount_map[pee_amount]
+    if poo_amount and poo_amount in amount_map:
+        quantity["poo"] = amount_map[poo_amount]
+    if quantity:
+        interval_data["quantity"] = quantity
+
+    # Add optional fields if provided
+    if color:
+        interval_data["color"] = color
+    if consistency:
+        interval_data["consistency"] = consistency
+    if diaper_rash:
+        interval_data["diaperRash"] = True  # type: ignore # Not in TypedDict yet
+    if notes:
+        interval_data["notes"] = notes  # type: ignore # Not in TypedDict yet
+
+    return interval_data
+
+
+def _growth_entry(
+    interval_id: str,
+    now: float,
+    offset: float,
+    weight: float | None,
+    height: float | None,
+    head: float | None,
+    units: MeasurementUnits,
+) -> FirebaseGrowthData:
+    """Build growth entry matching Huckleberry app structure."""
+    growth_entry: FirebaseGrowthData = {
+        "_id": interval_id,  # type: ignore # _id is not in TypedDict but Firestore accepts it
+        "type": "health",
+        "mode": "growth",
+        "start": now,
+        "lastUpdated": now,
+        "offset": offset,
+        "isNight": False,
+        "multientry_key": None,
+    }
+
+    # Add measurements with proper unit fields (matches app structure)
+    if units == "metric":
+        if weight is not None:
+            growth_entry["weight"] = float(weight)
+            growth_entry["weightUnits"] = "kg"
+        if height is not None:
+            growth_entry["height"] = float(height)
+            growth_entry["heightUnits"] = "cm"
+        if head is not None:
+            growth_entry["head"] = float(head)
+            growth_entry["headUnits"] = "hcm"  # App uses "hcm" for head circumference
+    else:  # imperial
+        if weight is not None:
+            growth_entry["weight"] = float(weight)
+            growth_entry["weightUnits"] = "lbs"
+        if height is not None:
+            growth_entry["height"] = float(height)
+            growth_entry["heightUnits"] = "in"
+        if head is not None:
+            growth_entry["head"] = float(head)
+            growth_entry["headUnits"] = "hin"  # Head in inches
+
+    return growth_entry
+
+
+def _bottle_interval(
+    now: float, offset: float, amount: float, bottle_type: BottleType, units: VolumeUnits
+) -> FirebaseBottleInterval:
+    """Build interval document for bottle feeding."""
+    return {
+        "mode": "bottle",
+        "start": now,
+        "lastUpdated": now,
+        "bottleType": bottle_type,
+        "amount": amount,
+        "units": units,
+        "offset": offset,
+        "end_offset": offset,
+    }
+
+
+def _bottle_prefs(
+    now: float, offset: float, amount: float, bottle_type: BottleType, units: VolumeUnits
+) -> dict:
+    """Build prefs.lastBottle and document-level bottle preferences (merged into feed/{child_uid})."""
+    last_bottle_data: LastBottleData = {
+        "mode": "bottle",
+        "start": now,
+        "bottleType": bottle_type,
+        "bottleAmount": amount,
+        "bottleUnits": units,
+        "offset": offset,
+    }
+    return {
+        "prefs": {
+            "lastBottle": last_bottle_data,
+            "bottleType": bottle_type,  # Update defaults
+            "bottleAmount": amount,
+            "bottleUnits": units,
+            "timestamp": {"seconds": now},
+            "local_timestamp": now,
+        }
+    }
+
+
+def _diaper_prefs_update(now: float, offset: float, mode: DiaperMode) -> dict:
+    """Build the prefs.lastDiaper update."""
+    last_diaper_data: LastDiaperData = {
+        "start": now,
+        "mode": mode,
+        "offset": offset,
+    }
+    return {
+        "prefs.lastDiaper": last_diaper_data,
+        "prefs.timestamp": {"seconds": now},
+        "prefs.local_timestamp": now,
+    }
+
+
+def _growth_prefs_update(now: float, growth_entry: FirebaseGrowthData) -> dict:
+    """Build the prefs.lastGrowthEntry update (matches Huckleberry app structure)."""
+    return {
+        "prefs.lastGrowthEntry": growth_entry,
+        "prefs.timestamp": {"seconds": now},
+        "prefs.local_timestamp": now,
+    }
+
+def _history_interval(entry: HistoryImportEntry, tz: ZoneInfo, now: float) -> tuple[str, str, dict]:
+    """Validate a history import entry and build its interval document.
+
+    Returns:
+        Tuple of (entry type, interval ID, interval data)
+    """
+    entry_type = entry.get("type")
+    start = entry.get("start")
+    if entry_type not in HISTORY_TRACKERS:
+        raise ValueError(f"Unknown history entry type: {entry_type!r}")
+    if isinstance(start, bool) or not isinstance(start, (int, float)):
+        raise ValueError(f"History entry start must be a Unix timestamp: {start!r}")
+
+    offset = entry.get("offset")
+    if offset is None:
+        offset = _timezone_offset_minutes(tz, start)
+    interval_id = _new_interval_id(start)
+
+    interval: dict
+    if entry_type == "diaper":
+        if "mode" not in entry:
+            raise ValueError("Diaper history entry requires mode")
+        interval = cast(dict, _diaper_interval(
+            start, offset, entry["mode"], entry.get("pee_amount"), entry.get("poo_amount"),
+            entry.get("color"), entry.get("consistency"), entry.get("diaper_rash", False), entry.get("notes"),
+        ))
+    elif entry_type == "bottle":
+        if "amount" not in entry:
+            raise ValueError("Bottle history entry requires amount")
+        interval = cast(dict, _bottle_interval(
+            start, offset, entry["amount"], entry.get("bottle_type", "Formula"),
+            cast(VolumeUnits, entry.get("units", "ml")),
+        ))
+    else:
+        weight, height, head = entry.get("weight"), entry.get("height"), entry.get("head")
+        if not any([weight, height, head]):
+            raise ValueError("At least one measurement (weight, height, or head) is required")
+        interval = cast(dict, _growth_entry(
+            interval_id, start, offset, weight, height, head, cast(MeasurementUnits, entry.get("units", "metric"))
+        ))
+
+    # Mark as changed now, so incremental interval syncs pick up backfilled entries
+    interval["lastUpdated"] = now
+    return entry_type, interval_id, interval
+
+
+def _bulk_write_history(
+    client: firestore.Client, child_uid: str, intervals: list[tuple[str, str, dict]]
+) -> set[str]:
+    """Write history intervals with a BulkWriter (parallel batches, rate ramp-up and retries).
+
+    Returns:
+        IDs of the intervals written successfully
+    """
+    written: set[str] = set()
+
+    def on_write_error(failure: Any, _writer: Any) -> bool:
+        if failure.attempts < BULK_WRITE_MAX_ATTEMPTS:
+            return True
+        _LOGGER.error("Failed to import history interval: %s", failure.message)
+        return False
+
+    bulk_writer = client.bulk_writer()
+    bulk_writer.on_write_result(lambda reference, _result, _writer: written.add(reference.id))
+    bulk_writer.on_write_error(on_write_error)
+    for entry_type, interval_id, interval in intervals:
+        collection_name, _ = HISTORY_TRACKERS[entry_type]
+        intervals_ref = client.collection(collection_name).document(child_uid).collection(
+            INTERVAL_SUBCOLLECTIONS[collection_name]
+        )
+        bulk_writer.set(intervals_ref.document(interval_id), interval)
+    bulk_writer.close()
+    return written
+
+
+def _latest_history_intervals(
+    intervals: list[tuple[str, str, dict]], written: set[str]
+) -> dict[str, dict]:
+    """Get the latest successfully written interval of each history entry type."""
+    latest: dict[str, dict] = {}
+    for entry_type, interval_id, interval in intervals:
+        if interval_id in written and (entry_type not in latest or interval["start"] > latest[entry_type]["start"]):
+            latest[entry_type] = interval
+    return latest
+
+
+def _history_prefs_writes(
+    latest: dict[str, dict], current: dict[str, dict | None], now: float
+) -> list[tuple[str, dict, bool]]:
+    """Build the root prefs writes for the latest imported interval of each tracker.
+
+    Trackers whose stored prefs already hold a newer entry are skipped, as are
+    updates of root documents that do not exist.
+
+    Returns:
+        List of (entry type, write data, merge) where merge means set(merge=True) instead of update()
+    """
+    writes = []
+    for entry_type, interval in latest.items():
+        _, prefs_field = HISTORY_TRACKERS[entry_type]
+        data = current.get(entry_type)
+        current_start = ((data or {}).get("prefs") or {}).get(prefs_field, {}).get("start")
+        if isinstance(current_start, (int, float)) and current_start >= interval["start"]:
+            continue
+
+        if entry_type == "bottle":
+            prefs = _bottle_prefs(
+                interval["start"], interval["offset"], interval["amount"], interval["bottleType"], interval["units"]
+            )
+            prefs["prefs"].update({"timestamp": {"seconds": now}, "local_timestamp": now})
+            writes.append((entry_type, prefs, True))
+            continue
+
+        if data is None:
+            _LOGGER.warning("Skipping prefs.%s update, %s document of child does not exist", prefs_field, entry_type)
+            continue
+        if entry_type == "diaper":
+            update = _diaper_prefs_update(interval["start"], interval["offset"], interval["mode"])
+        else:
+            update = _growth_prefs_update(interval["start"], cast(FirebaseGrowthData, interval))
+        update.update({"prefs.timestamp": {"seconds": now}, "prefs.local_timestamp": now})
+        writes.append((entry_type, update, False))
+    return writes
+
+
+def _blind_timer_update(update: dict, timer: dict) -> dict:
+    """Turn absolute feed durations of a timer update into server-side increments.
+
+    The durations were computed from local timer state; only the added time is sent,
+    so time accumulated by other clients is kept.
+    """
+    write = dict(update)
+    for field in ("leftDuration", "rightDuration"):
+        key = f"timer.{field}"
+        if key in write:
+            delta = write[key] - timer.get(field, 0.0)
+            if delta:
+                write[key] = firestore.Increment(delta)
+            else:
+                del write[key]
+    return write
+
+
+def _apply_field_updates(data: dict | None, update: dict) -> dict:
+    """Apply an update() call (dotted field paths, DELETE_FIELD, Increment) to a copy of local data."""
+    state = copy.deepcopy(data or {})
+    for key, value in update.items():
+        *parents, field = key.split(".")
+        target = state
+        for parent in parents:
+            if not isinstance(target.get(parent), dict):
+                target[parent] = {}
+            target = target[parent]
+        if value is firestore.DELETE_FIELD:
+            target.pop(field, None)
+        elif isinstance(value, firestore.Increment):
+            target[field] = target.get(field, 0) + value.value
+        else:
+            target[field] = copy.deepcopy(value)
+    return state
+
+
+def _merge_document_fields(data: dict | None, values: dict) -> dict:
+    """Apply set(..., merge=True) data to a copy of local data, merging nested maps."""
+    state = copy.deepcopy(data or {})
+    for key, value in values.items():
+        if isinstance(value, dict) and isinstance(state.get(key), dict):
+            state[key] = _merge_document_fields(state[key], value)
+        elif value is firestore.DELETE_FIELD:
+            state.pop(key, None)
+        else:
+            state[key] = copy.deepcopy(value)
+    return state
+
+
+def _flatten_fields(data: dict, prefix: str = "") -> dict[str, Any]:
+    """Flatten nested maps into {dotted field path: leaf value}; lists are leaves."""
+    fields: dict[str, Any] = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            fields.update(_flatten_fields(value, f"{path}."))
+        else:
+            fields[path] = value
+    return fields
+
+
+def _delta_callback(
+    callback: Callable[[dict[str, FieldChange]], None], paths: Iterable[str] | None
+) -> Callable[[dict], None]:
+    """Wrap a delta callback as a document callback that remembers the previous snapshot.
+
+    Only changed field paths matching one of the fnmatch patterns in paths (all if None)
+    are delivered; snapshots without such changes are not delivered at all.
+    """
+    patterns = None if paths is None else tuple(paths)
+    previous: dict[str, Any] = {}
+
+    def on_document(data: dict) -> None:
+        nonlocal previous
+        current = _flatten_fields(data)
+        changes: dict[str, FieldChange] = {}
+        for path in previous.keys() | current.keys():
+            if patterns is not None and not any(fnmatchcase(path, pattern) for pattern in patterns):
+                continue
+            old, new = previous.get(path), current.get(path)
+            if path not in previous or path not in current or old != new:
+                changes[path] = {"old": old, "new": new}
+        previous = current
+        if changes:
+            callback(changes)
+
+    return on_document
+
+
+def _growth_data_from_health(health_data: dict | None) -> GrowthData:
+    """Extract latest growth measurements from a health/{child_uid} document."""
+    last_growth = (health_data or {}).get("prefs", {}).get("lastGrowthEntry", {})
+    if not last_growth:
+        return {
+            "weight_units": "kg",
+            "height_units": "cm",
+            "head_units": "hcm",
+        }
+
+    return {
+        "weight": last_growth.get("weight"),
+        "height": last_growth.get("height"),
+        "head": last_growth.get("head"),
+        "weight_units": last_growth.get("weightUnits", "kg"),
+        "height_units": last_growth.get("heightUnits", "cm"),
+        "head_units": last_growth.get("headUnits", "hcm"),
+        "timestamp_sec": last_growth.get("start"),
+    }
+
+
+_event_start = itemgetter("start")
+
+
+def _interval_event(
+    collection_name: CollectionName, entry: dict, is_multi_entry: bool, extra_fields: tuple[str, ...] = ()
+) -> dict:
+    """Map a regular interval document or a multi-entry item to a calendar event.
+
+    extra_fields are copied from the entry as-is when present.
+    """
+    event: dict
+    if collection_name == "sleep":
+        event = {
+            "start": entry["start"],
+            "duration": entry.get("duration", 0),
+        }
+    elif collection_name == "feed":
+        # Regular doc durations are in minutes, multi-entry durations are in SECONDS
+        event = {
+            "start": entry["start"],
+            "leftDuration": entry.get("leftDuration", 0),
+            "rightDuration": entry.get("rightDuration", 0),
+            "is_multi_entry": is_multi_entry,
+        }
+    else:
+        event = {"start": entry["start"]}
+        if collection_name == "diaper":
+            event["mode"] = entry.get("mode", "unknown")
+        # Add optional fields if present
+        for field in _OPTIONAL_EVENT_FIELDS[collection_name]:
+            if field in entry:
+                event[field] = entry[field]
+
+    for field in extra_fields:
+        if field in entry:
+            event[field] = entry[field]
+    return event
+
+
+def _interval_select_fields(collection_name: CollectionName, extra_fields: tuple[str, ...]) -> list[str]:
+    """Field mask for interval queries: the fields mapped into events plus requested extras."""
+    fields = list(INTERVAL_EVENT_FIELDS[collection_name])
+    # "multi" lets the regular query skip multi-entry documents
+    fields.extend(field for field in ("multi", *extra_fields) if field not in fields)
+    return fields
+
+
+def _build_multi_entry_index(documents: dict[str, tuple[Any, list[dict]]]) -> tuple[list[float], list[dict]]:
+    """Build a range index over cached multi-entry items: parallel arrays sorted by start."""
+    entries = sorted((entry for _, doc_entries in documents.values() for entry in doc_entries), key=_event_start)
+    return [entry["start"] for entry in entries], entries
+
+
+def _encode_page_cursor(collection_name: CollectionName, start: float, doc_id: str) -> str:
+    """Encode the position after the last regular document of a page as an opaque token."""
+    payload = json.dumps({"c": collection_name, "s": start, "d": doc_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _decode_page_cursor(collection_name: CollectionName, cursor: str) -> tuple[float, str]:
+    """Decode a page cursor into (start, document ID), checking it belongs to the tracker."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        start, doc_id = payload["s"], payload["d"]
+        valid = payload["c"] == collection_name and isinstance(start, (int, float)) and isinstance(doc_id, str)
+    except (ValueError, TypeError, KeyError) as err:
+        raise ValueError("Invalid page cursor") from err
+    if not valid:
+        raise ValueError(f"Page cursor does not belong to {collection_name} intervals")
+    return start, doc_id
+
+
+def _iter_index_range(
+    index: tuple[list[float], list[dict]], start_timestamp: float, end_timestamp: float
+) -> Iterator[dict]:
+    """Iterate indexed events with start in [start_timestamp, end_timestamp) without copying them."""
+    starts, events = index
+    return map(events.__getitem__, range(bisect_left(starts, start_timestamp), bisect_left(starts, end_timestamp)))
+
+
+def _tagged_event_start(item: tuple[CollectionName, dict]) -> float:
+    """Sort key of a (collection name, event) pair."""
+    return item[1]["start"]
+
+
+def _merge_by_start(*event_lists: Iterable[dict]) -> list[dict]:
+    """Merge event lists that are each ordered by start into one ordered list."""
+    return list(heapq.merge(*event_lists, key=_event_start))
+
+
+def _multi_entry_items(data: dict | None) -> list[dict]:
+    """Get the batched entries of a multi-entry document that have a start time."""
+    if not data or not isinstance(data.get("data"), dict):
+        return []
+
+    return [entry for entry in data["data"].values() if isinstance(entry, dict) and "start" in entry]
+
+
+def _interval_changes(collection_name: CollectionName, changes: Iterable[Any], since: float) -> list[IntervalChange]:
+    """Map the document changes of an interval query snapshot to events of entries starting at or after since."""
+    interval_changes: list[IntervalChange] = []
+    for change in changes:
+        change_type = cast(Literal["added", "modified", "removed"], change.type.name.lower())
+        data = change.document.to_dict() or {}
+        if data.get("multi"):
+            entries = _multi_entry_items(data)
+        else:
+            entries = [data]
+        for entry in entries:
+            if not isinstance(entry.get("start"), (int, float)) or entry["start"] < since:
+                continue
+            event = _interval_event(collection_name, entry, bool(data.get("multi")))
+            interval_changes.append({"type": change_type, "id": change.document.id, "event": event})
+    return interval_changes
+
+
+def _pause_sleep_update(child_uid: str, data: dict | None, now: float) -> dict | None:
+    """Build the update that pauses a sleep timer, or None if there is nothing to pause."""
+    if data is None:
+        _LOGGER.warning("No sleep document to pause for %s", child_uid)
+        return None
+
+    timer = data.get("timer", {})
+    if not timer.get("active", False):
+        _LOGGER.info("Sleep is not active for %s, ignoring pause request", child_uid)
+        return None
+
+    if timer.get("paused", False):
+        _LOGGER.info("Sleep is already paused for %s", child_uid)
+        return None
+
+    # Add timerEndTime field that app uses to show end time when paused
+    return {
+        "timer.paused": True,
+        "timer.active": True,
+        "timer.timerEndTime": now * 1000,  # Convert to milliseconds
+        "timer.timestamp": {"seconds": now},
+        "timer.local_timestamp": now,
+    }
+
+
+def _resume_sleep_update(child_uid: str, data: dict | None, now: float) -> dict | None:
+    """Build the update that resumes a paused sleep timer, or None if it is not paused."""
+    if data is None:
+        _LOGGER.warning("No sleep document to resume for %s", child_uid)
+        return None
+
+    timer = data.get("timer", {})
+    if not timer.get("active", False):
+        _LOGGER.info("Sleep is not active for %s, ignoring resume request", child_uid)
+        return None
+
+    if not timer.get("paused", False):
+        _LOGGER.info("Sleep is not paused for %s, ignoring resume request", child_uid)
+        return None
+
+    return {
+        "timer.paused": False,
+        "timer.active": True,
+        "timer.timestamp": {"seconds": now},
+        "timer.local_timestamp": now,
+    }
+
+
+def _cancel_sleep_update(child_uid: str, data: dict | None, now: float) -> dict:
+    """Build the update that sets the sleep timer to inactive without saving an interval."""
+    if data is None:
+        _LOGGER.warning("Sleep document does not exist for child %s", child_uid)
+    elif data:
+        timer = data.get("timer", {})
+        _LOGGER.info("Current timer state: active=%s, paused=%s", timer.get("active"), timer.get("paused"))
+
+    return {"timer": _inactive_timer(_session_uuid_from(data), now)}
+
+
+def _complete_sleep_writes(
+    child_uid: str, data: dict | None, now: float, offset: float
+) -> tuple[str | None, dict | None, dict] | None:
+    """Build the writes that complete a sleep session.
+
+    Returns:
+        Tuple of (interval id, interval document, root document update), or None
+        if there is no active sleep. Interval id and document are None when the
+        timer is broken and can only be cleared.
+    """
+    if data is None:
+        _LOGGER.warning("No active sleep document to complete for %s", child_uid)
+        return None
+
+    timer = data.get("timer") or {}
+
+    # Check if timer is already inactive (already completed)
+    if not timer.get("active", False):
+        _LOGGER.info("Sleep already completed for %s, ignoring duplicate request", child_uid)
+        return None
+
+    timer_start_ms = timer.get("timerStartTime")
+    if not timer_start_ms:
+        # Attempt fallback: reconstruct using timestamp.seconds if available
+        ts_seconds = timer.get("timestamp", {}).get("seconds")
+        if ts_seconds:
+            timer_start_ms = int(float(ts_seconds) * 1000)
+            _LOGGER.warning("timerStartTime missing; falling back to timestamp.seconds for %s", child_uid)
+        else:
+            _LOGGER.warning("Missing timerStartTime; cannot compute duration for %s", child_uid)
+            return None, None, {"timer": firestore.DELETE_FIELD}
+
+    # If sleep is paused, use timerEndTime as the end time (not current time)
+    if timer.get("paused", False) and "timerEndTime" in timer:
+        end_ms = timer["timerEndTime"]
+        _LOGGER.info("Sleep is paused, using timerEndTime for completion")
+    else:
+        end_ms = now * 1000
+
+    duration_sec = int((end_ms - float(timer_start_ms)) / 1000)
+    start_sec = int(float(timer_start_ms) / 1000)
+
+    interval_id = _new_session_uuid()
+    interval = {
+        "_id": interval_id,
+        "start": start_sec,
+        "duration": duration_sec,
+        "offset": offset,
+        "end_offset": offset,
+        "details": timer.get("details", {}),
+        "lastUpdated": now,
+    }
+
+    last_sleep_data: LastSleepData = {
+        "start": start_sec,
+        "duration": duration_sec,
+        "offset": offset,
+    }
+
+    # Set timer to inactive (match cancel_sleep behavior)
+    root_update = {
+        "timer": _inactive_timer(_session_uuid_from(data), now),
+        "prefs.lastSleep": last_sleep_data,
+        "prefs.timestamp": {"seconds": now},
+        "prefs.local_timestamp": now,
+    }
+    return interval_id, interval, root_update
+
+
+def _active_feed_timer(child_uid: str, data: dict | None, action: str) -> dict | None:
+    """Get the feed timer if feeding is active, logging why not otherwise."""
+    if data is None:
+        _LOGGER.warning("Feed document not found")
+        return None
+
+    if not data:
+        _LOGGER.warning("Feed document has no data")
+        return None
+
+    timer = data.get("timer", {})
+    if not timer.get("active", False):
+        _LOGGER.info("Feeding is not active for %s, ignoring %s request", child_uid, action)
+        return None
+
+    return timer
+
+
+def _pause_feeding_update(child_uid: str, data: dict | None, now: float) -> dict | None:
+    """Build the update that pauses feeding, accumulates elapsed time to the current side and clears activeSide."""
+    timer = _active_feed_timer(child_uid, data, "pause")
+    if timer is None:
+        return None
+
+    if timer.get("paused", False):
+        _LOGGER.info("Feeding is already paused for %s", child_uid)
+        return None
+
+    current_side, left_duration, right_duration = _accumulate_feed_durations(timer, now)
+
+    return {
+        "timer.paused": True,
+        "timer.active": True,
+        "timer.timestamp": {"seconds": now},
+        "timer.local_timestamp": now,
+        "timer.leftDuration": left_duration,
+        "timer.rightDuration": right_duration,
+        "timer.lastSide": current_side,
+        "timer.activeSide": firestore.DELETE_FIELD,
+    }
+
+
+def _resume_feeding_update(
+    child_uid: str, data: dict | None, now: float, side: FeedSide | None
+) -> dict | None:
+    """Build the update that resumes paused feeding on the given (or last) side."""
+    timer = _active_feed_timer(child_uid, data, "resume")
+    if timer is None:
+        return None
+
+    if not timer.get("paused", False):
+        _LOGGER.info("Feeding is not paused for %s, ignoring resume request", child_uid)
+        return None
+
+    if side is None:
+        side = timer.get("lastSide", "left")
+
+    return {
+        "timer.paused": False,
+        "timer.active": True,
+        "timer.timestamp": {"seconds": now},
+        "timer.local_timestamp": now,
+        "timer.timerStartTime": now,  # Reset timer start time on resume
+        "timer.activeSide": side,
+        "timer.lastSide": "none",  # Set to none during transition
+    }
+
+
+def _switch_feeding_update(child_uid: str, data: dict | None, now: float) -> dict | None:
+    """Build the update that switches feeding side (left <-> right)."""
+    timer = _active_feed_timer(child_uid, data, "switch")
+    if timer is None:
+        return None
+
+    current_side = timer.get("activeSide", timer.get("lastSide", "left"))
+    left_duration = timer.get("leftDuration", 0.0)
+    right_duration = timer.get("rightDuration", 0.0)
+
+    # Only accumulate duration if NOT paused
+    if not timer.get("paused", False):
+        current_side, left_duration, right_duration = _accumulate_feed_durations(timer, now)
+
+    new_side = "right" if current_side == "left" else "left"
+
+    return {
+        "timer.paused": False,  # Switching always resumes
+        "timer.lastSide": "none",  # Set to none during transition
+        "timer.timestamp": {"seconds": now},
+        "timer.local_timestamp": now,
+        "timer.timerStartTime": now,  # Always reset timer start time
+        "timer.activeSide": new_side,  # Always set active side
+        "timer.leftDuration": left_duration,
+        "timer.rightDuration": right_duration,
+    }
+
+
+def _cancel_feeding_update(data: dict | None, now: float) -> dict:
+    """Build the update that cancels feeding without saving."""
+    timer = _inactive_timer(_session_uuid_from(data), now)
+    timer.update({
+        "leftDuration": 0.0,
+        "rightDuration": 0.0,
+        "lastSide": "left",
+    })
+    return {"timer": timer}
+
+
+def _complete_feeding_writes(
+    child_uid: str, data: dict | None, now: float, offset: float
+) -> tuple[str, dict, dict] | None:
+    """Build the writes that complete feeding and save it to history.
+
+    Returns:
+        Tuple of (interval id, interval document, root document update), or None
+        if there is no active feeding.
+    """
+    if data is None:
+        _LOGGER.warning("No active feed document to complete")
+        return None
+
+    timer = data.get("timer") or {}
+
+    # Check if timer is already inactive (already completed)
+    if not timer.get("active", False):
+        _LOGGER.info("Feeding already completed for %s, ignoring duplicate request", child_uid)
+        return None
+
+    timer_start = timer.get("timerStartTime")
+    if not timer_start:
+        _LOGGER.warning("Missing timerStartTime for feeding")
+        return None
+
+    # timerStartTime is in seconds for feeding
+    timer_start_sec = float(timer_start)
+
+    left_duration = timer.get("leftDuration", 0.0)
+    right_duration = timer.get("rightDuration", 0.0)
+
+    # Add elapsed time on current side if not paused
+    if not timer.get("paused", False):
+        _, left_duration, right_duration = _accumulate_feed_durations(
+            {**timer, "timerStartTime": timer_start_sec}, now
+        )
+
+    # Calculate total duration from accumulated durations
+    total_duration = left_duration + right_duration
+
+    feed_start_time = timer.get("feedStartTime", timer_start_sec)
+
+    # Determine last side for history
+    last_side_value = timer.get("activeSide", timer.get("lastSide", "right"))
+    if last_side_value == "none":
+        last_side_value = "right" if right_duration >= left_duration else "left"
+
+    interval_id = _new_interval_id(now)
+    interval = {
+        "mode": "breast",
+        "start": feed_start_time,
+        "lastSide": last_side_value,
+        "lastUpdated": now,
+        "leftDuration": left_duration,
+        "rightDuration": right_duration,
+        "offset": offset,
+        "end_offset": offset,
+    }
+
+    last_nursing_data: LastNursingData = {
+        "mode": "breast",
+        "start": feed_start_time,
+        "duration": total_duration,
+        "leftDuration": left_duration,
+        "rightDuration": right_duration,
+        "offset": offset,
+    }
+
+    last_side_data: LastSideData = {
+        "start": feed_start_time,
+        "lastSide": last_side_value,
+    }
+
+    # Update to inactive and save to lastNursing
+    root_update = {
+        "timer.active": False,
+        "timer.paused": True,
+        "timer.timestamp": {"seconds": now},
+        "timer.local_timestamp": now,
+        "timer.lastSide": last_side_value,
+        "timer.leftDuration": firestore.DELETE_FIELD,  # Remove durations from timer
+        "timer.rightDuration": firestore.DELETE_FIELD,
+        "timer.activeSide": firestore.DELETE_FIELD,  # Remove activeSide
+        "prefs.lastNursing": last_nursing_data,
+        "prefs.lastSide": last_side_data,
+        "prefs.timestamp": {"seconds": now},
+        "prefs.local_timestamp": now,
+    }
+    return interval_id, interval, root_update
+
+
+def _stored_tokens(
+    id_token: str | None, refresh_token: str | None, user_uid: str | None, token_expires_at: float | None
+) -> StoredTokens | None:
+    """Build the token store entry for a session, or None if the session is incomplete."""
+    if not id_token or not refresh_token or not user_uid or token_expires_at is None:
+        return None
+
+    return {
+        "id_token": id_token,
+        "refresh_token": refresh_token,
+        "user_uid": user_uid,
+        "token_expires_at": token_expires_at,
+    }
+
+
+def _refresh_token_rejected(status: int | None) -> bool:
+    """Whether a failed token refresh with this HTTP status (None if there was no response) rejected the token.
+
+    Firebase answers 400 (e.g. INVALID_REFRESH_TOKEN, TOKEN_EXPIRED) or 401 for a refresh token
+    that will never work again; network errors and other statuses are transient.
+    """
+    return status in (400, 401)
+
+
+def _new_refresher_stats() -> TokenRefresherStats:
+    """Create empty background token refresher statistics."""
+    return {
+        "running": False,
+        "refresh_count": 0,
+        "failure_count": 0,
+        "consecutive_failures": 0,
+        "last_refresh_at": None,
+        "last_refresh_duration_sec": None,
+        "last_error": None,
+        "next_refresh_at": None,
+    }
+
+
+def _token_is_fresh(id_token: str | None, expires_at: float | None) -> bool:
+    """Whether a token can be used as is, i.e. exists and does not expire within TOKEN_REFRESH_MARGIN."""
+    return bool(id_token) and (not expires_at or time.time() < expires_at - TOKEN_REFRESH_MARGIN)
+
+
+def _next_token_refresh_at(
+    stats: TokenRefresherStats, expires_at: float | None, lead_time: float, jitter: float, retry_interval: float
+) -> float:
+    """Time of the next background refresh attempt."""
+    if stats["consecutive_failures"]:
+        return time.time() + min(retry_interval * 2 ** (stats["consecutive_failures"] - 1), lead_time)
+    if expires_at is None:
+        return time.time()
+    next_refresh_at = expires_at - lead_time - random.uniform(0, jitter)
+    if stats["last_refresh_at"] is not None:
+        # Without this, a lead_time at or above the token lifetime would refresh in a busy loop
+        next_refresh_at = max(next_refresh_at, stats["last_refresh_at"] + MIN_TOKEN_REFRESH_INTERVAL)
+    return next_refresh_at
+
+
+def _opened_listener_health(previous: dict[str, Any] | None) -> dict[str, Any]:
+    """Health record of a newly opened watch stream, keeping the restart counters of the one it replaces."""
+    now = time.time()
+    health: dict[str, Any] = {
+        "opened_at": now,
+        "last_activity_at": now,
+        "resume_token": None,
+        "restarts": 0,
+        "consecutive_restarts": 0,
+        "next_restart_at": None,
+    }
+    if previous is not None:
+        for field in ("restarts", "consecutive_restarts", "next_restart_at"):
+            health[field] = previous[field]
+    return health
+
+
+def _watch_is_alive(watch: Any) -> bool:
+    """Whether a watch stream is still consuming (it closes itself on unrecoverable RPC errors)."""
+    return not getattr(watch, "_closed", False) and getattr(watch, "is_active", True)
+
+
+def _listener_status(watch: Any, health: dict[str, Any]) -> ListenerStatus:
+    """Public status of a watch stream from its health record."""
+    return {
+        "alive": _watch_is_alive(watch),
+        "opened_at": health["opened_at"],
+        "last_activity_at": health["last_activity_at"],
+        "restarts": health["restarts"],
+        "consecutive_restarts": health["consecutive_restarts"],
+        "next_restart_at": health["next_restart_at"],
+    }
+
+
+def _due_listener_restarts(
+    listeners: dict[str, Any],
+    health: dict[str, dict[str, Any]],
+    now: float,
+    stall_timeout: float,
+    retry_interval: float,
+    max_backoff: float,
+) -> list[str]:
+    """Find the watch streams to restart now: closed ones, and ones inactive for stall_timeout.
+
+    Resume token progress counts as a heartbeat. A key restarted without a snapshot since
+    its previous restart waits retry_interval, doubled per restart up to max_backoff.
+    """
+    due = []
+    for key, watch in list(listeners.items()):
+        state = health.get(key)
+        if state is None:
+            continue
+        token = getattr(watch, "resume_token", None)
+        if token is not None and token != state["resume_token"]:
+            state["resume_token"] = token
+            state["last_activity_at"] = now
+        if _watch_is_alive(watch) and now - state["last_activity_at"] < stall_timeout:
+            continue
+        if state["next_restart_at"] is not None and now < state["next_restart_at"]:
+            continue
+        state["next_restart_at"] = now + min(retry_interval * 2 ** state["consecutive_restarts"], max_backoff)
+        state["restarts"] += 1
+        state["consecutive_restarts"] += 1
+        due.append(key)
+    return due
+
+
+class FirebaseTokenCredentials(Credentials):
+    """Custom credentials class for Firebase SDK.
+
+    The token is swapped in place when it is refreshed, so a Firestore client
+    and its watch streams keep running across token refreshes.
+    """
+
+    def __init__(
+        self,
+        id_token: str,
+        expires_at: float | None = None,
+        refresh_handler: Callable[[], None] | None = None,
+    ):
+        """Initialize with Firebase ID token.
+
+        Args:
+            id_token: Firebase ID token.
+            expires_at: Unix timestamp when the token expires. Lets google-auth
+                call refresh() shortly before expiry.
+            refresh_handler: Called by refresh() to fetch a new token. It is
+                expected to call update_token() with the result.
+        """
+        super().__init__()
+        self._refresh_handler = refresh_handler
+        self.update_token(id_token, expires_at)
+
+    def update_token(self, id_token: str, expires_at: float | None = None) -> None:
+        """Swap in a new token for subsequent requests."""
+        self._id_token = id_token
+        self.token = id_token  # Set the token attribute that parent expects
+        # google-auth compares expiry against naive UTC datetimes
+        self.expiry = (
+            datetime.fromtimestamp(expires_at, tz=timezone.utc).replace(tzinfo=None)
+            if expires_at is not None
+            else None
+        )
+
+    def refresh(self, request):
+        """Fetch a new token through the refresh handler.
+
+        Called by google-auth before a request once the token is close to expiry.
+        Without a handler this is a no-op and the token is managed externally.
+        """
+        if self._refresh_handler is None:
+            return
+        try:
+            self._refresh_handler()
+        except Exception as err:
+            raise RefreshError(f"Failed to refresh Firebase token: {err}") from err
+
+
+class _ClientBase:
+    """Listener, mirror and timer state shared by HuckleberryAPI and AsyncHuckleberryAPI.
+
+    Watch streams run on the sync Firestore client of _get_listener_client() and call back on
+    its threads. Methods that open watches take a deliver function (listener key, callback,
+    data[, merge]) -> bool, so each client decides where callbacks run.
+    """
+
+    id_token: str | None
+    token_expires_at: float | None
+
+    def _init_client_state(
+        self,
+        timezone: str,
+        blind_timer_writes: bool,
+        mirror_root_documents: bool,
+        multiplex_listeners: bool,
+        listener_dispatcher: ListenerDispatcher | None,
+    ) -> None:
+        """Initialize the state kept by both clients."""
+        self._refresher_stats = _new_refresher_stats()
+        self._credentials: FirebaseTokenCredentials | None = None
+        self._timezone = ZoneInfo(timezone)
+        self._listeners: dict = {}  # Store active listeners
+        self._listener_callbacks: dict = {}  # Store callbacks to recreate listeners
+        # Parsed multi-entry documents per (collection, child): {doc_id: (update_time, entries)}
+        self._multi_entry_cache: dict[tuple[str, str], dict[str, tuple[Any, list[dict]]]] = {}
+        # Sorted (starts, entries) arrays over the cached documents, for bisect range lookups
+        self._multi_entry_index: dict[tuple[str, str], tuple[list[float], list[dict]]] = {}
+        self._blind_timer_writes = blind_timer_writes
+        # Last known timer per tracker document path, from listener snapshots only:
+        # (timer, key of the watch that delivered it), trusted only while that watch is open
+        self._timer_state: dict[str, tuple[dict, str]] = {}
+        self._mirror_root_documents = mirror_root_documents
+        # Listened tracker root documents by path (None if the document does not exist)
+        self._root_mirror: dict[str, dict | None] = {}
+        # update_time of each mirrored document, the precondition of writes that skip the read
+        self._mirror_update_times: dict[str, Any] = {}
+        # Guards the mirror and timer state, which are also written from watch threads
+        self._mirror_lock = threading.Lock()
+        self._multiplex_listeners = multiplex_listeners
+        # Children of each multiplexed collection, in chunks of one watch stream each
+        self._multiplex_chunks: dict[CollectionName, list[list[str]]] = {}
+        self._listener_dispatcher = listener_dispatcher
+        # Interval listeners by key: (collection, child, callback, lookback)
+        self._interval_listeners: dict[str, tuple[CollectionName, str, Callable, float]] = {}
+        # Watch stream health per listener key, for the watchdog and get_listener_status()
+        self._listener_health: dict[str, dict[str, Any]] = {}
+        # Guards the listener, health and multiplex chunk maps
+        self._listener_lock = threading.RLock()
+        # Per listener key, held while its watch is replaced, so the watchdog and
+        # restart_listeners() cannot open two streams for one key (other keys open in parallel)
+        self._replace_locks: dict[str, threading.Lock] = {}
+        # update_time of the last delivered snapshot per (listener key, document ID)
+        self._delivered_update_times: dict[tuple[str, str], Any] = {}
+        self._delivery_lock = threading.Lock()
+
+    def _get_listener_client(self) -> firestore.Client:
+        """Get the sync Firestore client used for watch streams."""
+        raise NotImplementedError
+
+    def get_token_refresher_stats(self) -> TokenRefresherStats:
+        """Get timing and failure statistics of the background token refresher."""
+        return cast(TokenRefresherStats, dict(self._refresher_stats))
+
+    def _update_credentials(self) -> None:
+        """Push the current token into the credentials of the Firestore clients."""
+        if self._credentials is not None and self.id_token:
+            self._credentials.update_token(self.id_token, self.token_expires_at)
+
+    def _get_timezone_offset_minutes(self) -> float:
+        """Get current timezone offset in minutes.
+
+        Calculates offset dynamically to handle DST changes.
+        Returns negative for UTC+ timezones (e.g., -120 for UTC+2).
+        """
+        return _timezone_offset_minutes(self._timezone)
+
+    def _unread_timer_document(self, path: str, has_stage: bool) -> tuple[dict | None, Any] | None:
+        """Get the document a timer transition can use without reading it.
+
+        Returns:
+            (document data, write option) where the option is the mirrored update_time as
+            precondition, or None for a blind write of the known timer state. None if the
+            document has to be read in a transaction.
+        """
+        known, data, update_time = self._mirror_lookup(path)
+        if known and update_time is not None:
+            # The write is rejected if the document changed after the mirrored snapshot
+            return data, firestore.Client.write_option(last_update_time=update_time)
+        if self._blind_timer_writes and not has_stage:
+            timer = self._live_timer_state(path)
+            if timer is not None:
+                return {"timer": timer}, None
+        return None
+
+    def _live_timer_state(self, path: str) -> dict | None:
+        """Get a copy of the timer last seen by a listener, or None unless its watch is still open."""
+        with self._mirror_lock:
+            entry = self._timer_state.get(path)
+        if entry is None:
+            return None
+        timer, listener_key = entry
+        with self._listener_lock:
+            watch = self._listeners.get(listener_key)
+            if watch is None or not _watch_is_alive(watch):
+                return None
+        return copy.deepcopy(timer)
+
+    def _mirror_lookup(self, path: str) -> tuple[bool, dict | None, Any]:
+        """Get a tracker root document from the mirror.
+
+        Returns:
+            Tuple of (whether the mirror holds the document, copy of its data or None if it does not
+            exist, update_time of the mirrored data or None if it is not known)
+        """
+        if not self._mirror_root_documents:
+            return False, None, None
+        with self._mirror_lock:
+            if path not in self._root_mirror:
+                return False, None, None
+            return True, copy.deepcopy(self._root_mirror[path]), self._mirror_update_times.get(path)
+
+    def _apply_local_write(self, path: str, update: dict, merge: bool = False, update_time: Any = None) -> None:
+        """Apply a committed write of a tracker root document to the mirror and local timer state.
+
+        Args:
+            path: Document path
+            update: Field paths passed to update(), or nested data passed to set(merge=True)
+            merge: Whether update is set(merge=True) data
+            update_time: update_time from the write result, if known. Otherwise the mirror keeps the
+                older one, so the next precondition write falls back to a transaction
+        """
+        apply = _merge_document_fields if merge else _apply_field_updates
+        with self._mirror_lock:
+            if path in self._root_mirror and (merge or self._root_mirror[path] is not None):
+                self._root_mirror[path] = apply(self._root_mirror[path], update)
+                if update_time is not None:
+                    self._mirror_update_times[path] = update_time
+
+            if any(key == "timer" or key.startswith("timer.") for key in update):
+                # Only listener snapshots fill the timer state; until the snapshot of this write
+                # arrives, transitions read the timer
+                self._timer_state.pop(path, None)
+
+    def _replace_watch(self, listener_key: str, open_watch: Callable[[], Any]) -> None:
+        """Open the watch stream of a listener key, closing the one it replaces once the new one is open."""
+        with self._listener_lock:
+            replace_lock = self._replace_locks.setdefault(listener_key, threading.Lock())
+        with replace_lock:
+            with self._listener_lock:
+                self._listener_health[listener_key] = _opened_listener_health(self._listener_health.get(listener_key))
+            # The replaced watch may have died, so its timers are not trusted until the new one reports
+            with self._mirror_lock:
+                for path in [path for path, entry in self._timer_state.items() if entry[1] == listener_key]:
+                    del self._timer_state[path]
+            watch = open_watch()
+            with self._listener_lock:
+                previous = self._listeners.get(listener_key)
+                self._listeners[listener_key] = watch
+            if previous is None:
+                return
+            # Unsubscribing joins the watch thread, which may be waiting for the listener lock
+            try:
+                previous.unsubscribe()
+            except Exception as err:
+                _LOGGER.error("Error stopping replaced listener %s: %s", listener_key, err)
+
+    def _mark_listener_activity(self, listener_key: str) -> None:
+        """Record a snapshot of a watch stream, which also ends its restart backoff."""
+        with self._listener_lock:
+            health = self._listener_health.get(listener_key)
+            if health is not None:
+                health["last_activity_at"] = time.time()
+                health["consecutive_restarts"] = 0
+                health["next_restart_at"] = None
+
+    def get_listener_status(self) -> dict[str, ListenerStatus]:
+        """Get the health of every watch stream, keyed by listener key.
+
+        Keys are "{collection}_{child_uid}" for document listeners, "{collection}_multiplex_{n}"
+        for multiplexed streams and "{collection}_intervals_{child_uid}" for interval listeners.
+        """
+        statuses: dict[str, ListenerStatus] = {}
+        with self._listener_lock:
+            for key, watch in self._listeners.items():
+                health = self._listener_health.get(key)
+                if health is not None:
+                    statuses[key] = _listener_status(watch, health)
+        return statuses
+
+    def _claim_delivery(self, listener_key: str, doc_id: str, update_time: Any) -> bool:
+        """Record the update_time of a document snapshot about to be delivered.
+
+        Returns False for a snapshot that is not newer than the one last delivered to the
+        listener, e.g. the initial snapshot of a re-opened watch. A None update_time (removed
+        document) forgets the document and is always delivered.
+        """
+        key = (listener_key, doc_id)
+        with self._delivery_lock:
+            if update_time is None:
+                self._delivered_update_times.pop(key, None)
+                return True
+            last = self._delivered_update_times.get(key)
+            if last is not None and update_time <= last:
+                return False
+            self._delivered_update_times[key] = update_time
+            return True
+
+    def _release_delivery(self, listener_key: str, doc_id: str, update_time: Any) -> None:
+        """Undo the claim of a snapshot that was not delivered (dropped by the dispatcher).
+
+        A re-opened watch then delivers the document again. A newer claim is kept.
+        """
+        key = (listener_key, doc_id)
+        with self._delivery_lock:
+            if update_time is not None and self._delivered_update_times.get(key) == update_time:
+                del self._delivered_update_times[key]
+
+    def _forget_deliveries(self, listener_key: str) -> None:
+        """Forget delivered snapshots of a listener, so a new registration gets the current data."""
+        with self._delivery_lock:
+            for key in [key for key in self._delivered_update_times if key[0] == listener_key]:
+                del self._delivered_update_times[key]
+
+    def _handle_root_snapshot(self, path: str, data: dict | None, update_time: Any, watch_key: str) -> None:
+        """Record a snapshot of a tracker root document (None if missing) from the watch of watch_key."""
+        with self._mirror_lock:
+            if self._mirror_root_documents:
+                self._root_mirror[path] = copy.deepcopy(data)
+                self._mirror_update_times[path] = update_time if data is not None else None
+            if data is not None and isinstance(data.get("timer"), dict):
+                self._timer_state[path] = (copy.deepcopy(data["timer"]), watch_key)
+            else:
+                self._timer_state.pop(path, None)
+
+    def _route_multiplexed_snapshot(
+        self,
+        collection_name: CollectionName,
+        watch_key: str,
+        changes: list,
+        deliver: Callable[[str, Callable, dict], bool],
+    ) -> None:
+        """Route the changed documents of the multiplexed watch of watch_key to each child's callback."""
+        for change in changes:
+            doc = change.document
+            data = None if change.type == ChangeType.REMOVED else doc.to_dict()
+            self._handle_root_snapshot(doc.reference.path, data, doc.update_time, watch_key)
+            listener_key = f"{collection_name}_{doc.id}"
+            registration = self._listener_callbacks.get(listener_key)
+            if registration is None or data is None:
+                continue
+            if self._claim_delivery(listener_key, doc.id, doc.update_time):
+                _LOGGER.debug("Real-time %s update received for child %s", collection_name, doc.id)
+                if not deliver(listener_key, registration[2], data):
+                    self._release_delivery(listener_key, doc.id, doc.update_time)
+
+    def _watch_multiplexed(
+        self, collection_name: CollectionName, child_uid: str, deliver: Callable[[str, Callable, dict], bool]
+    ) -> None:
+        """Add a child to the multiplexed watch of a collection.
+
+        Children are grouped in chunks of up to MULTIPLEX_MAX_DOCUMENTS ids (the limit of an
+        `in` filter), one watch stream per chunk. Only the chunk receiving the child is
+        re-opened; the new stream is started before the old one is closed. A child that is
+        already watched is re-registered by re-opening its chunk, whose first snapshot then
+        delivers the current document.
+        """
+        with self._listener_lock:
+            chunks = self._multiplex_chunks.setdefault(collection_name, [])
+            index = next((i for i, chunk in enumerate(chunks) if child_uid in chunk), None)
+            if index is None:
+                index = next(
+                    (i for i, chunk in enumerate(chunks) if len(chunk) < MULTIPLEX_MAX_DOCUMENTS), len(chunks)
+                )
+                if index == len(chunks):
+                    chunks.append([])
+                chunks[index].append(child_uid)
+        self._watch_multiplexed_chunk(collection_name, index, deliver)
+
+    def _watch_multiplexed_chunk(
+        self, collection_name: CollectionName, index: int, deliver: Callable[[str, Callable, dict], bool]
+    ) -> None:
+        """Open (or re-open) the watch stream of one chunk of a multiplexed collection."""
+        collection = self._get_listener_client().collection(collection_name)
+        listener_key = f"{collection_name}_multiplex_{index}"
+
+        def on_snapshot(doc_snapshot, changes, read_time):
+            """Handle snapshot updates."""
+            self._mark_listener_activity(listener_key)
+            self._route_multiplexed_snapshot(collection_name, listener_key, changes, deliver)
+
+        def open_watch():
+            # Read while the chunk's stream is being replaced, so the last opened stream
+            # always covers every child added to the chunk
+            with self._listener_lock:
+                child_uids = list(self._multiplex_chunks[collection_name][index])
+            query = collection.where(
+                filter=firestore.FieldFilter(
+                    FieldPath.document_id(), "in", [collection.document(uid) for uid in child_uids]
+                )
+            )
+            return query.on_snapshot(on_snapshot)
+
+        self._replace_watch(listener_key, open_watch)
+
+    def _watch_document(
+        self,
+        collection_name: CollectionName,
+        child_uid: str,
+        callback: Callable[[TDocumentData], None],
+        deliver: Callable[..., bool],
+    ) -> None:
+        """Open a watch stream on {collection}/{child_uid} (or join the multiplexed one)."""
+        listener_key = f"{collection_name}_{child_uid}"
+        # Store callback so the listener can be recreated (and multiplexed snapshots routed to it)
+        self._listener_callbacks[listener_key] = (collection_name, child_uid, callback)
+
+        if self._multiplex_listeners:
+            self._watch_multiplexed(collection_name, child_uid, deliver)
+            return
+
+        doc_ref = self._get_listener_client().collection(collection_name).document(child_uid)
+
+        # Create snapshot listener
+        def on_snapshot(doc_snapshot, changes, read_time):
+            """Handle snapshot updates."""
+            self._mark_listener_activity(listener_key)
+            for doc in doc_snapshot:
+                data = doc.to_dict() if doc.exists else None
+                self._handle_root_snapshot(doc_ref.path, data, doc.update_time, listener_key)
+                if data is not None and self._claim_delivery(listener_key, doc.id, doc.update_time):
+                    _LOGGER.debug("Real-time %s update received for child %s", collection_name, child_uid)
+                    if not deliver(listener_key, callback, data):
+                        self._release_delivery(listener_key, doc.id, doc.update_time)
+
+        # Start listening and store the unsubscribe function
+        self._replace_watch(listener_key, lambda: doc_ref.on_snapshot(on_snapshot))
+
+    def _watch_intervals(
+        self,
+        collection_name: CollectionName,
+        child_uid: str,
+        callback: Callable[[list[IntervalChange]], None],
+        lookback: float,
+        deliver: Callable[..., bool],
+    ) -> None:
+        """Open a watch stream on the recent intervals of a tracker."""
+        # Multi-entry documents nest their start times, so the query selects recently changed documents
+        query = (
+            self._get_listener_client()
+            .collection(collection_name)
+            .document(child_uid)
+            .collection(INTERVAL_SUBCOLLECTIONS[collection_name])
+            .where(filter=firestore.FieldFilter("lastUpdated", ">=", time.time() - lookback))
+        )
+        listener_key = f"{collection_name}_intervals_{child_uid}"
+
+        def on_snapshot(doc_snapshot, changes, read_time):
+            """Handle snapshot updates."""
+            self._mark_listener_activity(listener_key)
+            # Documents already delivered (e.g. before the watch was re-opened) are skipped
+            fresh = [
+                change
+                for change in changes
+                if self._claim_delivery(
+                    listener_key,
+                    change.document.id,
+                    None if change.type == ChangeType.REMOVED else change.document.update_time,
+                )
+            ]
+            # Entries are filtered by start against a window that moves with each snapshot
+            interval_changes = _interval_changes(collection_name, fresh, time.time() - lookback)
+            if interval_changes:
+                _LOGGER.debug("%d %s interval changes for child %s", len(interval_changes), collection_name, child_uid)
+                # Pending change lists are concatenated, not replaced, when coalesced
+                if not deliver(listener_key, callback, interval_changes, lambda pending, new: pending + new):
+                    for change in fresh:
+                        self._release_delivery(listener_key, change.document.id, change.document.update_time)
+
+        self._interval_listeners[listener_key] = (collection_name, child_uid, callback, lookback)
+        self._replace_watch(listener_key, lambda: query.on_snapshot(on_snapshot))
+
+    def _listener_restarts_due(self, stall_timeout: float, retry_interval: float, max_backoff: float) -> list[str]:
+        """Pick the watch streams the watchdog should restart now, see _due_listener_restarts."""
+        with self._listener_lock:
+            return _due_listener_restarts(
+                self._listeners, self._listener_health, time.time(), stall_timeout, retry_interval, max_backoff
+            )
+
+    def _restart_listener(self, listener_key: str, deliver: Callable[..., bool]) -> None:
+        """Re-open the watch stream of one listener key, keeping its registration and backoff."""
+        _LOGGER.info("Restarting listener %s", listener_key)
+        if listener_key in self._interval_listeners:
+            self._watch_intervals(*self._interval_listeners[listener_key], deliver)
+        elif "_multiplex_" in listener_key:
+            collection_name, _, index = listener_key.rpartition("_multiplex_")
+            self._watch_multiplexed_chunk(cast(CollectionName, collection_name), int(index), deliver)
+        elif listener_key in self._listener_callbacks:
+            self._watch_document(*self._listener_callbacks[listener_key], deliver)
+
+    def _stop_listeners(self) -> None:
+        """Close every watch stream and forget the registrations and state they maintained."""
+        with self._listener_lock:
+            listeners = dict(self._listeners)
+            self._listeners.clear()
+            self._listener_health.clear()
+            self._multiplex_chunks.clear()
+        for key, watch in listeners.items():
+            try:
+                if hasattr(watch, "unsubscribe") and callable(getattr(watch, "unsubscribe")):
+                    watch.unsubscribe()
+                elif hasattr(watch, "close") and callable(getattr(watch, "close")):
+                    watch.close()
+                else:
+                    _LOGGER.debug("Listener %s object has no unsubscribe/close", key)
+                _LOGGER.debug("Stopped listener: %s", key)
+            except Exception as err:
+                _LOGGER.error("Error stopping listener %s: %s", key, err)
+        if self._listener_dispatcher is not None:
+            self._listener_dispatcher.discard(set(self._listener_callbacks) | set(self._interval_listeners))
+        self._listener_callbacks.clear()
+        self._interval_listeners.clear()
+        with self._delivery_lock:
+            self._delivered_update_times.clear()
+        with self._mirror_lock:
+            self._root_mirror.clear()
+            self._mirror_update_times.clear()
+            self._timer_state.clear()
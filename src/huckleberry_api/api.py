@@ -1,83 +1,176 @@
 """API client for Huckleberry."""
 from __future__ import annotations
 
+import heapq
 import logging
+import random
+import threading
 import time
-import uuid
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Callable, Literal, TypeVar, cast
-from zoneinfo import ZoneInfo
+from typing import Any, Callable, Iterable, Iterator, cast
 
 import requests
-from google.auth.credentials import Credentials
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from google.api_core.exceptions import FailedPrecondition
 from google.cloud import firestore
-
-from .const import AUTH_URL, FIREBASE_API_KEY, REFRESH_URL
+from google.cloud.firestore_v1.field_path import FieldPath
+
+from ._common import (
+    CALENDAR_COLLECTIONS,
+    CHILD_DOCUMENT_FIELDS,
+    CollectionName,
+    DiaperAmount,
+    DiaperMode,
+    FeedSide,
+    FirebaseTokenCredentials,
+    HISTORY_TRACKERS,
+    INTERVAL_SUBCOLLECTIONS,
+    MeasurementUnits,
+    PooColor,
+    PooConsistency,
+    T,
+    TDocumentData,
+    _INTERVAL_LABELS,
+    _ClientBase,
+    _blind_timer_update,
+    _bottle_interval,
+    _bottle_prefs,
+    _build_multi_entry_index,
+    _bulk_write_history,
+    _cancel_feeding_update,
+    _cancel_sleep_update,
+    _child_ids_from_user,
+    _children_from_snapshots,
+    _complete_feeding_writes,
+    _complete_sleep_writes,
+    _decode_page_cursor,
+    _delta_callback,
+    _diaper_interval,
+    _diaper_prefs_update,
+    _encode_page_cursor,
+    _event_start,
+    _feed_timer_document,
+    _growth_data_from_health,
+    _growth_entry,
+    _growth_prefs_update,
+    _history_interval,
+    _history_prefs_writes,
+    _interval_event,
+    _interval_select_fields,
+    _iter_index_range,
+    _latest_history_intervals,
+    _merge_by_start,
+    _multi_entry_items,
+    _new_interval_id,
+    _next_token_refresh_at,
+    _pause_feeding_update,
+    _pause_sleep_update,
+    _refresh_token_rejected,
+    _resume_feeding_update,
+    _resume_sleep_update,
+    _sleep_timer_document,
+    _stored_tokens,
+    _switch_feeding_update,
+    _tagged_event_start,
+    _token_is_fresh,
+)
+from .const import AUTH_URL, FIREBASE_API_KEY, FIREBASE_PROJECT_ID, REFRESH_URL
+from .interval_store import SQLiteIntervalStore
+from .listener_dispatcher import ListenerDispatcher
+from .token_store import TokenStore
 from .types import (
     BottleType,
     ChildData,
     DiaperDocumentData,
     FeedDocumentData,
-    FirebaseBottleInterval,
-    FirebaseDiaperInterval,
-    FirebaseFeedDocument,
-    FirebaseGrowthData,
-    FirebaseSleepDocument,
+    FieldChange,
     GrowthData,
     HealthDocumentData,
-    LastBottleData,
-    LastDiaperData,
-    LastNursingData,
-    LastSideData,
-    LastSleepData,
+    HistoryImportEntry,
+    HistoryImportResult,
+    IntervalChange,
+    IntervalPage,
+    ListenerRestartResult,
     SleepDocumentData,
     VolumeUnits,
 )
 
-# Type aliases for known string values
-CollectionName = Literal["sleep", "feed", "health", "diaper"]
-FeedSide = Literal["left", "right"]
-DiaperMode = Literal["pee", "poo", "both", "dry"]
-DiaperAmount = Literal["little", "medium", "big"]
-PooColor = Literal["yellow", "brown", "black", "green", "red", "gray"]
-PooConsistency = Literal["solid", "loose", "runny", "mucousy", "hard", "pebbles", "diarrhea"]
-MeasurementUnits = Literal["metric", "imperial"]
-
-# Union type for all document data types used in listeners
-DocumentData = SleepDocumentData | FeedDocumentData | HealthDocumentData | DiaperDocumentData
-TDocumentData = TypeVar('TDocumentData', SleepDocumentData, FeedDocumentData, HealthDocumentData, DiaperDocumentData)
-
 _LOGGER = logging.getLogger(__name__)
 
 
-class FirebaseTokenCredentials(Credentials):
-    """Custom credentials class for Firebase SDK."""
+def _tag_events(collection_name: CollectionName, events: Iterable[dict]) -> Iterator[tuple[CollectionName, dict]]:
+    """Pair each event with the tracker it came from."""
+    for event in events:
+        yield collection_name, event
 
-    def __init__(self, id_token: str):
-        """Initialize with Firebase ID token."""
-        super().__init__()
-        self._id_token = id_token
-        self.token = id_token  # Set the token attribute that parent expects
 
-    def refresh(self, request):
-        """Token refresh is handled by HuckleberryAPI.
+def _create_auth_session(pool_size: int, max_retries: int, backoff_factor: float) -> requests.Session:
+    """Create a keep-alive session for Firebase auth endpoints with retry and backoff."""
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"POST"}),  # Auth endpoints are POST-only
+        raise_on_status=False,  # Let raise_for_status() surface the final response
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
 
-        This method is required by the Credentials interface but is not used.
-        Token refreshing is managed externally by HuckleberryAPI.refresh_auth_token(),
-        and a new FirebaseTokenCredentials instance is created with the refreshed token.
-        """
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session
 
 
-class HuckleberryAPI:
+class HuckleberryAPI(_ClientBase):
     """API client for Huckleberry."""
 
-    def __init__(self, email: str, password: str, timezone: str) -> None:
+    def __init__(
+        self,
+        email: str,
+        password: str,
+        timezone: str,
+        session: requests.Session | None = None,
+        pool_size: int = 10,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        token_store: TokenStore | None = None,
+        interval_store: SQLiteIntervalStore | None = None,
+        blind_timer_writes: bool = False,
+        mirror_root_documents: bool = False,
+        multiplex_listeners: bool = False,
+        listener_dispatcher: ListenerDispatcher | None = None,
+    ) -> None:
         """Initialize the API client.
 
         Args:
             email: User email for authentication.
             password: User password for authentication.
             timezone: IANA timezone string (e.g., "America/New_York", "Europe/London").
+            session: Optional requests session for auth requests. If not provided,
+                a keep-alive session is created and closed by close().
+            pool_size: Connection pool size of the created session.
+            max_retries: Retries of the created session on connection errors and 429/5xx responses.
+            backoff_factor: Exponential backoff factor between retries, in seconds.
+            token_store: Optional store (e.g. FileTokenStore) used to persist tokens
+                across restarts, so password sign-in is only needed when they are invalid.
+            interval_store: Optional local mirror of interval history. When set,
+                interval reads sync changed documents into it and are answered locally.
+            blind_timer_writes: Low-latency mode for pause/resume/switch/cancel transitions.
+                When the timer state is known from a snapshot of a still open listener, the
+                transition is a single update using server-side increments instead of a read plus write. Only
+                safe when other writers are seen by a listener. complete_* reads the timer
+                unless the document is mirrored (see mirror_root_documents).
+            mirror_root_documents: Keep a local copy of each tracker root document that has a
+                listener, updated by snapshots and by this client's writes. Timer transitions
+                and get_growth_data then use it instead of reading the document.
+            multiplex_listeners: Watch each collection with one document-ID `in` query for all
+                children that have a listener (up to 30 per stream), instead of one watch
+                stream per child and collection.
+            listener_dispatcher: Deliver listener callbacks from this dispatcher's worker
+                threads (coalescing pending updates per document) instead of calling them
+                on the Firestore watch thread.
         """
         self.email = email
         self.password = password
@@ -85,17 +178,27 @@ class HuckleberryAPI:
         self.refresh_token: str | None = None
         self.user_uid: str | None = None
         self.token_expires_at: float | None = None
+        self._owns_session = session is None
+        self._session = session or _create_auth_session(pool_size, max_retries, backoff_factor)
+        self._token_store = token_store
+        self._interval_store = interval_store
+        self._auth_lock = threading.RLock()  # Serializes sign-in and refresh across threads
+        self._refresher_thread: threading.Thread | None = None
+        self._refresher_stop = threading.Event()
+        self._watchdog_thread: threading.Thread | None = None
+        self._watchdog_stop = threading.Event()
         self._firestore_client: firestore.Client | None = None
-        self._timezone = ZoneInfo(timezone)
-        self._listeners: dict = {}  # Store active listeners
-        self._listener_callbacks: dict = {}  # Store callbacks to recreate listeners
+        self._init_client_state(
+            timezone, blind_timer_writes, mirror_root_documents, multiplex_listeners, listener_dispatcher
+        )
+        self._multi_entry_lock = threading.Lock()
 
     def authenticate(self) -> None:
         """Authenticate with Firebase."""
         _LOGGER.debug("Authenticating with Huckleberry")
 
         try:
-            response = requests.post(
+            response = self._session.post(
                 f"{AUTH_URL}?key={FIREBASE_API_KEY}",
                 json={
                     "email": self.email,
@@ -111,6 +214,8 @@ class HuckleberryAPI:
             self.refresh_token = data["refreshToken"]
             self.user_uid = data["localId"]
             self.token_expires_at = datetime.now().timestamp() + int(data["expiresIn"])
+            self._save_tokens()
+            self._update_credentials()
 
             _LOGGER.info("Successfully authenticated with Huckleberry")
         except requests.exceptions.HTTPError as err:
@@ -124,6 +229,14 @@ class HuckleberryAPI:
                     _LOGGER.error("Response: %s", err.response.text)
             raise
 
+    def close(self) -> None:
+        """Stop all listeners and release the HTTP session if owned by this instance."""
+        self.stop_token_refresher()
+        self.stop_listener_watchdog()
+        self.stop_all_listeners()
+        if self._owns_session:
+            self._session.close()
+
     def maintain_session(self) -> None:
         """Ensure the session is valid and refresh token if needed.
 
@@ -132,6 +245,79 @@ class HuckleberryAPI:
         """
         self._ensure_authenticated()
 
+    def start_token_refresher(
+        self, lead_time: float = 600.0, jitter: float = 60.0, retry_interval: float = 30.0
+    ) -> None:
+        """Start a background thread that refreshes the token ahead of expiry.
+
+        Refreshing before the inline 5 minute threshold of _ensure_authenticated
+        means no API call or listener callback has to wait for a refresh.
+
+        Args:
+            lead_time: Seconds before token_expires_at to refresh.
+            jitter: Up to this many extra seconds are randomly added to lead_time,
+                so many clients don't refresh at the same moment.
+            retry_interval: Base delay after a failed refresh, doubled on each consecutive failure.
+        """
+        if self._refresher_thread is not None and self._refresher_thread.is_alive():
+            return
+
+        self._refresher_stop.clear()
+        self._refresher_thread = threading.Thread(
+            target=self._run_token_refresher,
+            args=(lead_time, jitter, retry_interval),
+            name="huckleberry-token-refresher",
+            daemon=True,
+        )
+        self._refresher_stats["running"] = True
+        self._refresher_thread.start()
+        _LOGGER.info("Started background token refresher")
+
+    def stop_token_refresher(self) -> None:
+        """Stop the background token refresher, if running."""
+        thread = self._refresher_thread
+        if thread is None:
+            return
+
+        self._refresher_stop.set()
+        if thread is not threading.current_thread():
+            thread.join(timeout=15)
+        self._refresher_thread = None
+        self._refresher_stats["running"] = False
+        self._refresher_stats["next_refresh_at"] = None
+        _LOGGER.info("Stopped background token refresher")
+
+    def _run_token_refresher(self, lead_time: float, jitter: float, retry_interval: float) -> None:
+        """Refresh loop of the background token refresher."""
+        stats = self._refresher_stats
+        while not self._refresher_stop.is_set():
+            next_refresh_at = _next_token_refresh_at(stats, self.token_expires_at, lead_time, jitter, retry_interval)
+            stats["next_refresh_at"] = next_refresh_at
+            if self._refresher_stop.wait(max(next_refresh_at - time.time(), 0)):
+                break
+
+            started = time.monotonic()
+            try:
+                with self._auth_lock:
+                    if not self.id_token:
+                        self._ensure_authenticated()
+                    # Skip if a caller already refreshed while we were waiting
+                    elif self.token_expires_at is None or time.time() >= self.token_expires_at - lead_time - jitter:
+                        self.refresh_auth_token()
+            except Exception as err:
+                stats["failure_count"] += 1
+                stats["consecutive_failures"] += 1
+                stats["last_error"] = str(err)
+                _LOGGER.warning("Background token refresh failed (%d in a row): %s",
+                                stats["consecutive_failures"], err)
+                continue
+
+            stats["refresh_count"] += 1
+            stats["consecutive_failures"] = 0
+            stats["last_refresh_at"] = time.time()
+            stats["last_refresh_duration_sec"] = time.monotonic() - started
+            _LOGGER.debug("Background token refresh took %.3fs", stats["last_refresh_duration_sec"])
+
     def refresh_auth_token(self) -> None:
         """Refresh the authentication token."""
         if not self.refresh_token:
@@ -139,7 +325,7 @@ class HuckleberryAPI:
 
         _LOGGER.debug("Refreshing authentication token")
 
-        response = requests.post(
+        response = self._session.post(
             f"{REFRESH_URL}?key={FIREBASE_API_KEY}",
             json={
                 "grant_type": "refresh_token",
@@ -153,48 +339,101 @@ class HuckleberryAPI:
         self.id_token = data["id_token"]
         self.refresh_token = data["refresh_token"]
         self.token_expires_at = datetime.now().timestamp() + int(data["expires_in"])
+        self._save_tokens()
 
-        # Stop existing listeners (they use the old token)
-        for key, watch in self._listeners.items():
-            try:
-                if hasattr(watch, "unsubscribe") and callable(getattr(watch, "unsubscribe")):
-                    watch.unsubscribe()
-                elif hasattr(watch, "close") and callable(getattr(watch, "close")):
-                    watch.close()
-                _LOGGER.debug("Stopped listener %s before token refresh", key)
-            except Exception as err:
-                _LOGGER.error("Error stopping listener %s before refresh: %s", key, err)
-        self._listeners.clear()
-
-        # Invalidate the Firestore client so it gets recreated with new token
-        self._firestore_client = None
+        # Swap the token into the live credentials; the Firestore client and
+        # its watch streams pick it up without being recreated
+        self._update_credentials()
 
         _LOGGER.debug("Successfully refreshed authentication token")
 
-        # Recreate all listeners with new token
-        _LOGGER.info("Recreating %d listeners with refreshed token", len(self._listener_callbacks))
-        callbacks_copy = dict(self._listener_callbacks)  # Copy to avoid modification during iteration
-        for key, (listener_type, child_uid, callback) in callbacks_copy.items():
+    def _refresh_credentials(self) -> None:
+        """Refresh handler of FirebaseTokenCredentials, called by google-auth near expiry."""
+        with self._auth_lock:
+            if self.token_expires_at is None or datetime.now().timestamp() >= self.token_expires_at - 300:
+                self.refresh_auth_token()
+            else:
+                # Another caller already refreshed
+                self._update_credentials()
+
+    def _save_tokens(self) -> None:
+        """Persist current tokens to the token store, if one is configured."""
+        if self._token_store is None:
+            return
+
+        stored = _stored_tokens(self.id_token, self.refresh_token, self.user_uid, self.token_expires_at)
+        if stored is None:
+            return
+
+        try:
+            self._token_store.save(self.email, stored)
+        except Exception as err:
+            _LOGGER.warning("Failed to save tokens to token store: %s", err)
+
+    def _restore_tokens(self) -> bool:
+        """Restore tokens saved by a previous run, refreshing them if they are about to expire.
+
+        Returns:
+            True if a valid session was restored, False if password sign-in is needed.
+        """
+        if self._token_store is None:
+            return False
+
+        try:
+            stored = self._token_store.load(self.email)
+        except Exception as err:
+            _LOGGER.warning("Failed to load tokens from token store: %s", err)
+            return False
+
+        if not stored:
+            return False
+
+        self.id_token = stored["id_token"]
+        self.refresh_token = stored["refresh_token"]
+        self.user_uid = stored["user_uid"]
+        self.token_expires_at = stored["token_expires_at"]
+
+        if datetime.now().timestamp() >= self.token_expires_at - 300:
             try:
-                if listener_type == "sleep":
-                    self.setup_realtime_listener(child_uid, callback)
-                elif listener_type == "feed":
-                    self.setup_feed_listener(child_uid, callback)
-                elif listener_type == "health":
-                    self.setup_health_listener(child_uid, callback)
-                elif listener_type == "diaper":
-                    self.setup_diaper_listener(child_uid, callback)
-                _LOGGER.debug("Recreated %s listener for child %s", listener_type, child_uid)
-            except Exception as err:
-                _LOGGER.error("Error recreating %s listener for child %s: %s", listener_type, child_uid, err)
+                self.refresh_auth_token()
+            except requests.exceptions.RequestException as err:
+                if not _refresh_token_rejected(err.response.status_code if err.response is not None else None):
+                    # Transient failure: keep the stored tokens, the next call retries the refresh
+                    raise
+                self._discard_stored_tokens(err)
+                return False
+            except (KeyError, ValueError) as err:
+                self._discard_stored_tokens(err)
+                return False
+
+        self._update_credentials()
+        _LOGGER.info("Restored Huckleberry session from token store")
+        return True
+
+    def _discard_stored_tokens(self, err: Exception) -> None:
+        """Forget a session whose refresh token was rejected, in memory and in the token store."""
+        assert self._token_store is not None
+        _LOGGER.warning("Stored refresh token rejected, signing in with password: %s", err)
+        self.id_token = self.refresh_token = self.user_uid = self.token_expires_at = None
+        try:
+            self._token_store.clear(self.email)
+        except Exception as clear_err:
+            _LOGGER.warning("Failed to clear token store: %s", clear_err)
 
     def _ensure_authenticated(self) -> None:
-        """Ensure we have a valid authentication token."""
-        if not self.id_token:
-            self.authenticate()
-        elif self.token_expires_at and datetime.now().timestamp() >= self.token_expires_at - 300:
-            # Refresh if token expires in less than 5 minutes
-            self.refresh_auth_token()
+        """Ensure we have a valid authentication token.
+
+        Tokens from the token store are tried before signing in with password.
+        """
+        # Only contend for the lock (held by the background refresher while it refreshes) if needed
+        if _token_is_fresh(self.id_token, self.token_expires_at):
+            return
+        with self._auth_lock:
+            if not self.id_token:
+                if not self._restore_tokens():
+                    self.authenticate()
+            elif not _token_is_fresh(self.id_token, self.token_expires_at):
+                self.refresh_auth_token()
 
     def _get_headers(self) -> dict[str, str]:
         """Get headers for API requests."""
@@ -208,95 +447,113 @@ class HuckleberryAPI:
         """Get or create Firestore client."""
         self._ensure_authenticated()
 
-        # Create new client if token changed or client doesn't exist
+        # The client is kept across token refreshes, see _update_credentials
         if not self._firestore_client:
             assert self.id_token is not None, "id_token should be set after authentication"
-            credentials = FirebaseTokenCredentials(self.id_token)
+            self._credentials = FirebaseTokenCredentials(
+                self.id_token, self.token_expires_at, refresh_handler=self._refresh_credentials
+            )
             self._firestore_client = firestore.Client(
-                project="simpleintervals",
-                credentials=credentials,
+                project=FIREBASE_PROJECT_ID,
+                credentials=self._credentials,
             )
 
         return self._firestore_client
 
-    def _get_timezone_offset_minutes(self) -> float:
-        """Get current timezone offset in minutes.
+    def _get_listener_client(self) -> firestore.Client:
+        """Get the Firestore client used for watch streams, the same as for all other calls."""
+        return self._get_firestore_client()
+
+    def _run_timer_transition(
+        self,
+        doc_ref: firestore.DocumentReference,
+        transition: Callable[[dict | None, float], T | None],
+        stage: Callable[[firestore.Transaction | firestore.WriteBatch, T, Any], None] | None = None,
+    ) -> T | None:
+        """Read the timer and commit the transition's writes in one transaction.
+
+        The transaction is retried with a fresh read if the document is changed concurrently
+        (e.g. by the phone app). The read is skipped when the document is mirrored: the write
+        then carries the mirrored update_time as precondition, and falls back to the transaction
+        if the document has changed since. With blind_timer_writes, the read is also skipped when
+        the timer state is known locally and there is no custom stage.
+
+        Args:
+            doc_ref: Tracker document holding the timer
+            transition: Builds the writes from (document data, now), or returns None for no change
+            stage: Adds the writes to the transaction (or batch) given the write option to pass to
+                the update of doc_ref (None in a transaction); by default the result updates doc_ref
 
-        Calculates offset dynamically to handle DST changes.
-        Returns negative for UTC+ timezones (e.g., -120 for UTC+2).
+        Returns:
+            Result of the transition from the committed attempt
+        """
+        client = self._get_firestore_client()
+        unread = self._unread_timer_document(doc_ref.path, stage is not None)
+        if unread is not None:
+            data, option = unread
+            result = transition(data, time.time())
+            if result is None:
+                return None
+            try:
+                if stage is None:
+                    update = cast(dict, result)
+                    if option is None:
+                        update = _blind_timer_update(update, (data or {}).get("timer") or {})
+                    write_result = doc_ref.update(update, option=option)
+                    self._apply_local_write(doc_ref.path, cast(dict, result), update_time=write_result.update_time)
+                else:
+                    batch = client.batch()
+                    stage(batch, result, option)
+                    batch.commit()
+                return result
+            except FailedPrecondition:
+                _LOGGER.debug("%s changed since its mirrored snapshot, reading it in a transaction", doc_ref.path)
+
+        @firestore.transactional
+        def run(transaction: firestore.Transaction) -> T | None:
+            doc = doc_ref.get(field_paths=["timer"], transaction=transaction, timeout=10.0)
+            data = (doc.to_dict() or {}) if doc.exists else None
+            result = transition(data, time.time())
+            if result is not None:
+                if stage is None:
+                    transaction.update(doc_ref, cast(dict, result))
+                else:
+                    stage(transaction, result, None)
+            return result
+
+        result = run(client.transaction())
+        if result is not None and stage is None:
+            self._apply_local_write(doc_ref.path, cast(dict, result))
+        return result
+
+    def get_children(self, field_mask: bool = True) -> list[ChildData]:
+        """Get list of children from user profile.
+
+        All child documents are fetched in a single batch read.
+
+        Args:
+            field_mask: Only download the document fields mapped into ChildData.
         """
-        now = datetime.now(self._timezone)
-        offset = now.utcoffset()
-        if offset is None:
-            return 0.0
-        return -offset.total_seconds() / 60
-
-    def get_children(self) -> list[ChildData]:
-        """Get list of children from user profile."""
         _LOGGER.debug("Fetching children list")
 
         try:
             # Get Firestore client
             db = self._get_firestore_client()
 
-            # Get user document which contains lastChild reference
-            user_ref = db.collection("users").document(self.user_uid)
-            user_doc = user_ref.get()
-
-            if not user_doc.exists:
-                _LOGGER.error("User document not found")
-                return []
-
-            user_data = user_doc.to_dict()
-            if not user_data:
-                _LOGGER.error("User document has no data")
+            # Get user document which contains the childList
+            user_doc = db.collection("users").document(self.user_uid).get(
+                field_paths=["childList"] if field_mask else None
+            )
+            child_ids = _child_ids_from_user(user_doc.to_dict() if user_doc.exists else None)
+            if not child_ids:
                 return []
 
-            child_list = user_data.get("childList")
-            if not child_list:
-                _LOGGER.error("No childList found in user document")
+            child_refs = [db.collection("childs").document(child_id) for child_id in child_ids]
+            snapshots = db.get_all(child_refs, field_paths=CHILD_DOCUMENT_FIELDS if field_mask else None)
+            children = _children_from_snapshots(child_ids, snapshots)
+            if not children:
                 return []
 
-            children = []
-            for child in user_data.get("childList"):
-                child_id = child.get("cid")
-
-                if not child_id:
-                    _LOGGER.warning("Child id not found in childList")
-                    return []
-
-                # Get child document
-                child_ref = db.collection("childs").document(child_id)
-                child_doc = child_ref.get()
-
-                if not child_doc.exists:
-                    _LOGGER.error("Child document not found: %s", child_id)
-                    return []
-
-                child_data = child_doc.to_dict()
-                if not child_data:
-                    _LOGGER.error("Child document has no data: %s", child_id)
-                    return []
-
-                # Name may appear as 'childsName' in some documents
-                display_name = child_data.get("name") or child_data.get("childsName") or "Unknown"
-
-                child: ChildData = {
-                    "uid": child_id,
-                    "name": display_name,
-                    "birthday": child_data.get("birthdate"),
-                    "picture": child_data.get("picture"),
-                    "gender": child_data.get("gender"),
-                    "color": child_data.get("color"),
-                    "created_at": child_data.get("createdAt"),
-                    "night_start_min": child_data.get("nightStart"),
-                    "morning_cutoff_min": child_data.get("morningCutoff"),
-                    "expected_naps": child_data.get("naps"),
-                    "categories": child_data.get("categories"),
-                }
-
-                children.append(child)
-
             _LOGGER.info("Found %d children", len(children))
             return children
 
@@ -311,50 +568,10 @@ class HuckleberryAPI:
         client = self._get_firestore_client()
         sleep_ref = client.collection("sleep").document(child_uid)
 
-        current_time = time.time()
-        current_time_ms = current_time * 1000  # Milliseconds for timerStartTime
-
-        # Generate a unique session UUID (16 hex characters like the app)
-        session_uuid = uuid.uuid4().hex[:16]
-
         # Update the timer field to mark sleep as active
-        # Match the structure from the Huckleberry app
-        sleep_data: FirebaseSleepDocument = {
-            "timer": {
-                "active": True,
-                "paused": False,
-                "timestamp": {"seconds": current_time},
-                "local_timestamp": current_time,
-                "timerStartTime": current_time_ms,  # Milliseconds timestamp
-                "uuid": session_uuid,  # Unique session identifier
-                "details": {
-                    "startSleepCondition": {
-                        "happy": False,
-                        "longTimeToFallAsleep": False,
-                        "10-20_minutes": False,
-                        "upset": False,
-                        "under_10_minutes": False,
-                    },
-                    "sleepLocations": {
-                        "car": False,
-                        "nursing": False,
-                        "wornOrHeld": False,
-                        "stroller": False,
-                        "coSleep": False,
-                        "nextToCarer": False,
-                        "onOwnInBed": False,
-                        "bottle": False,
-                        "swing": False,
-                    },
-                    "endSleepCondition": {
-                        "happy": False,
-                        "wokeUpChild": False,
-                        "upset": False,
-                    },
-                },
-            }
-        }
+        sleep_data = _sleep_timer_document(time.time())
         sleep_ref.set(cast(dict, sleep_data), merge=True)
+        self._apply_local_write(sleep_ref.path, cast(dict, sleep_data), merge=True)
 
         _LOGGER.info("Sleep tracking started successfully")
 
@@ -365,33 +582,12 @@ class HuckleberryAPI:
         client = self._get_firestore_client()
         sleep_ref = client.collection("sleep").document(child_uid)
 
-        # Check if timer is active
-        sleep_doc = sleep_ref.get(timeout=10.0)
-        if not sleep_doc.exists:
-            _LOGGER.warning("No sleep document to pause for %s", child_uid)
-            return
-
-        timer = sleep_doc.to_dict().get("timer", {})
-        if not timer.get("active", False):
-            _LOGGER.info("Sleep is not active for %s, ignoring pause request", child_uid)
-            return
-
-        if timer.get("paused", False):
-            _LOGGER.info("Sleep is already paused for %s", child_uid)
+        update = self._run_timer_transition(
+            sleep_ref, lambda data, now: _pause_sleep_update(child_uid, data, now)
+        )
+        if update is None:
             return
 
-        now = time.time()
-        timer_end_time_ms = now * 1000  # Convert to milliseconds
-
-        # Add timerEndTime field that app uses to show end time when paused
-        sleep_ref.update({
-            "timer.paused": True,
-            "timer.active": True,
-            "timer.timerEndTime": timer_end_time_ms,
-            "timer.timestamp": {"seconds": now},
-            "timer.local_timestamp": now,
-        })
-
         _LOGGER.info("Sleep paused for child %s", child_uid)
 
     def resume_sleep(self, child_uid: str) -> None:
@@ -401,29 +597,12 @@ class HuckleberryAPI:
         client = self._get_firestore_client()
         sleep_ref = client.collection("sleep").document(child_uid)
 
-        # Check if timer is active and paused
-        sleep_doc = sleep_ref.get(timeout=10.0)
-        if not sleep_doc.exists:
-            _LOGGER.warning("No sleep document to resume for %s", child_uid)
-            return
-
-        timer = sleep_doc.to_dict().get("timer", {})
-        if not timer.get("active", False):
-            _LOGGER.info("Sleep is not active for %s, ignoring resume request", child_uid)
-            return
-
-        if not timer.get("paused", False):
-            _LOGGER.info("Sleep is not paused for %s, ignoring resume request", child_uid)
+        update = self._run_timer_transition(
+            sleep_ref, lambda data, now: _resume_sleep_update(child_uid, data, now)
+        )
+        if update is None:
             return
 
-        now = time.time()
-        sleep_ref.update({
-            "timer.paused": False,
-            "timer.active": True,
-            "timer.timestamp": {"seconds": now},
-            "timer.local_timestamp": now,
-        })
-
         _LOGGER.info("Sleep resumed for child %s", child_uid)
 
     def cancel_sleep(self, child_uid: str) -> None:
@@ -433,32 +612,7 @@ class HuckleberryAPI:
         client = self._get_firestore_client()
         sleep_ref = client.collection("sleep").document(child_uid)
 
-        # Check current state
-        doc = sleep_ref.get(timeout=10.0)
-        if doc.exists:
-            timer_data = doc.to_dict()
-            if timer_data:
-                timer = timer_data.get("timer", {})
-                _LOGGER.info("Current timer state: active=%s, paused=%s", timer.get("active"), timer.get("paused"))
-                session_uuid = timer.get("uuid", uuid.uuid4().hex[:16])
-            else:
-                session_uuid = uuid.uuid4().hex[:16]
-        else:
-            _LOGGER.warning("Sleep document does not exist for child %s", child_uid)
-            session_uuid = uuid.uuid4().hex[:16]
-
-        # Set timer to inactive (don't delete it - app expects it to remain)
-        current_time = time.time()
-        sleep_ref.update({
-            "timer": {
-                "active": False,
-                "paused": False,
-                "timestamp": {"seconds": current_time},
-                "timerStartTime": None,
-                "uuid": session_uuid,
-                "local_timestamp": current_time,
-            },
-        })
+        self._run_timer_transition(sleep_ref, lambda data, now: _cancel_sleep_update(child_uid, data, now))
 
         _LOGGER.info("Sleep cancelled for child %s", child_uid)
 
@@ -469,80 +623,30 @@ class HuckleberryAPI:
         client = self._get_firestore_client()
         sleep_ref = client.collection("sleep").document(child_uid)
 
-        sleep_doc = sleep_ref.get(timeout=10.0)
-        if not sleep_doc.exists:
-            _LOGGER.warning("No active sleep document to complete for %s", child_uid)
-            return
-
-        data = sleep_doc.to_dict() or {}
-        timer = data.get("timer") or {}
-
-        # Check if timer is already inactive (already completed)
-        if not timer.get("active", False):
-            _LOGGER.info("Sleep already completed for %s, ignoring duplicate request", child_uid)
+        def stage(
+            transaction: firestore.Transaction | firestore.WriteBatch,
+            writes: tuple[str | None, dict | None, dict],
+            option: Any,
+        ) -> None:
+            # Interval and root update are committed atomically with the timer read
+            interval_id, interval, root_update = writes
+            if interval_id is not None and interval is not None:
+                transaction.set(sleep_ref.collection("intervals").document(interval_id), interval)
+            transaction.update(sleep_ref, root_update, option=option)
+
+        writes = self._run_timer_transition(
+            sleep_ref,
+            lambda data, now: _complete_sleep_writes(child_uid, data, now, self._get_timezone_offset_minutes()),
+            stage,
+        )
+        if writes is None:
             return
 
-        timer_start_ms = timer.get("timerStartTime")
-        if not timer_start_ms:
-            # Attempt fallback: reconstruct using timestamp.seconds if available
-            ts_seconds = timer.get("timestamp", {}).get("seconds")
-            if ts_seconds:
-                timer_start_ms = int(float(ts_seconds) * 1000)
-                _LOGGER.warning("timerStartTime missing; falling back to timestamp.seconds for %s", child_uid)
-            else:
-                _LOGGER.warning("Missing timerStartTime; cannot compute duration for %s", child_uid)
-                sleep_ref.update({"timer": firestore.DELETE_FIELD})
-                return
-
-        now_ms = time.time() * 1000
-
-        # If sleep is paused, use timerEndTime as the end time (not current time)
-        if timer.get("paused", False) and "timerEndTime" in timer:
-            end_ms = timer["timerEndTime"]
-            _LOGGER.info("Sleep is paused, using timerEndTime for completion")
-        else:
-            end_ms = now_ms
-
-        duration_sec = int((end_ms - float(timer_start_ms)) / 1000)
-        start_sec = int(float(timer_start_ms) / 1000)
-
-        intervals_ref = sleep_ref.collection("intervals")
-        interval_id = uuid.uuid4().hex[:16]
-        intervals_ref.document(interval_id).set({
-            "_id": interval_id,
-            "start": start_sec,
-            "duration": duration_sec,
-            "offset": self._get_timezone_offset_minutes(),
-            "end_offset": self._get_timezone_offset_minutes(),
-            "details": timer.get("details", {}),
-            "lastUpdated": time.time(),
-        })
-
-        # Set timer to inactive (match stop_sleep behavior)
-        current_time = time.time()
-        session_uuid = timer.get("uuid", uuid.uuid4().hex[:16])
-
-        last_sleep_data: LastSleepData = {
-            "start": start_sec,
-            "duration": duration_sec,
-            "offset": self._get_timezone_offset_minutes(),
-        }
-
-        sleep_ref.update({
-            "timer": {
-                "active": False,
-                "paused": False,
-                "timestamp": {"seconds": current_time},
-                "timerStartTime": None,
-                "uuid": session_uuid,
-                "local_timestamp": current_time,
-            },
-            "prefs.lastSleep": last_sleep_data,
-            "prefs.timestamp": {"seconds": current_time},
-            "prefs.local_timestamp": current_time,
-        })
-
-        _LOGGER.info("Sleep completed for child %s (duration %ss)", child_uid, duration_sec)
+        _, interval, root_update = writes
+        self._apply_local_write(sleep_ref.path, root_update)
+        if interval is not None:
+            self._mark_intervals_stale("sleep", child_uid)
+            _LOGGER.info("Sleep completed for child %s (duration %ss)", child_uid, interval["duration"])
 
     def start_feeding(self, child_uid: str, side: FeedSide = "left") -> None:
         """Start feeding tracking."""
@@ -551,26 +655,9 @@ class HuckleberryAPI:
         client = self._get_firestore_client()
         feed_ref = client.collection("feed").document(child_uid)
 
-        current_time = time.time()
-
-        session_uuid = uuid.uuid4().hex[:16]
-
-        feed_data: FirebaseFeedDocument = {
-            "timer": {
-                "active": True,
-                "paused": False,
-                "timestamp": {"seconds": current_time},
-                "local_timestamp": current_time,
-                "feedStartTime": current_time,
-                "timerStartTime": current_time,
-                "uuid": session_uuid,
-                "leftDuration": 0.0,
-                "rightDuration": 0.0,
-                "lastSide": "left",  # Always start with lastSide as left
-                "activeSide": side,  # activeSide indicates which side is currently feeding
-            }
-        }
+        feed_data = _feed_timer_document(time.time(), side)
         feed_ref.set(cast(dict, feed_data), merge=True)
+        self._apply_local_write(feed_ref.path, cast(dict, feed_data), merge=True)
 
         _LOGGER.info("Feeding started on %s side", side)
 
@@ -581,55 +668,13 @@ class HuckleberryAPI:
         client = self._get_firestore_client()
         feed_ref = client.collection("feed").document(child_uid)
 
-        doc = feed_ref.get(timeout=10.0)
-        if not doc.exists:
-            _LOGGER.warning("Feed document not found")
-            return
-
-        timer_data = doc.to_dict()
-        if not timer_data:
-            _LOGGER.warning("Feed document has no data")
-            return
-
-        timer = timer_data.get("timer", {})
-
-        if not timer.get("active", False):
-            _LOGGER.info("Feeding is not active for %s, ignoring pause request", child_uid)
-            return
-
-        if timer.get("paused", False):
-            _LOGGER.info("Feeding is already paused for %s", child_uid)
+        update = self._run_timer_transition(
+            feed_ref, lambda data, now: _pause_feeding_update(child_uid, data, now)
+        )
+        if update is None:
             return
-        current_side = timer.get("activeSide", timer.get("lastSide", "left"))
-
-        # Calculate elapsed time and accumulate to current side
-        now = time.time()
-        timer_start = timer.get("timerStartTime", now)
-        elapsed = now - timer_start
-
-        left_duration = timer.get("leftDuration", 0.0)
-        right_duration = timer.get("rightDuration", 0.0)
 
-        if current_side == "left":
-            left_duration += elapsed
-        else:
-            right_duration += elapsed
-
-        feed_ref.update({
-            "timer.paused": True,
-            "timer.active": True,
-            "timer.timestamp": {"seconds": now},
-            "timer.local_timestamp": now,
-            "timer.leftDuration": left_duration,
-            "timer.rightDuration": right_duration,
-            "timer.lastSide": current_side,
-        })
-
-        # Remove activeSide when paused
-        from google.cloud.firestore import DELETE_FIELD
-        feed_ref.update({"timer.activeSide": DELETE_FIELD})
-
-        _LOGGER.info("Feeding paused (L:%ss R:%ss)", left_duration, right_duration)
+        _LOGGER.info("Feeding paused (L:%ss R:%ss)", update["timer.leftDuration"], update["timer.rightDuration"])
 
     def resume_feeding(self, child_uid: str, side: FeedSide | None = None) -> None:
         """Resume paused feeding session."""
@@ -638,41 +683,13 @@ class HuckleberryAPI:
         client = self._get_firestore_client()
         feed_ref = client.collection("feed").document(child_uid)
 
-        doc = feed_ref.get(timeout=10.0)
-        if not doc.exists:
-            _LOGGER.warning("Feed document not found")
-            return
-
-        timer_data = doc.to_dict()
-        if not timer_data:
-            _LOGGER.warning("Feed document has no data")
-            return
-
-        timer = timer_data.get("timer", {})
-
-        if not timer.get("active", False):
-            _LOGGER.info("Feeding is not active for %s, ignoring resume request", child_uid)
-            return
-
-        if not timer.get("paused", False):
-            _LOGGER.info("Feeding is not paused for %s, ignoring resume request", child_uid)
+        update = self._run_timer_transition(
+            feed_ref, lambda data, now: _resume_feeding_update(child_uid, data, now, side)
+        )
+        if update is None:
             return
-        if side is None:
-            side = timer.get("lastSide", "left")
-
-        now = time.time()
-
-        feed_ref.update({
-            "timer.paused": False,
-            "timer.active": True,
-            "timer.timestamp": {"seconds": now},
-            "timer.local_timestamp": now,
-            "timer.timerStartTime": now,  # Reset timer start time on resume
-            "timer.activeSide": side,
-            "timer.lastSide": "none",  # Set to none during transition
-        })
 
-        _LOGGER.info("Feeding resumed on %s", side)
+        _LOGGER.info("Feeding resumed on %s", update["timer.activeSide"])
 
     def switch_feeding_side(self, child_uid: str) -> None:
         """Switch feeding side (left <-> right)."""
@@ -681,54 +698,14 @@ class HuckleberryAPI:
         client = self._get_firestore_client()
         feed_ref = client.collection("feed").document(child_uid)
 
-        doc = feed_ref.get(timeout=10.0)
-        if not doc.exists:
-            _LOGGER.warning("Feed document not found")
-            return
-
-        timer_data = doc.to_dict()
-        if not timer_data:
-            _LOGGER.warning("Feed document has no data")
-            return
-
-        timer = timer_data.get("timer", {})
-
-        if not timer.get("active", False):
-            _LOGGER.info("Feeding is not active for %s, ignoring switch request", child_uid)
+        update = self._run_timer_transition(
+            feed_ref, lambda data, now: _switch_feeding_update(child_uid, data, now)
+        )
+        if update is None:
             return
-        current_side = timer.get("activeSide", timer.get("lastSide", "left"))
-        new_side = "right" if current_side == "left" else "left"
-        is_paused = timer.get("paused", False)
 
-        now = time.time()
-        left_duration = timer.get("leftDuration", 0.0)
-        right_duration = timer.get("rightDuration", 0.0)
-
-        # Only accumulate duration if NOT paused
-        if not is_paused:
-            # Calculate duration since timer started and accumulate to current side
-            timer_start = timer.get("timerStartTime", now)
-            elapsed = now - timer_start
-
-            if current_side == "left":
-                left_duration += elapsed
-            else:
-                right_duration += elapsed
-
-        update_data = {
-            "timer.paused": False,  # Switching always resumes
-            "timer.lastSide": "none",  # Set to none during transition
-            "timer.timestamp": {"seconds": now},
-            "timer.local_timestamp": now,
-            "timer.timerStartTime": now,  # Always reset timer start time
-            "timer.activeSide": new_side,  # Always set active side
-            "timer.leftDuration": left_duration,
-            "timer.rightDuration": right_duration,
-        }
-
-        feed_ref.update(update_data)
-
-        _LOGGER.info("Switched from %s to %s (L:%ss R:%ss)", current_side, new_side, left_duration, right_duration)
+        _LOGGER.info("Switched to %s (L:%ss R:%ss)", update["timer.activeSide"], update["timer.leftDuration"],
+                     update["timer.rightDuration"])
 
     def cancel_feeding(self, child_uid: str) -> None:
         """Cancel current feeding without saving."""
@@ -737,31 +714,7 @@ class HuckleberryAPI:
         client = self._get_firestore_client()
         feed_ref = client.collection("feed").document(child_uid)
 
-        doc = feed_ref.get(timeout=10.0)
-        if doc.exists:
-            timer_data = doc.to_dict()
-            if timer_data:
-                timer = timer_data.get("timer", {})
-                session_uuid = timer.get("uuid", uuid.uuid4().hex[:16])
-            else:
-                session_uuid = uuid.uuid4().hex[:16]
-        else:
-            session_uuid = uuid.uuid4().hex[:16]
-
-        current_time = time.time()
-        feed_ref.update({
-            "timer": {
-                "active": False,
-                "paused": False,
-                "timestamp": {"seconds": current_time},
-                "timerStartTime": None,
-                "uuid": session_uuid,
-                "local_timestamp": current_time,
-                "leftDuration": 0.0,
-                "rightDuration": 0.0,
-                "lastSide": "left",
-            },
-        })
+        self._run_timer_transition(feed_ref, _cancel_feeding_update)
 
         _LOGGER.info("Feeding cancelled")
 
@@ -772,107 +725,33 @@ class HuckleberryAPI:
         client = self._get_firestore_client()
         feed_ref = client.collection("feed").document(child_uid)
 
-        doc = feed_ref.get(timeout=10.0)
-        if not doc.exists:
-            _LOGGER.warning("No active feed document to complete")
-            return
-
-        data = doc.to_dict() or {}
-        timer = data.get("timer") or {}
-
-        # Check if timer is already inactive (already completed)
-        if not timer.get("active", False):
-            _LOGGER.info("Feeding already completed for %s, ignoring duplicate request", child_uid)
-            return
-
-        timer_start = timer.get("timerStartTime")
-        if not timer_start:
-            _LOGGER.warning("Missing timerStartTime for feeding")
-            return
-
-        now_time = time.time()
-        # timerStartTime is in seconds for feeding
-        timer_start_sec = float(timer_start)
-
-        left_duration = timer.get("leftDuration", 0.0)
-        right_duration = timer.get("rightDuration", 0.0)
-
-        # Add elapsed time on current side if not paused
-        if not timer.get("paused", False):
-            elapsed = now_time - timer_start_sec
-            current_side = timer.get("activeSide", timer.get("lastSide", "left"))
-
-            if current_side == "left":
-                left_duration += elapsed
-            else:
-                right_duration += elapsed
-
-        # Calculate total duration from accumulated durations
-        total_duration = left_duration + right_duration
-
-        session_uuid = timer.get("uuid", uuid.uuid4().hex[:16])
-        feed_start_time = timer.get("feedStartTime", timer_start_sec)
-
-        # Determine last side for history
-        last_side_value = timer.get("activeSide", timer.get("lastSide", "right"))
-        if last_side_value == "none":
-            last_side_value = "right" if right_duration >= left_duration else "left"
-
-        from google.cloud.firestore import DELETE_FIELD
-
-        # Create interval document ID (format: timestamp-random)
-        interval_id = f"{int(now_time * 1000)}-{uuid.uuid4().hex[:20]}"
-
-        # Create interval document for history (feed/{child_uid}/intervals)
-        feed_intervals_ref = feed_ref.collection("intervals").document(interval_id)
+        def stage(
+            transaction: firestore.Transaction | firestore.WriteBatch, writes: tuple[str, dict, dict], option: Any
+        ) -> None:
+            # Create interval document for history (feed/{child_uid}/intervals) and update the timer atomically
+            interval_id, interval, root_update = writes
+            transaction.set(feed_ref.collection("intervals").document(interval_id), interval)
+            transaction.update(feed_ref, root_update, option=option)
 
         try:
-            feed_intervals_ref.set({
-                "mode": "breast",
-                "start": feed_start_time,
-                "lastSide": last_side_value,
-                "lastUpdated": now_time,
-                "leftDuration": left_duration,
-                "rightDuration": right_duration,
-                "offset": self._get_timezone_offset_minutes(),
-                "end_offset": self._get_timezone_offset_minutes(),
-            })
-            _LOGGER.info("Created feeding interval entry: %s", interval_id)
+            writes = self._run_timer_transition(
+                feed_ref,
+                lambda data, now: _complete_feeding_writes(child_uid, data, now, self._get_timezone_offset_minutes()),
+                stage,
+            )
         except Exception as err:
-            _LOGGER.error("Failed to create feeding interval entry: %s", err)
-
-        last_nursing_data: LastNursingData = {
-            "mode": "breast",
-            "start": feed_start_time,
-            "duration": total_duration,
-            "leftDuration": left_duration,
-            "rightDuration": right_duration,
-            "offset": self._get_timezone_offset_minutes(),
-        }
+            _LOGGER.error("Failed to complete feeding: %s", err)
+            raise
+        if writes is None:
+            return
 
-        last_side_data: LastSideData = {
-            "start": feed_start_time,
-            "lastSide": last_side_value,
-        }
+        interval_id, interval, root_update = writes
+        self._apply_local_write(feed_ref.path, root_update)
+        self._mark_intervals_stale("feed", child_uid)
+        _LOGGER.info("Created feeding interval entry: %s", interval_id)
 
-        # Update to inactive and save to lastNursing
-        feed_ref.update({
-            "timer.active": False,
-            "timer.paused": True,
-            "timer.timestamp": {"seconds": now_time},
-            "timer.local_timestamp": now_time,
-            "timer.lastSide": last_side_value,
-            "timer.leftDuration": DELETE_FIELD,  # Remove durations from timer
-            "timer.rightDuration": DELETE_FIELD,
-            "timer.activeSide": DELETE_FIELD,  # Remove activeSide
-            "prefs.lastNursing": last_nursing_data,
-            "prefs.lastSide": last_side_data,
-            "prefs.timestamp": {"seconds": now_time},
-            "prefs.local_timestamp": now_time,
-        })
-
-        _LOGGER.info("Feeding completed (total duration %ss, L:%ss R:%ss)", total_duration, left_duration,
-                     right_duration)
+        _LOGGER.info("Feeding completed (total duration %ss, L:%ss R:%ss)",
+                     root_update["prefs.lastNursing"]["duration"], interval["leftDuration"], interval["rightDuration"])
 
     def log_bottle_feeding(
         self,
@@ -898,56 +777,50 @@ class HuckleberryAPI:
         feed_ref = client.collection("feed").document(child_uid)
 
         now_time = time.time()
-        interval_id = f"{int(now_time * 1000)}-{uuid.uuid4().hex[:20]}"
+        interval_id = _new_interval_id(now_time)
+
+        offset = self._get_timezone_offset_minutes()
 
         # Create interval document for bottle feeding
-        bottle_entry: FirebaseBottleInterval = {
-            "mode": "bottle",
-            "start": now_time,
-            "lastUpdated": now_time,
-            "bottleType": bottle_type,
-            "amount": amount,
-            "units": units,
-            "offset": self._get_timezone_offset_minutes(),
-            "end_offset": self._get_timezone_offset_minutes(),
-        }
+        bottle_entry = _bottle_interval(now_time, offset, amount, bottle_type, units)
 
-        # Create interval document
-        feed_intervals_ref = feed_ref.collection("intervals").document(interval_id)
+        # Write the interval document together with prefs.lastBottle and document-level bottle preferences
+        batch = client.batch()
+        batch.set(feed_ref.collection("intervals").document(interval_id), cast(dict, bottle_entry))
+        prefs = _bottle_prefs(now_time, offset, amount, bottle_type, units)
+        batch.set(feed_ref, prefs, merge=True)
 
         try:
-            feed_intervals_ref.set(cast(dict, bottle_entry))
+            batch.commit()
             _LOGGER.info("Created bottle feeding interval entry: %s", interval_id)
+            self._apply_local_write(feed_ref.path, prefs, merge=True)
+            self._mark_intervals_stale("feed", child_uid)
         except Exception as err:
             _LOGGER.error("Failed to create bottle feeding interval entry: %s", err)
             raise RuntimeError(f"Failed to log bottle feeding: {err}") from err
 
-        # Update prefs.lastBottle and document-level bottle preferences
-        last_bottle_data: LastBottleData = {
-            "mode": "bottle",
-            "start": now_time,
-            "bottleType": bottle_type,
-            "bottleAmount": amount,
-            "bottleUnits": units,
-            "offset": self._get_timezone_offset_minutes(),
-        }
-
-        feed_ref.set({
-            "prefs": {
-                "lastBottle": last_bottle_data,
-                "bottleType": bottle_type,  # Update defaults
-                "bottleAmount": amount,
-                "bottleUnits": units,
-                "timestamp": {"seconds": now_time},
-                "local_timestamp": now_time,
-            }
-        }, merge=True)
-
         _LOGGER.info(
             "Bottle feeding logged: %s %s of %s",
             amount, units, bottle_type
         )
 
+    def _deliver(
+        self,
+        listener_key: str,
+        callback: Callable[[Any], Any],
+        data: Any,
+        merge: Callable[[Any, Any], Any] | None = None,
+    ) -> bool:
+        """Call a listener callback, through the dispatcher if one is set.
+
+        Returns:
+            False if the dispatcher dropped the update
+        """
+        if self._listener_dispatcher is None:
+            callback(data)
+            return True
+        return self._listener_dispatcher.submit(listener_key, callback, data, merge)
+
     def _setup_listener(
         self, collection_name: CollectionName, child_uid: str, callback: Callable[[TDocumentData], None]
     ) -> None:
@@ -962,23 +835,9 @@ class HuckleberryAPI:
         """
         _LOGGER.info("Setting up real-time listener for %s/%s", collection_name, child_uid)
 
-        client = self._get_firestore_client()
-        doc_ref = client.collection(collection_name).document(child_uid)
-
-        # Create snapshot listener
-        def on_snapshot(doc_snapshot, changes, read_time):
-            """Handle snapshot updates."""
-            for doc in doc_snapshot:
-                if doc.exists:
-                    _LOGGER.debug("Real-time %s update received for child %s", collection_name, child_uid)
-                    callback(doc.to_dict())
-
-        # Start listening and store the unsubscribe function
-        unsubscribe = doc_ref.on_snapshot(on_snapshot)
-        listener_key = f"{collection_name}_{child_uid}"
-        self._listeners[listener_key] = unsubscribe
-        # Store callback for recreation after token refresh
-        self._listener_callbacks[listener_key] = (collection_name, child_uid, callback)
+        # A new registration gets the current document even if an earlier one already saw it
+        self._forget_deliveries(f"{collection_name}_{child_uid}")
+        self._watch_document(collection_name, child_uid, callback, self._deliver)
 
         _LOGGER.info("Real-time %s listener active for child %s", collection_name, child_uid)
 
@@ -1006,22 +865,151 @@ class HuckleberryAPI:
         """Set up real-time listener for diaper document changes."""
         self._setup_listener("diaper", child_uid, callback)
 
+    def setup_delta_listener(
+        self,
+        collection_name: CollectionName,
+        child_uid: str,
+        callback: Callable[[dict[str, FieldChange]], None],
+        paths: Iterable[str] | None = None,
+    ) -> None:
+        """Set up real-time listener delivering only the changed fields of a tracker document.
+
+        The callback receives {dotted field path: {"old": ..., "new": ...}} (None for a missing
+        field). The first snapshot is delivered against an empty document. Like the other
+        setup_*_listener methods, it replaces any listener on the same document.
+
+        Args:
+            collection_name: Tracker collection ('sleep', 'feed', 'health' or 'diaper')
+            child_uid: Child unique identifier
+            callback: Function called with the changed fields
+            paths: fnmatch patterns of field paths to deliver (e.g. ["timer.*"]), None for all
+        """
+        self._setup_listener(collection_name, child_uid, _delta_callback(callback, paths))
+
+    def setup_interval_listener(
+        self,
+        collection_name: CollectionName,
+        child_uid: str,
+        callback: Callable[[list[IntervalChange]], None],
+        lookback: float = 86400.0,
+    ) -> None:
+        """Set up real-time listener for the intervals of a tracker.
+
+        Watches the interval subcollection ({collection}/{child_uid}/intervals, or
+        health/{child_uid}/data) for documents whose `lastUpdated` is at most lookback
+        seconds before the watch was opened, which also covers multi-entry documents.
+        The callback receives the added, modified and removed intervals of each snapshot
+        that started within the last lookback seconds (a window moving with each snapshot);
+        the first snapshot lists the current ones as added. Re-opening the watch (e.g.
+        restart_listeners()) moves the query bound forward.
+
+        Args:
+            collection_name: Tracker collection ('sleep', 'feed', 'health' or 'diaper')
+            child_uid: Child unique identifier
+            callback: Function called with the interval changes
+            lookback: Seconds of history to watch
+        """
+        _LOGGER.info("Setting up interval listener for %s/%s", collection_name, child_uid)
+
+        self._forget_deliveries(f"{collection_name}_intervals_{child_uid}")
+        self._watch_intervals(collection_name, child_uid, callback, lookback, self._deliver)
+
+        _LOGGER.info("Interval %s listener active for child %s", collection_name, child_uid)
+
+    def start_listener_watchdog(
+        self,
+        check_interval: float = 30.0,
+        stall_timeout: float = 3600.0,
+        retry_interval: float = 5.0,
+        max_backoff: float = 300.0,
+    ) -> None:
+        """Start a background thread that restarts dead or stalled watch streams.
+
+        Only the affected watch is re-opened (new stream first); other listeners keep running.
+        Snapshots and resume token progress count as activity. Unchanged documents are not
+        delivered again after a restart.
+
+        Args:
+            check_interval: Seconds between checks.
+            stall_timeout: Seconds without activity after which an open watch counts as stalled.
+            retry_interval: Delay before restarting a watch again if the previous restart produced
+                no snapshot, doubled on each further restart.
+            max_backoff: Upper bound of the restart delay.
+        """
+        if self._watchdog_thread is not None and self._watchdog_thread.is_alive():
+            return
+
+        self._watchdog_stop.clear()
+        self._watchdog_thread = threading.Thread(
+            target=self._run_listener_watchdog,
+            args=(check_interval, stall_timeout, retry_interval, max_backoff),
+            name="huckleberry-listener-watchdog",
+            daemon=True,
+        )
+        self._watchdog_thread.start()
+        _LOGGER.info("Started listener watchdog")
+
+    def stop_listener_watchdog(self) -> None:
+        """Stop the listener watchdog, if running."""
+        thread = self._watchdog_thread
+        if thread is None:
+            return
+
+        self._watchdog_stop.set()
+        if thread is not threading.current_thread():
+            thread.join(timeout=15)
+        self._watchdog_thread = None
+        _LOGGER.info("Stopped listener watchdog")
+
+    def _run_listener_watchdog(
+        self, check_interval: float, stall_timeout: float, retry_interval: float, max_backoff: float
+    ) -> None:
+        """Check loop of the listener watchdog."""
+        while not self._watchdog_stop.wait(check_interval):
+            for listener_key in self._listener_restarts_due(stall_timeout, retry_interval, max_backoff):
+                try:
+                    self._restart_listener(listener_key, self._deliver)
+                except Exception as err:
+                    _LOGGER.warning("Failed to restart listener %s: %s", listener_key, err)
+
+    def restart_listeners(self, max_concurrency: int = 8, stagger: float = 0.5) -> ListenerRestartResult:
+        """Re-open every watch stream, e.g. after a network change.
+
+        Watches are re-opened in parallel by up to max_concurrency threads, each waiting a
+        random delay of up to stagger seconds first, so the backend does not get a burst of
+        new streams. Every new stream is opened before the one it replaces is closed, and
+        unchanged documents are not delivered again.
+
+        Returns:
+            Number of re-opened and failed watches, and how long the rebuild took
+        """
+        with self._listener_lock:
+            keys = list(self._listeners)
+        started = time.monotonic()
+        self._get_firestore_client()
+
+        def restart(listener_key: str) -> None:
+            time.sleep(random.uniform(0, stagger))
+            self._restart_listener(listener_key, self._deliver)
+
+        failed = 0
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(keys)))) as executor:
+            futures = {executor.submit(restart, key): key for key in keys}
+            for future, key in futures.items():
+                try:
+                    future.result()
+                except Exception as err:
+                    failed += 1
+                    _LOGGER.warning("Failed to restart listener %s: %s", key, err)
+
+        duration = time.monotonic() - started
+        _LOGGER.info("Restarted %d of %d listeners in %.3fs", len(keys) - failed, len(keys), duration)
+        return {"restarted": len(keys) - failed, "failed": failed, "duration_sec": duration}
+
     def stop_all_listeners(self) -> None:
         """Stop all active real-time listeners."""
         _LOGGER.info("Stopping all real-time listeners")
-        for key, watch in self._listeners.items():
-            try:
-                if hasattr(watch, "unsubscribe") and callable(getattr(watch, "unsubscribe")):
-                    watch.unsubscribe()
-                elif hasattr(watch, "close") and callable(getattr(watch, "close")):
-                    watch.close()
-                else:
-                    _LOGGER.debug("Listener %s object has no unsubscribe/close", key)
-                _LOGGER.debug("Stopped listener: %s", key)
-            except Exception as err:
-                _LOGGER.error("Error stopping listener %s: %s", key, err)
-        self._listeners.clear()
-        self._listener_callbacks.clear()
+        self._stop_listeners()
 
     def log_diaper(self, child_uid: str, mode: DiaperMode,
                    pee_amount: DiaperAmount | None = None, poo_amount: DiaperAmount | None = None,
@@ -1048,62 +1036,26 @@ class HuckleberryAPI:
         current_time = time.time()
 
         # Create interval ID (timestamp in ms + random suffix)
-        interval_timestamp_ms = int(current_time * 1000)
-        interval_id = f"{interval_timestamp_ms}-{uuid.uuid4().hex[:20]}"
-
-        # Build interval data (matching app behavior - minimal fields by default)
-        interval_data: FirebaseDiaperInterval = {
-            "start": current_time,
-            "lastUpdated": current_time,
-            "mode": mode,
-            "offset": self._get_timezone_offset_minutes(),
-        }
+        interval_id = _new_interval_id(current_time)
 
-        # Add quantity field if amounts are specified
-        # App uses: 0.0 = "little", 50.0 = "medium", 100.0 = "big"
-        # Other values are treated as no quantity indicator
-        amount_map = {"little": 0.0, "medium": 50.0, "big": 100.0}
-        quantity = {}
-        if pee_amount and pee_amount in amount_map:
-            quantity["pee"] = amount_map[pee_amount]
-        if poo_amount and poo_amount in amount_map:
-            quantity["poo"] = amount_map[poo_amount]
-        if quantity:
-            interval_data["quantity"] = quantity
-
-        # Add optional fields if provided
-        if color:
-            interval_data["color"] = color
-        if consistency:
-            interval_data["consistency"] = consistency
-        if diaper_rash:
-            interval_data["diaperRash"] = True  # type: ignore # Not in TypedDict yet
-        if notes:
-            interval_data["notes"] = notes  # type: ignore # Not in TypedDict yet
-
-        # Create interval document in subcollection
-        try:
-            diaper_ref.collection("intervals").document(interval_id).set(cast(dict, interval_data))
-            _LOGGER.info("Created diaper interval: %s", interval_id)
-        except Exception as err:
-            _LOGGER.error("Failed to create diaper interval: %s", err)
-            raise
+        interval_data = _diaper_interval(
+            current_time, self._get_timezone_offset_minutes(), mode,
+            pee_amount, poo_amount, color, consistency, diaper_rash, notes,
+        )
+
+        # Create interval document in subcollection and update prefs.lastDiaper in one commit
+        batch = client.batch()
+        batch.set(diaper_ref.collection("intervals").document(interval_id), cast(dict, interval_data))
+        prefs_update = _diaper_prefs_update(current_time, self._get_timezone_offset_minutes(), mode)
+        batch.update(diaper_ref, prefs_update)
 
-        # Update prefs.lastDiaper
         try:
-            last_diaper_data: LastDiaperData = {
-                "start": current_time,
-                "mode": mode,
-                "offset": self._get_timezone_offset_minutes(),
-            }
-            diaper_ref.update({
-                "prefs.lastDiaper": last_diaper_data,
-                "prefs.timestamp": {"seconds": current_time},
-                "prefs.local_timestamp": current_time,
-            })
-            _LOGGER.info("Updated lastDiaper prefs")
+            batch.commit()
+            _LOGGER.info("Created diaper interval: %s", interval_id)
+            self._apply_local_write(diaper_ref.path, prefs_update)
+            self._mark_intervals_stale("diaper", child_uid)
         except Exception as err:
-            _LOGGER.error("Failed to update diaper prefs: %s", err)
+            _LOGGER.error("Failed to log diaper change: %s", err)
             raise
 
         _LOGGER.info("Diaper change logged successfully")
@@ -1131,62 +1083,25 @@ class HuckleberryAPI:
         current_time = time.time()
 
         # Create interval ID (timestamp in ms + random suffix)
-        interval_timestamp_ms = int(current_time * 1000)
-        interval_id = f"{interval_timestamp_ms}-{uuid.uuid4().hex[:20]}"
-
-        # Build growth entry matching Huckleberry app structure
-        growth_entry: FirebaseGrowthData = {
-            "_id": interval_id,  # type: ignore # _id is not in TypedDict but Firestore accepts it
-            "type": "health",
-            "mode": "growth",
-            "start": current_time,
-            "lastUpdated": current_time,
-            "offset": self._get_timezone_offset_minutes(),
-            "isNight": False,
-            "multientry_key": None,
-        }
+        interval_id = _new_interval_id(current_time)
 
-        # Add measurements with proper unit fields (matches app structure)
-        if units == "metric":
-            if weight is not None:
-                growth_entry["weight"] = float(weight)
-                growth_entry["weightUnits"] = "kg"
-            if height is not None:
-                growth_entry["height"] = float(height)
-                growth_entry["heightUnits"] = "cm"
-            if head is not None:
-                growth_entry["head"] = float(head)
-                growth_entry["headUnits"] = "hcm"  # App uses "hcm" for head circumference
-        else:  # imperial
-            if weight is not None:
-                growth_entry["weight"] = float(weight)
-                growth_entry["weightUnits"] = "lbs"
-            if height is not None:
-                growth_entry["height"] = float(height)
-                growth_entry["heightUnits"] = "in"
-            if head is not None:
-                growth_entry["head"] = float(head)
-                growth_entry["headUnits"] = "hin"  # Head in inches
+        growth_entry = _growth_entry(
+            interval_id, current_time, self._get_timezone_offset_minutes(), weight, height, head, units
+        )
 
         # Create interval document in health/{child_uid}/data subcollection
         # (Health uses "data" subcollection, not "intervals" like other trackers)
-        health_data_ref = health_ref.collection("data").document(interval_id)
-
-        try:
-            health_data_ref.set(cast(dict, growth_entry))
-            _LOGGER.info("Created growth data entry in subcollection: %s", interval_id)
-        except Exception as err:
-            _LOGGER.error("Failed to create growth data entry: %s", err)
-            # Continue to update prefs even if subcollection write fails
+        # Update prefs.lastGrowthEntry and timestamps (matches Huckleberry app structure) in the same commit
+        batch = client.batch()
+        batch.set(health_ref.collection("data").document(interval_id), cast(dict, growth_entry))
+        prefs_update = _growth_prefs_update(current_time, growth_entry)
+        batch.update(health_ref, prefs_update)
 
-        # Update prefs.lastGrowthEntry and timestamps (matches Huckleberry app structure)
         try:
-            health_ref.update({
-                "prefs.lastGrowthEntry": growth_entry,
-                "prefs.timestamp": {"seconds": current_time},
-                "prefs.local_timestamp": current_time,
-            })
+            batch.commit()
             _LOGGER.info("Growth data logged successfully")
+            self._apply_local_write(health_ref.path, prefs_update)
+            self._mark_intervals_stale("health", child_uid)
         except Exception as err:
             _LOGGER.error("Failed to log growth data: %s", err)
             raise
@@ -1204,42 +1119,13 @@ class HuckleberryAPI:
         client = self._get_firestore_client()
         health_ref = client.collection("health").document(child_uid)
 
+        known, data, _ = self._mirror_lookup(health_ref.path)
+        if known:
+            return _growth_data_from_health(data)
+
         try:
-            doc = health_ref.get()
-            if not doc.exists:
-                return {
-                    "weight_units": "kg",
-                    "height_units": "cm",
-                    "head_units": "hcm",
-                }
-
-            health_data = doc.to_dict()
-            if not health_data:
-                return {
-                    "weight_units": "kg",
-                    "height_units": "cm",
-                    "head_units": "hcm",
-                }
-
-            last_growth = health_data.get("prefs", {}).get("lastGrowthEntry", {})
-
-            if not last_growth:
-                return {
-                    "weight_units": "kg",
-                    "height_units": "cm",
-                    "head_units": "hcm",
-                }
-
-            result: GrowthData = {
-                "weight": last_growth.get("weight"),
-                "height": last_growth.get("height"),
-                "head": last_growth.get("head"),
-                "weight_units": last_growth.get("weightUnits", "kg"),
-                "height_units": last_growth.get("heightUnits", "cm"),
-                "head_units": last_growth.get("headUnits", "hcm"),
-                "timestamp_sec": last_growth.get("start"),
-            }
-            return result
+            doc = health_ref.get(field_paths=["prefs.lastGrowthEntry"])
+            return _growth_data_from_health(doc.to_dict() if doc.exists else None)
         except Exception as err:
             _LOGGER.error("Failed to get growth data: %s", err)
             return {
@@ -1248,11 +1134,68 @@ class HuckleberryAPI:
                 "head_units": "hcm",
             }
 
+    def import_history(self, child_uid: str, entries: Iterable[HistoryImportEntry]) -> HistoryImportResult:
+        """
+        Import past diaper, bottle and growth events, e.g. to backfill history from another tracker.
+
+        Intervals are written with a Firestore BulkWriter. The root prefs (lastDiaper, lastBottle,
+        lastGrowthEntry) are updated once at the end, and only when an imported entry is newer.
+
+        Args:
+            child_uid: Child unique identifier
+            entries: History entries, e.g. from read_history_csv() or read_history_jsonl()
+
+        Returns:
+            HistoryImportResult with the number of written and failed intervals
+
+        Raises:
+            ValueError: If an entry is invalid (nothing is written in that case)
+        """
+        now = time.time()
+        intervals = [_history_interval(entry, self._timezone, now) for entry in entries]
+        _LOGGER.info("Importing %d history entries for child %s", len(intervals), child_uid)
+
+        client = self._get_firestore_client()
+        written = _bulk_write_history(client, child_uid, intervals)
+        for collection_name in {HISTORY_TRACKERS[entry_type][0] for entry_type, _, _ in intervals}:
+            self._mark_intervals_stale(collection_name, child_uid)
+
+        latest = _latest_history_intervals(intervals, written)
+        if latest:
+            refs = {
+                entry_type: client.collection(HISTORY_TRACKERS[entry_type][0]).document(child_uid)
+                for entry_type in latest
+            }
+            types_by_path = {ref.path: entry_type for entry_type, ref in refs.items()}
+            snapshots = client.get_all(
+                list(refs.values()), field_paths=[f"prefs.{HISTORY_TRACKERS[t][1]}.start" for t in latest]
+            )
+            current = {
+                types_by_path[snapshot.reference.path]: (snapshot.to_dict() or {}) if snapshot.exists else None
+                for snapshot in snapshots
+            }
+
+            prefs_writes = _history_prefs_writes(latest, current, now)
+            if prefs_writes:
+                batch = client.batch()
+                for entry_type, data, merge in prefs_writes:
+                    if merge:
+                        batch.set(refs[entry_type], data, merge=True)
+                    else:
+                        batch.update(refs[entry_type], data)
+                batch.commit()
+                for entry_type, data, merge in prefs_writes:
+                    self._apply_local_write(refs[entry_type].path, data, merge)
+
+        _LOGGER.info("Imported %d of %d history entries", len(written), len(intervals))
+        return {"written": len(written), "failed": len(intervals) - len(written)}
+
     def get_calendar_events(
         self,
         child_uid: str,
         start_timestamp: int,
         end_timestamp: int,
+        extra_fields: Iterable[str] = (),
     ) -> dict[str, list[dict]]:
         """
         Fetch all calendar events (sleep, feed, diaper, health) for a date range.
@@ -1261,22 +1204,262 @@ class HuckleberryAPI:
             child_uid: Child unique identifier
             start_timestamp: Start of range (Unix timestamp in seconds)
             end_timestamp: End of range (Unix timestamp in seconds)
+            extra_fields: Additional interval document fields to include in events
 
         Returns:
             Dictionary with event type keys and lists of event dicts
         """
-        return {
-            "sleep": self.get_sleep_intervals(child_uid, start_timestamp, end_timestamp),
-            "feed": self.get_feed_intervals(child_uid, start_timestamp, end_timestamp),
-            "diaper": self.get_diaper_intervals(child_uid, start_timestamp, end_timestamp),
-            "health": self.get_health_entries(child_uid, start_timestamp, end_timestamp),
+        extra = tuple(extra_fields)
+        # Authenticate once before fanning out to worker threads
+        self._get_firestore_client()
+
+        # Regular and multi-entry queries of every tracker run concurrently,
+        # so latency is close to the slowest single query
+        with ThreadPoolExecutor(max_workers=2 * len(CALENDAR_COLLECTIONS)) as executor:
+            if self._interval_store is not None:
+                fetchers = (self._get_stored_intervals,)
+            else:
+                fetchers = (self._fetch_regular_events, self._fetch_multi_entry_events)
+            futures = {
+                collection_name: [
+                    executor.submit(fetch, collection_name, child_uid, start_timestamp, end_timestamp, extra)
+                    for fetch in fetchers
+                ]
+                for collection_name in CALENDAR_COLLECTIONS
+            }
+
+            events: dict[str, list[dict]] = {}
+            for collection_name, collection_futures in futures.items():
+                events[collection_name] = []
+                try:
+                    events[collection_name] = _merge_by_start(*(future.result() for future in collection_futures))
+                except Exception as err:
+                    _LOGGER.error("Error fetching %s: %s", _INTERVAL_LABELS[collection_name], err)
+
+        return events
+
+    def _intervals_ref(self, collection_name: CollectionName, child_uid: str) -> firestore.CollectionReference:
+        """Get the interval subcollection of a tracker document."""
+        client = self._get_firestore_client()
+        return client.collection(collection_name).document(child_uid).collection(
+            INTERVAL_SUBCOLLECTIONS[collection_name]
+        )
+
+    def _fetch_regular_events(
+        self,
+        collection_name: CollectionName,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        extra_fields: tuple[str, ...] = (),
+    ) -> list[dict]:
+        """Query regular interval documents with server-side date filtering."""
+        return list(
+            self._stream_regular_events(collection_name, child_uid, start_timestamp, end_timestamp, extra_fields)
+        )
+
+    def _stream_regular_events(
+        self,
+        collection_name: CollectionName,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        extra_fields: tuple[str, ...] = (),
+    ) -> Iterator[dict]:
+        """Yield regular interval events in start order as the query streams.
+
+        Only the fields mapped into events are downloaded (see INTERVAL_EVENT_FIELDS).
+        """
+        regular_docs = self._intervals_ref(collection_name, child_uid).where(
+            filter=firestore.FieldFilter("start", ">=", start_timestamp)
+        ).where(
+            filter=firestore.FieldFilter("start", "<", end_timestamp)
+        ).order_by("start").select(_interval_select_fields(collection_name, extra_fields)).stream()
+
+        for doc in regular_docs:
+            data = doc.to_dict()
+            if not data or data.get("multi"):
+                continue  # Skip multi-entry docs from this query
+
+            yield _interval_event(collection_name, data, False, extra_fields)
+
+    def _fetch_multi_entry_events(
+        self,
+        collection_name: CollectionName,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        extra_fields: tuple[str, ...] = (),
+    ) -> list[dict]:
+        """Get multi-entry events in range (can't filter by nested start field, so filter them here)."""
+        index = self._update_multi_entry_index(collection_name, child_uid)
+        return [
+            _interval_event(collection_name, entry, True, extra_fields)
+            for entry in _iter_index_range(index, start_timestamp, end_timestamp)
+        ]
+
+    def _update_multi_entry_index(
+        self, collection_name: CollectionName, child_uid: str
+    ) -> tuple[list[float], list[dict]]:
+        """Bring the multi-entry cache of a tracker up to date and return its range index.
+
+        A probe projected to the document name lists multi-entry documents with their
+        update_time (an empty projection would return every field). Only new or changed
+        documents are downloaded and parsed, the rest come from cache.
+        """
+        client = self._get_firestore_client()
+        probe = self._intervals_ref(collection_name, child_uid).where(
+            filter=firestore.FieldFilter("multi", "==", True)
+        ).select([FieldPath.document_id()]).stream()
+
+        cache_key = (collection_name, child_uid)
+        with self._multi_entry_lock:
+            cached = self._multi_entry_cache.get(cache_key, {})
+
+        documents = {}
+        changed_refs = []
+        for doc in probe:
+            cached_document = cached.get(doc.id)
+            if cached_document is not None and cached_document[0] == doc.update_time:
+                documents[doc.id] = cached_document
+            else:
+                changed_refs.append(doc.reference)
+
+        if changed_refs:
+            for doc in client.get_all(changed_refs):
+                if doc.exists:
+                    documents[doc.id] = (doc.update_time, _multi_entry_items(doc.to_dict()))
+            _LOGGER.debug("Parsed %d changed multi-entry %s documents", len(changed_refs), collection_name)
+
+        with self._multi_entry_lock:
+            index = self._multi_entry_index.get(cache_key)
+            if index is None or changed_refs or len(documents) != len(cached):
+                index = self._multi_entry_index[cache_key] = _build_multi_entry_index(documents)
+            # Replacing the whole entry also drops deleted documents
+            self._multi_entry_cache[cache_key] = documents
+
+        return index
+
+    def _sync_intervals(self, collection_name: CollectionName, child_uid: str) -> None:
+        """Pull interval documents changed since the last sync into the interval store."""
+        store = self._interval_store
+        assert store is not None
+        if store.is_fresh(collection_name, child_uid):
+            return
+
+        query: firestore.Query | firestore.CollectionReference = self._intervals_ref(collection_name, child_uid)
+        watermark = store.get_watermark(collection_name, child_uid)
+        if watermark is not None:
+            query = query.where(filter=firestore.FieldFilter("lastUpdated", ">", watermark))
+
+        count = store.apply_documents(
+            collection_name, child_uid, ((doc.id, doc.to_dict() or {}) for doc in query.stream())
+        )
+        _LOGGER.debug("Synced %d %s documents for child %s", count, collection_name, child_uid)
+
+        if store.needs_reconcile(collection_name, child_uid):
+            self._reconcile_intervals(collection_name, child_uid)
+
+    def _reconcile_intervals(self, collection_name: CollectionName, child_uid: str) -> None:
+        """Drop stored documents that were deleted in Firestore.
+
+        Only document names are listed. Listed documents missing from the store
+        (e.g. written without `lastUpdated` after the first sync) are downloaded.
+        """
+        store = self._interval_store
+        assert store is not None
+        client = self._get_firestore_client()
+        refs = {
+            doc.id: doc.reference
+            for doc in self._intervals_ref(collection_name, child_uid).select([FieldPath.document_id()]).stream()
         }
 
+        stored_ids = store.document_ids(collection_name, child_uid)
+        missing_refs = [ref for doc_id, ref in refs.items() if doc_id not in stored_ids]
+        if missing_refs:
+            store.apply_documents(
+                collection_name,
+                child_uid,
+                ((doc.id, doc.to_dict() or {}) for doc in client.get_all(missing_refs) if doc.exists),
+            )
+        removed = store.retain_documents(collection_name, child_uid, refs)
+        _LOGGER.debug(
+            "Reconciled %s for child %s: %d fetched, %d removed", collection_name, child_uid, len(missing_refs), removed
+        )
+
+    def _mark_intervals_stale(self, collection_name: CollectionName, child_uid: str) -> None:
+        """Make the next stored read of a tracker sync again, so it sees this client's own writes."""
+        if self._interval_store is not None:
+            self._interval_store.mark_stale(collection_name, child_uid)
+
+    def _get_stored_intervals(
+        self,
+        collection_name: CollectionName,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        extra_fields: tuple[str, ...] = (),
+    ) -> list[dict]:
+        """Sync the interval store incrementally and answer the range query from it."""
+        store = self._sync_interval_store(collection_name, child_uid)
+        return [
+            _interval_event(collection_name, entry, is_multi, extra_fields)
+            for entry, is_multi in store.query(collection_name, child_uid, start_timestamp, end_timestamp)
+        ]
+
+    def _sync_interval_store(self, collection_name: CollectionName, child_uid: str) -> SQLiteIntervalStore:
+        """Sync the interval store, falling back to stored data if a previous sync succeeded."""
+        store = self._interval_store
+        assert store is not None
+        try:
+            self._sync_intervals(collection_name, child_uid)
+        except Exception as err:
+            if not store.is_synced(collection_name, child_uid):
+                raise
+            _LOGGER.warning("Sync of %s failed, serving stored data: %s", _INTERVAL_LABELS[collection_name], err)
+        return store
+
+    def _get_intervals(
+        self,
+        collection_name: CollectionName,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        extra_fields: tuple[str, ...] = (),
+    ) -> list[dict]:
+        """Fetch interval events of one tracker from Firestore for a date range.
+
+        Uses two queries: regular documents are filtered by date server-side,
+        multi-entry entries are looked up in a sorted in-memory index. Both are
+        merged in start order. With an interval store, the range is answered
+        from the store instead.
+        """
+        events = []
+        try:
+            if self._interval_store is not None:
+                events = self._get_stored_intervals(
+                    collection_name, child_uid, start_timestamp, end_timestamp, extra_fields
+                )
+            else:
+                events = _merge_by_start(
+                    self._fetch_regular_events(
+                        collection_name, child_uid, start_timestamp, end_timestamp, extra_fields
+                    ),
+                    self._fetch_multi_entry_events(
+                        collection_name, child_uid, start_timestamp, end_timestamp, extra_fields
+                    ),
+                )
+        except Exception as err:
+            _LOGGER.error("Error fetching %s: %s", _INTERVAL_LABELS[collection_name], err)
+
+        return events
+
     def get_sleep_intervals(
         self,
         child_uid: str,
         start_timestamp: int,
         end_timestamp: int,
+        extra_fields: Iterable[str] = (),
     ) -> list[dict]:
         """
         Fetch sleep intervals from Firestore for a date range.
@@ -1285,67 +1468,19 @@ class HuckleberryAPI:
             child_uid: Child unique identifier
             start_timestamp: Start of range (Unix timestamp in seconds)
             end_timestamp: End of range (Unix timestamp in seconds)
+            extra_fields: Additional interval document fields to include in events
 
         Returns:
             List of sleep interval dicts with 'start' and 'duration' fields
         """
-        events = []
-        client = self._get_firestore_client()
-        sleep_ref = client.collection("sleep").document(child_uid)
-        intervals_ref = sleep_ref.collection("intervals")
-
-        try:
-            # Query 1: Get regular documents with date filtering
-            regular_docs = intervals_ref.where(
-                filter=firestore.FieldFilter("start", ">=", start_timestamp)
-            ).where(
-                filter=firestore.FieldFilter("start", "<", end_timestamp)
-            ).order_by("start").stream()
-
-            for doc in regular_docs:
-                data = doc.to_dict()
-                if not data or data.get("multi"):
-                    continue  # Skip multi-entry docs from this query
-
-                events.append({
-                    "start": data["start"],
-                    "duration": data.get("duration", 0),
-                })
-
-            # Query 2: Get multi-entry documents (can't filter by nested start field)
-            multi_docs = intervals_ref.where(
-                filter=firestore.FieldFilter("multi", "==", True)
-            ).stream()
-
-            for doc in multi_docs:
-                data = doc.to_dict()
-                if not data or not isinstance(data.get("data"), dict):
-                    continue
-
-                # Iterate through batched entries and filter by date
-                for entry_id, entry in data["data"].items():
-                    if not isinstance(entry, dict) or "start" not in entry:
-                        continue
-
-                    entry_start = entry["start"]
-                    if not (start_timestamp <= entry_start < end_timestamp):
-                        continue
-
-                    events.append({
-                        "start": entry_start,
-                        "duration": entry.get("duration", 0),
-                    })
-
-        except Exception as err:
-            _LOGGER.error("Error fetching sleep intervals: %s", err)
-
-        return events
+        return self._get_intervals("sleep", child_uid, start_timestamp, end_timestamp, tuple(extra_fields))
 
     def get_feed_intervals(
         self,
         child_uid: str,
         start_timestamp: int,
         end_timestamp: int,
+        extra_fields: Iterable[str] = (),
     ) -> list[dict]:
         """
         Fetch feeding intervals from Firestore for a date range.
@@ -1354,73 +1489,19 @@ class HuckleberryAPI:
             child_uid: Child unique identifier
             start_timestamp: Start of range (Unix timestamp in seconds)
             end_timestamp: End of range (Unix timestamp in seconds)
+            extra_fields: Additional interval document fields to include in events
 
         Returns:
             List of feed interval dicts with 'start', 'leftDuration', 'rightDuration' fields
         """
-        events = []
-        client = self._get_firestore_client()
-        feed_ref = client.collection("feed").document(child_uid)
-        intervals_ref = feed_ref.collection("intervals")
-
-        try:
-            # Query 1: Get regular documents with date filtering
-            regular_docs = intervals_ref.where(
-                filter=firestore.FieldFilter("start", ">=", start_timestamp)
-            ).where(
-                filter=firestore.FieldFilter("start", "<", end_timestamp)
-            ).order_by("start").stream()
-
-            for doc in regular_docs:
-                data = doc.to_dict()
-                if not data or data.get("multi"):
-                    continue  # Skip multi-entry docs from this query
-
-                # Regular doc: durations are in minutes
-                events.append({
-                    "start": data["start"],
-                    "leftDuration": data.get("leftDuration", 0),
-                    "rightDuration": data.get("rightDuration", 0),
-                    "is_multi_entry": False,
-                })
-
-            # Query 2: Get multi-entry documents (can't filter by nested start field)
-            multi_docs = intervals_ref.where(
-                filter=firestore.FieldFilter("multi", "==", True)
-            ).stream()
-
-            for doc in multi_docs:
-                data = doc.to_dict()
-                if not data or not isinstance(data.get("data"), dict):
-                    continue
-
-                # Iterate through batched entries and filter by date
-                for entry_id, entry in data["data"].items():
-                    if not isinstance(entry, dict) or "start" not in entry:
-                        continue
-
-                    entry_start = entry["start"]
-                    if not (start_timestamp <= entry_start < end_timestamp):
-                        continue
-
-                    # Multi-entry: durations are in SECONDS
-                    events.append({
-                        "start": entry_start,
-                        "leftDuration": entry.get("leftDuration", 0),
-                        "rightDuration": entry.get("rightDuration", 0),
-                        "is_multi_entry": True,
-                    })
-
-        except Exception as err:
-            _LOGGER.error("Error fetching feed intervals: %s", err)
-
-        return events
+        return self._get_intervals("feed", child_uid, start_timestamp, end_timestamp, tuple(extra_fields))
 
     def get_diaper_intervals(
         self,
         child_uid: str,
         start_timestamp: int,
         end_timestamp: int,
+        extra_fields: Iterable[str] = (),
     ) -> list[dict]:
         """
         Fetch diaper intervals from Firestore for a date range.
@@ -1429,83 +1510,19 @@ class HuckleberryAPI:
             child_uid: Child unique identifier
             start_timestamp: Start of range (Unix timestamp in seconds)
             end_timestamp: End of range (Unix timestamp in seconds)
+            extra_fields: Additional interval document fields to include in events
 
         Returns:
             List of diaper interval dicts with 'start', 'mode', and optional details
         """
-        events = []
-        client = self._get_firestore_client()
-        diaper_ref = client.collection("diaper").document(child_uid)
-        intervals_ref = diaper_ref.collection("intervals")
-
-        try:
-            # Query 1: Get regular documents with date filtering
-            regular_docs = intervals_ref.where(
-                filter=firestore.FieldFilter("start", ">=", start_timestamp)
-            ).where(
-                filter=firestore.FieldFilter("start", "<", end_timestamp)
-            ).order_by("start").stream()
-
-            for doc in regular_docs:
-                data = doc.to_dict()
-                if not data or data.get("multi"):
-                    continue  # Skip multi-entry docs from this query
-
-                event = {
-                    "start": data["start"],
-                    "mode": data.get("mode", "unknown"),
-                }
-                # Add optional fields if present
-                if "pooColor" in data:
-                    event["pooColor"] = data["pooColor"]
-                if "pooConsistency" in data:
-                    event["pooConsistency"] = data["pooConsistency"]
-                if "amount" in data:
-                    event["amount"] = data["amount"]
-                events.append(event)
-
-            # Query 2: Get multi-entry documents (can't filter by nested start field)
-            multi_docs = intervals_ref.where(
-                filter=firestore.FieldFilter("multi", "==", True)
-            ).stream()
-
-            for doc in multi_docs:
-                data = doc.to_dict()
-                if not data or not isinstance(data.get("data"), dict):
-                    continue
-
-                # Iterate through batched entries and filter by date
-                for entry_id, entry in data["data"].items():
-                    if not isinstance(entry, dict) or "start" not in entry:
-                        continue
-
-                    entry_start = entry["start"]
-                    if not (start_timestamp <= entry_start < end_timestamp):
-                        continue
-
-                    event = {
-                        "start": entry_start,
-                        "mode": entry.get("mode", "unknown"),
-                    }
-                    # Add optional fields if present
-                    if "pooColor" in entry:
-                        event["pooColor"] = entry["pooColor"]
-                    if "pooConsistency" in entry:
-                        event["pooConsistency"] = entry["pooConsistency"]
-                    if "amount" in entry:
-                        event["amount"] = entry["amount"]
-                    events.append(event)
-
-        except Exception as err:
-            _LOGGER.error("Error fetching diaper intervals: %s", err)
-
-        return events
+        return self._get_intervals("diaper", child_uid, start_timestamp, end_timestamp, tuple(extra_fields))
 
     def get_health_entries(
         self,
         child_uid: str,
         start_timestamp: int,
         end_timestamp: int,
+        extra_fields: Iterable[str] = (),
     ) -> list[dict]:
         """
         Fetch health/growth entries from Firestore for a date range.
@@ -1514,69 +1531,231 @@ class HuckleberryAPI:
             child_uid: Child unique identifier
             start_timestamp: Start of range (Unix timestamp in seconds)
             end_timestamp: End of range (Unix timestamp in seconds)
+            extra_fields: Additional interval document fields to include in events
 
         Returns:
             List of health entry dicts with 'start' and optional measurement fields
         """
-        events = []
-        client = self._get_firestore_client()
-        health_ref = client.collection("health").document(child_uid)
-        # Health uses "data" subcollection, not "intervals"
-        data_ref = health_ref.collection("data")
+        return self._get_intervals("health", child_uid, start_timestamp, end_timestamp, tuple(extra_fields))
 
-        try:
-            # Query 1: Get regular documents with date filtering
-            regular_docs = data_ref.where(
-                filter=firestore.FieldFilter("start", ">=", start_timestamp)
-            ).where(
-                filter=firestore.FieldFilter("start", "<", end_timestamp)
-            ).order_by("start").stream()
-
-            for doc in regular_docs:
-                data = doc.to_dict()
-                if not data or data.get("multi"):
-                    continue  # Skip multi-entry docs from this query
-
-                event = {"start": data["start"]}
-                # Add optional measurement fields if present
-                if "weight" in data:
-                    event["weight"] = data["weight"]
-                if "height" in data:
-                    event["height"] = data["height"]
-                if "head" in data:
-                    event["head"] = data["head"]
-                events.append(event)
-
-            # Query 2: Get multi-entry documents (can't filter by nested start field)
-            multi_docs = data_ref.where(
-                filter=firestore.FieldFilter("multi", "==", True)
-            ).stream()
-
-            for doc in multi_docs:
-                data = doc.to_dict()
-                if not data or not isinstance(data.get("data"), dict):
-                    continue
-
-                # Iterate through batched entries and filter by date
-                for entry_id, entry in data["data"].items():
-                    if not isinstance(entry, dict) or "start" not in entry:
-                        continue
-
-                    entry_start = entry["start"]
-                    if not (start_timestamp <= entry_start < end_timestamp):
-                        continue
-
-                    event = {"start": entry_start}
-                    # Add optional measurement fields if present
-                    if "weight" in entry:
-                        event["weight"] = entry["weight"]
-                    if "height" in entry:
-                        event["height"] = entry["height"]
-                    if "head" in entry:
-                        event["head"] = entry["head"]
-                    events.append(event)
+    def _get_intervals_page(
+        self,
+        collection_name: CollectionName,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        page_size: int,
+        cursor: str | None,
+        extra_fields: tuple[str, ...] = (),
+    ) -> IntervalPage:
+        """Fetch one page of interval events of one tracker from Firestore.
+
+        page_size bounds the regular documents read per page, using limit() and
+        start_after() on (start, document ID). Multi-entry events from the cached
+        index that fall in the start span covered by the page are merged into it.
+        Pages are always read from Firestore, also with an interval store.
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+
+        query = self._intervals_ref(collection_name, child_uid).where(
+            filter=firestore.FieldFilter("start", ">=", start_timestamp)
+        ).where(
+            filter=firestore.FieldFilter("start", "<", end_timestamp)
+        ).order_by("start").order_by("__name__").select(_interval_select_fields(collection_name, extra_fields))
+
+        last_start = None
+        if cursor is not None:
+            last_start, last_doc_id = _decode_page_cursor(collection_name, cursor)
+            query = query.start_after({"start": last_start, "__name__": last_doc_id})
+
+        docs = list(query.limit(page_size).stream())
+        regular = []
+        for doc in docs:
+            data = doc.to_dict()
+            if data and not data.get("multi"):
+                regular.append(_interval_event(collection_name, data, False, extra_fields))
+
+        next_cursor = None
+        if len(docs) == page_size:
+            page_end = docs[-1].get("start")
+            next_cursor = _encode_page_cursor(collection_name, page_end, docs[-1].id)
+
+        # Multi-entry events in (previous page end, this page end]
+        starts, multi_entries = self._update_multi_entry_index(collection_name, child_uid)
+        low = bisect_left(starts, start_timestamp) if last_start is None else bisect_right(starts, last_start)
+        high = bisect_left(starts, end_timestamp) if next_cursor is None else bisect_right(starts, page_end)
+        multi = [_interval_event(collection_name, entry, True, extra_fields) for entry in multi_entries[low:high]]
 
-        except Exception as err:
-            _LOGGER.error("Error fetching health entries: %s", err)
+        return {
+            "events": _merge_by_start(regular, multi),
+            "next_cursor": next_cursor,
+        }
 
-        return events
+    def get_sleep_intervals_page(
+        self,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        page_size: int = 100,
+        cursor: str | None = None,
+        extra_fields: Iterable[str] = (),
+    ) -> IntervalPage:
+        """
+        Fetch one page of sleep intervals, in start order.
+
+        Args:
+            child_uid: Child unique identifier
+            start_timestamp: Start of range (Unix timestamp in seconds)
+            end_timestamp: End of range (Unix timestamp in seconds)
+            page_size: Maximum number of interval documents read for this page
+            cursor: next_cursor of the previous page, or None for the first page
+            extra_fields: Additional interval document fields to include in events
+
+        Returns:
+            Page with 'events' and 'next_cursor' (None on the last page)
+        """
+        return self._get_intervals_page(
+            "sleep", child_uid, start_timestamp, end_timestamp, page_size, cursor, tuple(extra_fields)
+        )
+
+    def get_feed_intervals_page(
+        self,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        page_size: int = 100,
+        cursor: str | None = None,
+        extra_fields: Iterable[str] = (),
+    ) -> IntervalPage:
+        """Fetch one page of feeding intervals, in start order. See get_sleep_intervals_page()."""
+        return self._get_intervals_page(
+            "feed", child_uid, start_timestamp, end_timestamp, page_size, cursor, tuple(extra_fields)
+        )
+
+    def get_diaper_intervals_page(
+        self,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        page_size: int = 100,
+        cursor: str | None = None,
+        extra_fields: Iterable[str] = (),
+    ) -> IntervalPage:
+        """Fetch one page of diaper intervals, in start order. See get_sleep_intervals_page()."""
+        return self._get_intervals_page(
+            "diaper", child_uid, start_timestamp, end_timestamp, page_size, cursor, tuple(extra_fields)
+        )
+
+    def get_health_entries_page(
+        self,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        page_size: int = 100,
+        cursor: str | None = None,
+        extra_fields: Iterable[str] = (),
+    ) -> IntervalPage:
+        """Fetch one page of health entries, in start order. See get_sleep_intervals_page()."""
+        return self._get_intervals_page(
+            "health", child_uid, start_timestamp, end_timestamp, page_size, cursor, tuple(extra_fields)
+        )
+
+    def _iter_intervals(
+        self,
+        collection_name: CollectionName,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        extra_fields: tuple[str, ...] = (),
+    ) -> Iterator[dict]:
+        """Yield interval events of one tracker in start order while the query streams.
+
+        Unlike _get_intervals, errors are raised to the caller.
+        """
+        if self._interval_store is not None:
+            store = self._sync_interval_store(collection_name, child_uid)
+            for entry, is_multi in store.iter_query(collection_name, child_uid, start_timestamp, end_timestamp):
+                yield _interval_event(collection_name, entry, is_multi, extra_fields)
+            return
+
+        index = self._update_multi_entry_index(collection_name, child_uid)
+        multi_events = (
+            _interval_event(collection_name, entry, True, extra_fields)
+            for entry in _iter_index_range(index, start_timestamp, end_timestamp)
+        )
+        yield from heapq.merge(
+            self._stream_regular_events(collection_name, child_uid, start_timestamp, end_timestamp, extra_fields),
+            multi_events,
+            key=_event_start,
+        )
+
+    def iter_sleep_intervals(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, extra_fields: Iterable[str] = ()
+    ) -> Iterator[dict]:
+        """Yield sleep intervals in start order while they stream from Firestore.
+
+        Same events as get_sleep_intervals(), without holding the whole range in memory.
+        """
+        return self._iter_intervals("sleep", child_uid, start_timestamp, end_timestamp, tuple(extra_fields))
+
+    def iter_feed_intervals(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, extra_fields: Iterable[str] = ()
+    ) -> Iterator[dict]:
+        """Yield feeding intervals in start order while they stream from Firestore.
+
+        Same events as get_feed_intervals(), without holding the whole range in memory.
+        """
+        return self._iter_intervals("feed", child_uid, start_timestamp, end_timestamp, tuple(extra_fields))
+
+    def iter_diaper_intervals(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, extra_fields: Iterable[str] = ()
+    ) -> Iterator[dict]:
+        """Yield diaper intervals in start order while they stream from Firestore.
+
+        Same events as get_diaper_intervals(), without holding the whole range in memory.
+        """
+        return self._iter_intervals("diaper", child_uid, start_timestamp, end_timestamp, tuple(extra_fields))
+
+    def iter_health_entries(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, extra_fields: Iterable[str] = ()
+    ) -> Iterator[dict]:
+        """Yield health entries in start order while they stream from Firestore.
+
+        Same events as get_health_entries(), without holding the whole range in memory.
+        """
+        return self._iter_intervals("health", child_uid, start_timestamp, end_timestamp, tuple(extra_fields))
+
+    def iter_timeline(
+        self,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        collections: Iterable[CollectionName] = CALENDAR_COLLECTIONS,
+        extra_fields: Iterable[str] = (),
+    ) -> Iterator[tuple[CollectionName, dict]]:
+        """
+        Yield events of all trackers as one chronologically ordered stream.
+
+        The tracker streams are merged with a heap, so only one pending event
+        per tracker is held besides the streams' own buffers.
+
+        Args:
+            child_uid: Child unique identifier
+            start_timestamp: Start of range (Unix timestamp in seconds)
+            end_timestamp: End of range (Unix timestamp in seconds)
+            collections: Trackers to include (default: sleep, feed, diaper, health)
+            extra_fields: Additional interval document fields to include in events
+
+        Yields:
+            (collection name, event dict) tuples in start order
+        """
+        extra = tuple(extra_fields)
+        streams = [
+            _tag_events(
+                collection_name,
+                self._iter_intervals(collection_name, child_uid, start_timestamp, end_timestamp, extra),
+            )
+            for collection_name in collections
+        ]
+        return heapq.merge(*streams, key=_tagged_event_start)
@@ -0,0 +1,1678 @@
+"""Async API client for Huckleberry."""
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import functools
+import heapq
+import itertools
+import logging
+import random
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Iterable, cast
+
+import aiohttp
+from google.api_core.exceptions import FailedPrecondition
+from google.cloud import firestore
+from google.cloud.firestore_v1.field_path import FieldPath
+
+from ._common import (
+    CALENDAR_COLLECTIONS,
+    CHILD_DOCUMENT_FIELDS,
+    HISTORY_TRACKERS,
+    INTERVAL_SUBCOLLECTIONS,
+    _INTERVAL_LABELS,
+    _ClientBase,
+    CollectionName,
+    DiaperAmount,
+    DiaperMode,
+    FeedSide,
+    FirebaseTokenCredentials,
+    MeasurementUnits,
+    PooColor,
+    PooConsistency,
+    T,
+    TDocumentData,
+    _bottle_interval,
+    _event_start,
+    _build_multi_entry_index,
+    _bottle_prefs,
+    _blind_timer_update,
+    _bulk_write_history,
+    _cancel_feeding_update,
+    _cancel_sleep_update,
+    _child_ids_from_user,
+    _decode_page_cursor,
+    _delta_callback,
+    _children_from_snapshots,
+    _complete_feeding_writes,
+    _complete_sleep_writes,
+    _diaper_interval,
+    _diaper_prefs_update,
+    _encode_page_cursor,
+    _feed_timer_document,
+    _growth_data_from_health,
+    _growth_entry,
+    _growth_prefs_update,
+    _history_interval,
+    _history_prefs_writes,
+    _iter_index_range,
+    _interval_event,
+    _interval_select_fields,
+    _latest_history_intervals,
+    _merge_by_start,
+    _multi_entry_items,
+    _new_interval_id,
+    _next_token_refresh_at,
+    _pause_feeding_update,
+    _pause_sleep_update,
+    _refresh_token_rejected,
+    _resume_feeding_update,
+    _resume_sleep_update,
+    _sleep_timer_document,
+    _stored_tokens,
+    _switch_feeding_update,
+    _tagged_event_start,
+    _token_is_fresh,
+)
+from .const import AUTH_URL, FIREBASE_API_KEY, FIREBASE_PROJECT_ID, REFRESH_URL
+from .interval_store import SQLiteIntervalStore
+from .listener_dispatcher import ListenerDispatcher
+from .token_store import TokenStore
+from .types import (
+    BottleType,
+    ChildData,
+    DiaperDocumentData,
+    FeedDocumentData,
+    FieldChange,
+    GrowthData,
+    HealthDocumentData,
+    HistoryImportEntry,
+    HistoryImportResult,
+    IntervalChange,
+    IntervalPage,
+    ListenerRestartResult,
+    SleepDocumentData,
+    VolumeUnits,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Rows read from the interval store per worker-thread call when iterating.
+_STORE_BATCH_SIZE = 500
+
+
+async def _aiter(items: Iterable[T]) -> AsyncIterator[T]:
+    """Wrap a sync iterable as an async iterator."""
+    for item in items:
+        yield item
+
+
+async def _tag_events_async(
+    collection_name: CollectionName, events: AsyncIterator[dict]
+) -> AsyncIterator[tuple[CollectionName, dict]]:
+    """Pair each event with the tracker it came from."""
+    async for event in events:
+        yield collection_name, event
+
+
+async def _merge_async_by_start(
+    *iterators: AsyncIterator[T], key: Callable[[T], float] = _event_start
+) -> AsyncIterator[T]:
+    """Heap-merge async iterators that are each ordered by key, like heapq.merge."""
+    heap: list[tuple[float, int, T, AsyncIterator[T]]] = []
+    try:
+        for order, iterator in enumerate(iterators):
+            try:
+                item = await iterator.__anext__()
+            except StopAsyncIteration:
+                continue
+            heap.append((key(item), order, item, iterator))
+        heapq.heapify(heap)
+
+        while heap:
+            _, order, item, iterator = heap[0]
+            yield item
+            try:
+                next_item = await iterator.__anext__()
+            except StopAsyncIteration:
+                heapq.heappop(heap)
+            else:
+                heapq.heapreplace(heap, (key(next_item), order, next_item, iterator))
+    finally:
+        for iterator in iterators:
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+
+def _call_on_loop(loop: asyncio.AbstractEventLoop, callback: Callable[[Any], Any], data: Any) -> None:
+    """Run callback(data) on the event loop and wait for it, so dispatcher workers track loop progress."""
+    done: concurrent.futures.Future[None] = concurrent.futures.Future()
+
+    def run() -> None:
+        try:
+            callback(data)
+        except BaseException as err:
+            done.set_exception(err)
+        else:
+            done.set_result(None)
+
+    loop.call_soon_threadsafe(run)
+    while True:
+        try:
+            return done.result(timeout=1.0)
+        except concurrent.futures.TimeoutError:
+            # A closed loop will never run the callback
+            if loop.is_closed():
+                raise RuntimeError("Event loop closed before listener callback ran") from None
+
+
+class AsyncHuckleberryAPI(_ClientBase):
+    """Async API client for Huckleberry.
+
+    Mirrors HuckleberryAPI, but uses the Firestore AsyncClient and aiohttp so
+    that many concurrent operations can share one event loop.
+    """
+
+    def __init__(
+        self,
+        email: str,
+        password: str,
+        timezone: str,
+        session: aiohttp.ClientSession | None = None,
+        pool_size: int = 10,
+        token_store: TokenStore | None = None,
+        interval_store: SQLiteIntervalStore | None = None,
+        blind_timer_writes: bool = False,
+        mirror_root_documents: bool = False,
+        multiplex_listeners: bool = False,
+        listener_dispatcher: ListenerDispatcher | None = None,
+    ) -> None:
+        """Initialize the API client.
+
+        Args:
+            email: User email for authentication.
+            password: User password for authentication.
+            timezone: IANA timezone string (e.g., "America/New_York", "Europe/London").
+            session: Optional aiohttp session for auth requests. If not provided,
+                one is created on first use and closed by close().
+            pool_size: Connection limit of the created session.
+            token_store: Optional store (e.g. FileTokenStore) used to persist tokens
+                across restarts, so password sign-in is only needed when they are invalid.
+            interval_store: Optional local mirror of interval history. When set,
+                interval reads sync changed documents into it and are answered locally.
+            blind_timer_writes: Low-latency mode for pause/resume/switch/cancel transitions.
+                When the timer state is known from a snapshot of a still open listener, the
+                transition is a single update using server-side increments instead of a read plus write. Only
+                safe when other writers are seen by a listener. complete_* reads the timer
+                unless the document is mirrored (see mirror_root_documents).
+            mirror_root_documents: Keep a local copy of each tracker root document that has a
+                listener, updated by snapshots and by this client's writes. Timer transitions
+                and get_growth_data then use it instead of reading the document.
+            multiplex_listeners: Watch each collection with one document-ID `in` query for all
+                children that have a listener (up to 30 per stream), instead of one watch
+                stream per child and collection.
+            listener_dispatcher: Deliver listener callbacks from this dispatcher's worker
+                threads (coalescing pending updates per document) instead of calling them
+                on the Firestore watch thread.
+        """
+        self.email = email
+        self.password = password
+        self.id_token: str | None = None
+        self.refresh_token: str | None = None
+        self.user_uid: str | None = None
+        self.token_expires_at: float | None = None
+        self._session = session
+        self._owns_session = session is None
+        self._pool_size = pool_size
+        self._token_store = token_store
+        self._interval_store = interval_store
+        self._auth_lock = asyncio.Lock()
+        self._refresher_task: asyncio.Task | None = None
+        self._watchdog_task: asyncio.Task | None = None
+        self._firestore_client: firestore.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # Watch streams are only available on the sync client; they run on their own threads
+        self._listener_client: firestore.Client | None = None
+        self._init_client_state(
+            timezone, blind_timer_writes, mirror_root_documents, multiplex_listeners, listener_dispatcher
+        )
+
+    async def __aenter__(self) -> AsyncHuckleberryAPI:
+        """Enter async context."""
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Stop listeners and release resources."""
+        await self.close()
+
+    async def close(self) -> None:
+        """Stop all listeners and close clients owned by this instance."""
+        await self.stop_token_refresher()
+        await self.stop_listener_watchdog()
+        await self.stop_all_listeners()
+        if self._firestore_client is not None:
+            self._firestore_client.close()
+            self._firestore_client = None
+        if self._listener_client is not None:
+            self._listener_client.close()
+            self._listener_client = None
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get or create the aiohttp session used for auth requests."""
+        if self._session is None:
+            self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self._pool_size))
+            self._owns_session = True
+        return self._session
+
+    async def _post_auth_request(self, url: str, payload: dict, action: str) -> dict:
+        """POST to a Firebase auth endpoint and return the JSON response."""
+        session = self._get_session()
+        async with session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=10)) as response:
+            if response.status >= 400:
+                _LOGGER.error("%s failed: HTTP %s", action, response.status)
+                try:
+                    error_data = await response.json(content_type=None)
+                    error_message = error_data.get("error", {}).get("message", "Unknown error")
+                    _LOGGER.error("Firebase error: %s", error_message)
+                except Exception:
+                    _LOGGER.error("Response: %s", await response.text())
+                response.raise_for_status()
+            return await response.json(content_type=None)
+
+    async def authenticate(self) -> None:
+        """Authenticate with Firebase."""
+        _LOGGER.debug("Authenticating with Huckleberry")
+
+        data = await self._post_auth_request(
+            f"{AUTH_URL}?key={FIREBASE_API_KEY}",
+            {
+                "email": self.email,
+                "password": self.password,
+                "returnSecureToken": True,
+            },
+            "Authentication",
+        )
+        self.id_token = data["idToken"]
+        self.refresh_token = data["refreshToken"]
+        self.user_uid = data["localId"]
+        self.token_expires_at = datetime.now().timestamp() + int(data["expiresIn"])
+        await self._save_tokens()
+        self._update_credentials()
+
+        _LOGGER.info("Successfully authenticated with Huckleberry")
+
+    async def maintain_session(self) -> None:
+        """Ensure the session is valid and refresh token if needed.
+
+        This should be called periodically (e.g. by coordinator) to ensure
+        listeners don't die due to token expiration.
+        """
+        await self._ensure_authenticated()
+
+    async def start_token_refresher(
+        self, lead_time: float = 600.0, jitter: float = 60.0, retry_interval: float = 30.0
+    ) -> None:
+        """Start a background task that refreshes the token ahead of expiry.
+
+        See HuckleberryAPI.start_token_refresher. The task runs on the current event loop.
+        """
+        if self._refresher_task is not None and not self._refresher_task.done():
+            return
+
+        self._refresher_task = asyncio.get_running_loop().create_task(
+            self._run_token_refresher(lead_time, jitter, retry_interval),
+            name="huckleberry-token-refresher",
+        )
+        self._refresher_stats["running"] = True
+        _LOGGER.info("Started background token refresher")
+
+    async def stop_token_refresher(self) -> None:
+        """Stop the background token refresher, if running."""
+        task = self._refresher_task
+        if task is None:
+            return
+
+        self._refresher_task = None
+        if task is not asyncio.current_task():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._refresher_stats["running"] = False
+        self._refresher_stats["next_refresh_at"] = None
+        _LOGGER.info("Stopped background token refresher")
+
+    async def _run_token_refresher(self, lead_time: float, jitter: float, retry_interval: float) -> None:
+        """Refresh loop of the background token refresher."""
+        stats = self._refresher_stats
+        while True:
+            next_refresh_at = _next_token_refresh_at(stats, self.token_expires_at, lead_time, jitter, retry_interval)
+            stats["next_refresh_at"] = next_refresh_at
+            await asyncio.sleep(max(next_refresh_at - time.time(), 0))
+
+            started = time.monotonic()
+            try:
+                if not self.id_token:
+                    await self._ensure_authenticated()
+                else:
+                    async with self._auth_lock:
+                        # Skip if a caller already refreshed while we were waiting
+                        if self.token_expires_at is None or time.time() >= self.token_expires_at - lead_time - jitter:
+                            await self.refresh_auth_token()
+            except Exception as err:
+                stats["failure_count"] += 1
+                stats["consecutive_failures"] += 1
+                stats["last_error"] = str(err)
+                _LOGGER.warning("Background token refresh failed (%d in a row): %s",
+                                stats["consecutive_failures"], err)
+                continue
+
+            stats["refresh_count"] += 1
+            stats["consecutive_failures"] = 0
+            stats["last_refresh_at"] = time.time()
+            stats["last_refresh_duration_sec"] = time.monotonic() - started
+            _LOGGER.debug("Background token refresh took %.3fs", stats["last_refresh_duration_sec"])
+
+    async def refresh_auth_token(self) -> None:
+        """Refresh the authentication token."""
+        if not self.refresh_token:
+            raise ValueError("No refresh token available")
+
+        _LOGGER.debug("Refreshing authentication token")
+
+        data = await self._post_auth_request(
+            f"{REFRESH_URL}?key={FIREBASE_API_KEY}",
+            {
+                "grant_type": "refresh_token",
+                "refresh_token": self.refresh_token,
+            },
+            "Token refresh",
+        )
+        self.id_token = data["id_token"]
+        self.refresh_token = data["refresh_token"]
+        self.token_expires_at = datetime.now().timestamp() + int(data["expires_in"])
+        await self._save_tokens()
+
+        # Swap the token into the live credentials shared by both Firestore clients
+        self._update_credentials()
+
+        _LOGGER.debug("Successfully refreshed authentication token")
+
+    def _refresh_credentials(self) -> None:
+        """Refresh handler of FirebaseTokenCredentials, called by google-auth near expiry.
+
+        google-auth calls this from gRPC threads; the refresh runs on the event loop
+        that created the credentials. On the loop itself it can't block, and the
+        token is left to the next _ensure_authenticated call instead.
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            if asyncio.get_running_loop() is loop:
+                return
+        except RuntimeError:
+            pass
+        asyncio.run_coroutine_threadsafe(self._ensure_authenticated(), loop).result(timeout=30)
+
+    async def _save_tokens(self) -> None:
+        """Persist current tokens to the token store, if one is configured."""
+        if self._token_store is None:
+            return
+
+        stored = _stored_tokens(self.id_token, self.refresh_token, self.user_uid, self.token_expires_at)
+        if stored is None:
+            return
+
+        try:
+            await asyncio.to_thread(self._token_store.save, self.email, stored)
+        except Exception as err:
+            _LOGGER.warning("Failed to save tokens to token store: %s", err)
+
+    async def _restore_tokens(self) -> bool:
+        """Restore tokens saved by a previous run, refreshing them if they are about to expire.
+
+        Returns:
+            True if a valid session was restored, False if password sign-in is needed.
+        """
+        if self._token_store is None:
+            return False
+
+        try:
+            stored = await asyncio.to_thread(self._token_store.load, self.email)
+        except Exception as err:
+            _LOGGER.warning("Failed to load tokens from token store: %s", err)
+            return False
+
+        if not stored:
+            return False
+
+        self.id_token = stored["id_token"]
+        self.refresh_token = stored["refresh_token"]
+        self.user_uid = stored["user_uid"]
+        self.token_expires_at = stored["token_expires_at"]
+
+        if datetime.now().timestamp() >= self.token_expires_at - 300:
+            try:
+                await self.refresh_auth_token()
+            except aiohttp.ClientError as err:
+                if not _refresh_token_rejected(err.status if isinstance(err, aiohttp.ClientResponseError) else None):
+                    # Transient failure: keep the stored tokens, the next call retries the refresh
+                    raise
+                await self._discard_stored_tokens(err)
+                return False
+            except (KeyError, ValueError) as err:
+                await self._discard_stored_tokens(err)
+                return False
+
+        self._update_credentials()
+        _LOGGER.info("Restored Huckleberry session from token store")
+        return True
+
+    async def _discard_stored_tokens(self, err: Exception) -> None:
+        """Forget a session whose refresh token was rejected, in memory and in the token store."""
+        assert self._token_store is not None
+        _LOGGER.warning("Stored refresh token rejected, signing in with password: %s", err)
+        self.id_token = self.refresh_token = self.user_uid = self.token_expires_at = None
+        try:
+            await asyncio.to_thread(self._token_store.clear, self.email)
+        except Exception as clear_err:
+            _LOGGER.warning("Failed to clear token store: %s", clear_err)
+
+    async def _ensure_authenticated(self) -> None:
+        """Ensure we have a valid authentication token.
+
+        Tokens from the token store are tried before signing in with password.
+        Serialized so that concurrent calls near expiry trigger a single refresh.
+        """
+        # Only contend for the lock (held by the background refresher while it refreshes) if needed
+        if _token_is_fresh(self.id_token, self.token_expires_at):
+            return
+        async with self._auth_lock:
+            if not self.id_token:
+                if not await self._restore_tokens():
+                    await self.authenticate()
+            elif not _token_is_fresh(self.id_token, self.token_expires_at):
+                await self.refresh_auth_token()
+
+    async def _get_firestore_client(self) -> firestore.AsyncClient:
+        """Get or create async Firestore client."""
+        await self._ensure_authenticated()
+
+        if not self._firestore_client:
+            assert self.id_token is not None, "id_token should be set after authentication"
+            self._firestore_client = firestore.AsyncClient(
+                project=FIREBASE_PROJECT_ID,
+                credentials=self._get_credentials(),
+            )
+
+        return self._firestore_client
+
+    def _get_credentials(self) -> FirebaseTokenCredentials:
+        """Get or create the credentials shared by both Firestore clients."""
+        if self._credentials is None:
+            assert self.id_token is not None, "id_token should be set after authentication"
+            self._loop = asyncio.get_running_loop()
+            self._credentials = FirebaseTokenCredentials(
+                self.id_token, self.token_expires_at, refresh_handler=self._refresh_credentials
+            )
+
+        return self._credentials
+
+    def _get_listener_client(self) -> firestore.Client:
+        """Get or create the sync Firestore client used for watch streams."""
+        if not self._listener_client:
+            self._listener_client = firestore.Client(
+                project=FIREBASE_PROJECT_ID,
+                credentials=self._get_credentials(),
+            )
+
+        return self._listener_client
+
+    async def _run_timer_transition(
+        self,
+        doc_ref: firestore.AsyncDocumentReference,
+        transition: Callable[[dict | None, float], T | None],
+        stage: Callable[[firestore.AsyncTransaction | firestore.AsyncWriteBatch, T, Any], None] | None = None,
+    ) -> T | None:
+        """Read the timer and commit the transition's writes in one transaction.
+
+        The transaction is retried with a fresh read if the document is changed concurrently
+        (e.g. by the phone app). The read is skipped when the document is mirrored: the write
+        then carries the mirrored update_time as precondition, and falls back to the transaction
+        if the document has changed since. With blind_timer_writes, the read is also skipped when
+        the timer state is known locally and there is no custom stage.
+
+        Args:
+            doc_ref: Tracker document holding the timer
+            transition: Builds the writes from (document data, now), or returns None for no change
+            stage: Adds the writes to the transaction (or batch) given the write option to pass to
+                the update of doc_ref (None in a transaction); by default the result updates doc_ref
+
+        Returns:
+            Result of the transition from the committed attempt
+        """
+        client = await self._get_firestore_client()
+        unread = self._unread_timer_document(doc_ref.path, stage is not None)
+        if unread is not None:
+            data, option = unread
+            result = transition(data, time.time())
+            if result is None:
+                return None
+            try:
+                if stage is None:
+                    update = cast(dict, result)
+                    if option is None:
+                        update = _blind_timer_update(update, (data or {}).get("timer") or {})
+                    write_result = await doc_ref.update(update, option=option)
+                    self._apply_local_write(doc_ref.path, cast(dict, result), update_time=write_result.update_time)
+                else:
+                    batch = client.batch()
+                    stage(batch, result, option)
+                    await batch.commit()
+                return result
+            except FailedPrecondition:
+                _LOGGER.debug("%s changed since its mirrored snapshot, reading it in a transaction", doc_ref.path)
+
+        @firestore.async_transactional
+        async def run(transaction: firestore.AsyncTransaction) -> T | None:
+            doc = await doc_ref.get(field_paths=["timer"], transaction=transaction, timeout=10.0)
+            data = (doc.to_dict() or {}) if doc.exists else None
+            result = transition(data, time.time())
+            if result is not None:
+                if stage is None:
+                    transaction.update(doc_ref, cast(dict, result))
+                else:
+                    stage(transaction, result, None)
+            return result
+
+        result = await run(client.transaction())
+        if result is not None and stage is None:
+            self._apply_local_write(doc_ref.path, cast(dict, result))
+        return result
+
+    async def get_children(self, field_mask: bool = True) -> list[ChildData]:
+        """Get list of children from user profile.
+
+        All child documents are fetched in a single batch read.
+
+        Args:
+            field_mask: Only download the document fields mapped into ChildData.
+        """
+        _LOGGER.debug("Fetching children list")
+
+        try:
+            db = await self._get_firestore_client()
+
+            user_doc = await db.collection("users").document(self.user_uid).get(
+                field_paths=["childList"] if field_mask else None
+            )
+            child_ids = _child_ids_from_user(user_doc.to_dict() if user_doc.exists else None)
+            if not child_ids:
+                return []
+
+            child_refs = [db.collection("childs").document(child_id) for child_id in child_ids]
+            snapshots = [
+                snapshot
+                async for snapshot in db.get_all(
+                    child_refs, field_paths=CHILD_DOCUMENT_FIELDS if field_mask else None
+                )
+            ]
+            children = _children_from_snapshots(child_ids, snapshots)
+            if not children:
+                return []
+
+            _LOGGER.info("Found %d children", len(children))
+            return children
+
+        except Exception as err:
+            _LOGGER.error("Failed to get children: %s", err)
+            raise
+
+    async def start_sleep(self, child_uid: str) -> None:
+        """Start sleep tracking for a child."""
+        _LOGGER.info("Starting sleep tracking for child %s", child_uid)
+
+        client = await self._get_firestore_client()
+        sleep_ref = client.collection("sleep").document(child_uid)
+        sleep_data = _sleep_timer_document(time.time())
+        await sleep_ref.set(cast(dict, sleep_data), merge=True)
+        self._apply_local_write(sleep_ref.path, cast(dict, sleep_data), merge=True)
+
+        _LOGGER.info("Sleep tracking started successfully")
+
+    async def pause_sleep(self, child_uid: str) -> None:
+        """Pause current sleep session without ending it."""
+        _LOGGER.info("Pausing sleep for child %s", child_uid)
+
+        client = await self._get_firestore_client()
+        sleep_ref = client.collection("sleep").document(child_uid)
+
+        update = await self._run_timer_transition(
+            sleep_ref, lambda data, now: _pause_sleep_update(child_uid, data, now)
+        )
+        if update is None:
+            return
+
+        _LOGGER.info("Sleep paused for child %s", child_uid)
+
+    async def resume_sleep(self, child_uid: str) -> None:
+        """Resume a paused sleep session."""
+        _LOGGER.info("Resuming sleep for child %s", child_uid)
+
+        client = await self._get_firestore_client()
+        sleep_ref = client.collection("sleep").document(child_uid)
+
+        update = await self._run_timer_transition(
+            sleep_ref, lambda data, now: _resume_sleep_update(child_uid, data, now)
+        )
+        if update is None:
+            return
+
+        _LOGGER.info("Sleep resumed for child %s", child_uid)
+
+    async def cancel_sleep(self, child_uid: str) -> None:
+        """Cancel current sleep session without saving an interval."""
+        _LOGGER.info("Cancelling current sleep for child %s", child_uid)
+
+        client = await self._get_firestore_client()
+        sleep_ref = client.collection("sleep").document(child_uid)
+
+        await self._run_timer_transition(sleep_ref, lambda data, now: _cancel_sleep_update(child_uid, data, now))
+
+        _LOGGER.info("Sleep cancelled for child %s", child_uid)
+
+    async def complete_sleep(self, child_uid: str) -> None:
+        """Complete current sleep session and save interval."""
+        _LOGGER.info("Completing sleep for child %s", child_uid)
+
+        client = await self._get_firestore_client()
+        sleep_ref = client.collection("sleep").document(child_uid)
+
+        def stage(
+            transaction: firestore.AsyncTransaction | firestore.AsyncWriteBatch,
+            writes: tuple[str | None, dict | None, dict],
+            option: Any,
+        ) -> None:
+            # Interval and root update are committed atomically with the timer read
+            interval_id, interval, root_update = writes
+            if interval_id is not None and interval is not None:
+                transaction.set(sleep_ref.collection("intervals").document(interval_id), interval)
+            transaction.update(sleep_ref, root_update, option=option)
+
+        writes = await self._run_timer_transition(
+            sleep_ref,
+            lambda data, now: _complete_sleep_writes(child_uid, data, now, self._get_timezone_offset_minutes()),
+            stage,
+        )
+        if writes is None:
+            return
+
+        _, interval, root_update = writes
+        self._apply_local_write(sleep_ref.path, root_update)
+        if interval is not None:
+            await self._mark_intervals_stale("sleep", child_uid)
+            _LOGGER.info("Sleep completed for child %s (duration %ss)", child_uid, interval["duration"])
+
+    async def start_feeding(self, child_uid: str, side: FeedSide = "left") -> None:
+        """Start feeding tracking."""
+        _LOGGER.info("Starting feeding for child %s on %s side", child_uid, side)
+
+        client = await self._get_firestore_client()
+        feed_ref = client.collection("feed").document(child_uid)
+        feed_data = _feed_timer_document(time.time(), side)
+        await feed_ref.set(cast(dict, feed_data), merge=True)
+        self._apply_local_write(feed_ref.path, cast(dict, feed_data), merge=True)
+
+        _LOGGER.info("Feeding started on %s side", side)
+
+    async def pause_feeding(self, child_uid: str) -> None:
+        """Pause current feeding session."""
+        _LOGGER.info("Pausing feeding for child %s", child_uid)
+
+        client = await self._get_firestore_client()
+        feed_ref = client.collection("feed").document(child_uid)
+
+        update = await self._run_timer_transition(
+            feed_ref, lambda data, now: _pause_feeding_update(child_uid, data, now)
+        )
+        if update is None:
+            return
+
+        _LOGGER.info("Feeding paused (L:%ss R:%ss)", update["timer.leftDuration"], update["timer.rightDuration"])
+
+    async def resume_feeding(self, child_uid: str, side: FeedSide | None = None) -> None:
+        """Resume paused feeding session."""
+        _LOGGER.info("Resuming feeding for child %s", child_uid)
+
+        client = await self._get_firestore_client()
+        feed_ref = client.collection("feed").document(child_uid)
+
+        update = await self._run_timer_transition(
+            feed_ref, lambda data, now: _resume_feeding_update(child_uid, data, now, side)
+        )
+        if update is None:
+            return
+
+        _LOGGER.info("Feeding resumed on %s", update["timer.activeSide"])
+
+    async def switch_feeding_side(self, child_uid: str) -> None:
+        """Switch feeding side (left <-> right)."""
+        _LOGGER.info("Switching feeding side for child %s", child_uid)
+
+        client = await self._get_firestore_client()
+        feed_ref = client.collection("feed").document(child_uid)
+
+        update = await self._run_timer_transition(
+            feed_ref, lambda data, now: _switch_feeding_update(child_uid, data, now)
+        )
+        if update is None:
+            return
+
+        _LOGGER.info("Switched to %s (L:%ss R:%ss)", update["timer.activeSide"], update["timer.leftDuration"],
+                     update["timer.rightDuration"])
+
+    async def cancel_feeding(self, child_uid: str) -> None:
+        """Cancel current feeding without saving."""
+        _LOGGER.info("Cancelling feeding for child %s", child_uid)
+
+        client = await self._get_firestore_client()
+        feed_ref = client.collection("feed").document(child_uid)
+
+        await self._run_timer_transition(feed_ref, _cancel_feeding_update)
+
+        _LOGGER.info("Feeding cancelled")
+
+    async def complete_feeding(self, child_uid: str) -> None:
+        """Complete current feeding and save to history."""
+        _LOGGER.info("Completing feeding for child %s", child_uid)
+
+        client = await self._get_firestore_client()
+        feed_ref = client.collection("feed").document(child_uid)
+
+        def stage(
+            transaction: firestore.AsyncTransaction | firestore.AsyncWriteBatch,
+            writes: tuple[str, dict, dict],
+            option: Any,
+        ) -> None:
+            interval_id, interval, root_update = writes
+            transaction.set(feed_ref.collection("intervals").document(interval_id), interval)
+            transaction.update(feed_ref, root_update, option=option)
+
+        try:
+            writes = await self._run_timer_transition(
+                feed_ref,
+                lambda data, now: _complete_feeding_writes(child_uid, data, now, self._get_timezone_offset_minutes()),
+                stage,
+            )
+        except Exception as err:
+            _LOGGER.error("Failed to complete feeding: %s", err)
+            raise
+        if writes is None:
+            return
+
+        interval_id, interval, root_update = writes
+        self._apply_local_write(feed_ref.path, root_update)
+        await self._mark_intervals_stale("feed", child_uid)
+        _LOGGER.info("Created feeding interval entry: %s", interval_id)
+
+        _LOGGER.info("Feeding completed (total duration %ss, L:%ss R:%ss)",
+                     root_update["prefs.lastNursing"]["duration"], interval["leftDuration"], interval["rightDuration"])
+
+    async def log_bottle_feeding(
+        self,
+        child_uid: str,
+        amount: float,
+        bottle_type: BottleType = "Formula",
+        units: VolumeUnits = "ml",
+    ) -> None:
+        """Log bottle feeding as instant event.
+
+        Args:
+            child_uid: Child unique identifier
+            bottle_type: Type of bottle contents ("Breast Milk", "Formula", or "Mixed")
+            amount: Amount fed in specified units
+            units: Volume units ("ml" or "oz")
+        """
+        _LOGGER.info(
+            "Logging bottle feeding for child %s: %s %s of %s",
+            child_uid, amount, units, bottle_type
+        )
+
+        client = await self._get_firestore_client()
+        feed_ref = client.collection("feed").document(child_uid)
+
+        now_time = time.time()
+        offset = self._get_timezone_offset_minutes()
+        interval_id = _new_interval_id(now_time)
+
+        batch = client.batch()
+        batch.set(
+            feed_ref.collection("intervals").document(interval_id),
+            cast(dict, _bottle_interval(now_time, offset, amount, bottle_type, units)),
+        )
+        prefs = _bottle_prefs(now_time, offset, amount, bottle_type, units)
+        batch.set(feed_ref, prefs, merge=True)
+
+        try:
+            await batch.commit()
+            _LOGGER.info("Created bottle feeding interval entry: %s", interval_id)
+            self._apply_local_write(feed_ref.path, prefs, merge=True)
+            await self._mark_intervals_stale("feed", child_uid)
+        except Exception as err:
+            _LOGGER.error("Failed to create bottle feeding interval entry: %s", err)
+            raise RuntimeError(f"Failed to log bottle feeding: {err}") from err
+
+        _LOGGER.info(
+            "Bottle feeding logged: %s %s of %s",
+            amount, units, bottle_type
+        )
+
+    async def log_diaper(self, child_uid: str, mode: DiaperMode,
+                         pee_amount: DiaperAmount | None = None, poo_amount: DiaperAmount | None = None,
+                         color: PooColor | None = None, consistency: PooConsistency | None = None,
+                         diaper_rash: bool = False, notes: str | None = None) -> None:
+        """
+        Log a diaper change.
+
+        Args:
+            child_uid: Child unique identifier
+            mode: One of 'pee', 'poo', 'both', 'dry'
+            pee_amount: Pee amount - 'little', 'medium', 'big', or None (no quantity)
+            poo_amount: Poo amount - 'little', 'medium', 'big', or None (no quantity)
+            color: Poo color - 'yellow', 'brown', 'black', 'green', 'red', 'gray'
+            consistency: Poo consistency - 'solid', 'loose', 'runny', 'mucousy', 'hard', 'pebbles', 'diarrhea'
+            diaper_rash: Whether baby has diaper rash
+            notes: Optional notes about this diaper change
+        """
+        _LOGGER.info("Logging diaper change for child %s: mode=%s", child_uid, mode)
+
+        client = await self._get_firestore_client()
+        diaper_ref = client.collection("diaper").document(child_uid)
+
+        current_time = time.time()
+        offset = self._get_timezone_offset_minutes()
+        interval_id = _new_interval_id(current_time)
+        interval_data = _diaper_interval(
+            current_time, offset, mode, pee_amount, poo_amount, color, consistency, diaper_rash, notes
+        )
+
+        batch = client.batch()
+        batch.set(diaper_ref.collection("intervals").document(interval_id), cast(dict, interval_data))
+        prefs_update = _diaper_prefs_update(current_time, offset, mode)
+        batch.update(diaper_ref, prefs_update)
+
+        try:
+            await batch.commit()
+            _LOGGER.info("Created diaper interval: %s", interval_id)
+            self._apply_local_write(diaper_ref.path, prefs_update)
+            await self._mark_intervals_stale("diaper", child_uid)
+        except Exception as err:
+            _LOGGER.error("Failed to log diaper change: %s", err)
+            raise
+
+        _LOGGER.info("Diaper change logged successfully")
+
+    async def log_growth(self, child_uid: str, weight: float | None = None, height: float | None = None,
+                         head: float | None = None, units: MeasurementUnits = "metric") -> None:
+        """
+        Log growth measurements (weight, height, head circumference).
+
+        Args:
+            child_uid: Child unique identifier
+            weight: Weight measurement (kg for metric, lbs for imperial)
+            height: Height measurement (cm for metric, inches for imperial)
+            head: Head circumference (cm for metric, inches for imperial)
+            units: 'metric' or 'imperial'
+        """
+        _LOGGER.info("Logging growth data for child %s", child_uid)
+
+        if not any([weight, height, head]):
+            raise ValueError("At least one measurement (weight, height, or head) is required")
+
+        client = await self._get_firestore_client()
+        health_ref = client.collection("health").document(child_uid)
+
+        current_time = time.time()
+        interval_id = _new_interval_id(current_time)
+        growth_entry = _growth_entry(
+            interval_id, current_time, self._get_timezone_offset_minutes(), weight, height, head, units
+        )
+
+        batch = client.batch()
+        batch.set(health_ref.collection("data").document(interval_id), cast(dict, growth_entry))
+        prefs_update = _growth_prefs_update(current_time, growth_entry)
+        batch.update(health_ref, prefs_update)
+
+        try:
+            await batch.commit()
+            _LOGGER.info("Growth data logged successfully")
+            self._apply_local_write(health_ref.path, prefs_update)
+            await self._mark_intervals_stale("health", child_uid)
+        except Exception as err:
+            _LOGGER.error("Failed to log growth data: %s", err)
+            raise
+
+    async def get_growth_data(self, child_uid: str) -> GrowthData:
+        """
+        Get the latest growth measurements for a child.
+
+        Args:
+            child_uid: Child unique identifier
+
+        Returns:
+            GrowthData containing latest growth measurements
+        """
+        client = await self._get_firestore_client()
+        health_ref = client.collection("health").document(child_uid)
+
+        known, data, _ = self._mirror_lookup(health_ref.path)
+        if known:
+            return _growth_data_from_health(data)
+
+        try:
+            doc = await health_ref.get(field_paths=["prefs.lastGrowthEntry"])
+            return _growth_data_from_health(doc.to_dict() if doc.exists else None)
+        except Exception as err:
+            _LOGGER.error("Failed to get growth data: %s", err)
+            return {
+                "weight_units": "kg",
+                "height_units": "cm",
+                "head_units": "hcm",
+            }
+
+    async def import_history(self, child_uid: str, entries: Iterable[HistoryImportEntry]) -> HistoryImportResult:
+        """
+        Import past diaper, bottle and growth events, e.g. to backfill history from another tracker.
+
+        Intervals are written with a Firestore BulkWriter (in a worker thread, as BulkWriter is
+        blocking). The root prefs are updated once at the end, and only when an imported entry is newer.
+
+        Args:
+            child_uid: Child unique identifier
+            entries: History entries, e.g. from read_history_csv() or read_history_jsonl()
+
+        Returns:
+            HistoryImportResult with the number of written and failed intervals
+
+        Raises:
+            ValueError: If an entry is invalid (nothing is written in that case)
+        """
+        now = time.time()
+        intervals = [_history_interval(entry, self._timezone, now) for entry in entries]
+        _LOGGER.info("Importing %d history entries for child %s", len(intervals), child_uid)
+
+        client = await self._get_firestore_client()
+        written = await asyncio.to_thread(_bulk_write_history, self._get_listener_client(), child_uid, intervals)
+        for collection_name in {HISTORY_TRACKERS[entry_type][0] for entry_type, _, _ in intervals}:
+            await self._mark_intervals_stale(collection_name, child_uid)
+
+        latest = _latest_history_intervals(intervals, written)
+        if latest:
+            refs = {
+                entry_type: client.collection(HISTORY_TRACKERS[entry_type][0]).document(child_uid)
+                for entry_type in latest
+            }
+            types_by_path = {ref.path: entry_type for entry_type, ref in refs.items()}
+            current = {
+                types_by_path[snapshot.reference.path]: (snapshot.to_dict() or {}) if snapshot.exists else None
+                async for snapshot in client.get_all(
+                    list(refs.values()), field_paths=[f"prefs.{HISTORY_TRACKERS[t][1]}.start" for t in latest]
+                )
+            }
+
+            prefs_writes = _history_prefs_writes(latest, current, now)
+            if prefs_writes:
+                batch = client.batch()
+                for entry_type, data, merge in prefs_writes:
+                    if merge:
+                        batch.set(refs[entry_type], data, merge=True)
+                    else:
+                        batch.update(refs[entry_type], data)
+                await batch.commit()
+                for entry_type, data, merge in prefs_writes:
+                    self._apply_local_write(refs[entry_type].path, data, merge)
+
+        _LOGGER.info("Imported %d of %d history entries", len(written), len(intervals))
+        return {"written": len(written), "failed": len(intervals) - len(written)}
+
+    async def get_calendar_events(
+        self,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        extra_fields: Iterable[str] = (),
+    ) -> dict[str, list[dict]]:
+        """
+        Fetch all calendar events (sleep, feed, diaper, health) for a date range.
+
+        Args:
+            child_uid: Child unique identifier
+            start_timestamp: Start of range (Unix timestamp in seconds)
+            end_timestamp: End of range (Unix timestamp in seconds)
+            extra_fields: Additional interval document fields to include in events
+
+        Returns:
+            Dictionary with event type keys and lists of event dicts
+        """
+        # Authenticate once, then run every tracker query concurrently
+        await self._get_firestore_client()
+        extra = tuple(extra_fields)
+        results = await asyncio.gather(*(
+            self._get_intervals(collection_name, child_uid, start_timestamp, end_timestamp, extra)
+            for collection_name in CALENDAR_COLLECTIONS
+        ))
+        return dict(zip(CALENDAR_COLLECTIONS, results))
+
+    async def _intervals_ref(
+        self, collection_name: CollectionName, child_uid: str
+    ) -> firestore.AsyncCollectionReference:
+        """Get the interval subcollection of a tracker document."""
+        client = await self._get_firestore_client()
+        return client.collection(collection_name).document(child_uid).collection(
+            INTERVAL_SUBCOLLECTIONS[collection_name]
+        )
+
+    async def _fetch_regular_events(
+        self,
+        collection_name: CollectionName,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        extra_fields: tuple[str, ...] = (),
+    ) -> list[dict]:
+        """Query regular interval documents with server-side date filtering."""
+        return [
+            event
+            async for event in self._stream_regular_events(
+                collection_name, child_uid, start_timestamp, end_timestamp, extra_fields
+            )
+        ]
+
+    async def _stream_regular_events(
+        self,
+        collection_name: CollectionName,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        extra_fields: tuple[str, ...] = (),
+    ) -> AsyncIterator[dict]:
+        """Yield regular interval events in start order as the query streams, reading only mapped fields."""
+        intervals_ref = await self._intervals_ref(collection_name, child_uid)
+        regular_docs = intervals_ref.where(
+            filter=firestore.FieldFilter("start", ">=", start_timestamp)
+        ).where(
+            filter=firestore.FieldFilter("start", "<", end_timestamp)
+        ).order_by("start").select(_interval_select_fields(collection_name, extra_fields)).stream()
+
+        async for doc in regular_docs:
+            data = doc.to_dict()
+            if not data or data.get("multi"):
+                continue  # Skip multi-entry docs from this query
+
+            yield _interval_event(collection_name, data, False, extra_fields)
+
+    async def _fetch_multi_entry_events(
+        self,
+        collection_name: CollectionName,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        extra_fields: tuple[str, ...] = (),
+    ) -> list[dict]:
+        """Get multi-entry events in range (can't filter by nested start field, so filter them here)."""
+        index = await self._update_multi_entry_index(collection_name, child_uid)
+        return [
+            _interval_event(collection_name, entry, True, extra_fields)
+            for entry in _iter_index_range(index, start_timestamp, end_timestamp)
+        ]
+
+    async def _update_multi_entry_index(
+        self, collection_name: CollectionName, child_uid: str
+    ) -> tuple[list[float], list[dict]]:
+        """Bring the multi-entry cache of a tracker up to date and return its range index.
+
+        See HuckleberryAPI._update_multi_entry_index.
+        """
+        client = await self._get_firestore_client()
+        intervals_ref = await self._intervals_ref(collection_name, child_uid)
+        probe = intervals_ref.where(
+            filter=firestore.FieldFilter("multi", "==", True)
+        ).select([FieldPath.document_id()]).stream()
+
+        cached = self._multi_entry_cache.get((collection_name, child_uid), {})
+        documents = {}
+        changed_refs = []
+        async for doc in probe:
+            cached_document = cached.get(doc.id)
+            if cached_document is not None and cached_document[0] == doc.update_time:
+                documents[doc.id] = cached_document
+            else:
+                changed_refs.append(doc.reference)
+
+        if changed_refs:
+            async for doc in client.get_all(changed_refs):
+                if doc.exists:
+                    documents[doc.id] = (doc.update_time, _multi_entry_items(doc.to_dict()))
+            _LOGGER.debug("Parsed %d changed multi-entry %s documents", len(changed_refs), collection_name)
+
+        index = self._multi_entry_index.get((collection_name, child_uid))
+        if index is None or changed_refs or len(documents) != len(cached):
+            index = self._multi_entry_index[(collection_name, child_uid)] = _build_multi_entry_index(documents)
+        # Replacing the whole entry also drops deleted documents
+        self._multi_entry_cache[(collection_name, child_uid)] = documents
+
+        return index
+
+    async def _sync_intervals(self, collection_name: CollectionName, child_uid: str) -> None:
+        """Pull interval documents changed since the last sync into the interval store."""
+        store = self._interval_store
+        assert store is not None
+        if await asyncio.to_thread(store.is_fresh, collection_name, child_uid):
+            return
+
+        query: firestore.AsyncQuery | firestore.AsyncCollectionReference = await self._intervals_ref(
+            collection_name, child_uid
+        )
+        watermark = await asyncio.to_thread(store.get_watermark, collection_name, child_uid)
+        if watermark is not None:
+            query = query.where(filter=firestore.FieldFilter("lastUpdated", ">", watermark))
+
+        documents = [(doc.id, doc.to_dict() or {}) async for doc in query.stream()]
+        count = await asyncio.to_thread(store.apply_documents, collection_name, child_uid, documents)
+        _LOGGER.debug("Synced %d %s documents for child %s", count, collection_name, child_uid)
+
+        if await asyncio.to_thread(store.needs_reconcile, collection_name, child_uid):
+            await self._reconcile_intervals(collection_name, child_uid)
+
+    async def _reconcile_intervals(self, collection_name: CollectionName, child_uid: str) -> None:
+        """Drop stored documents that were deleted in Firestore.
+
+        See HuckleberryAPI._reconcile_intervals.
+        """
+        store = self._interval_store
+        assert store is not None
+        client = await self._get_firestore_client()
+        intervals_ref = await self._intervals_ref(collection_name, child_uid)
+        refs = {doc.id: doc.reference async for doc in intervals_ref.select([FieldPath.document_id()]).stream()}
+
+        stored_ids = await asyncio.to_thread(store.document_ids, collection_name, child_uid)
+        missing_refs = [ref for doc_id, ref in refs.items() if doc_id not in stored_ids]
+        if missing_refs:
+            documents = [(doc.id, doc.to_dict() or {}) async for doc in client.get_all(missing_refs) if doc.exists]
+            await asyncio.to_thread(store.apply_documents, collection_name, child_uid, documents)
+        removed = await asyncio.to_thread(store.retain_documents, collection_name, child_uid, list(refs))
+        _LOGGER.debug(
+            "Reconciled %s for child %s: %d fetched, %d removed", collection_name, child_uid, len(missing_refs), removed
+        )
+
+    async def _mark_intervals_stale(self, collection_name: CollectionName, child_uid: str) -> None:
+        """Make the next stored read of a tracker sync again, so it sees this client's own writes."""
+        if self._interval_store is not None:
+            await asyncio.to_thread(self._interval_store.mark_stale, collection_name, child_uid)
+
+    async def _sync_interval_store(self, collection_name: CollectionName, child_uid: str) -> SQLiteIntervalStore:
+        """Sync the interval store, falling back to stored data if a previous sync succeeded."""
+        store = self._interval_store
+        assert store is not None
+        try:
+            await self._sync_intervals(collection_name, child_uid)
+        except Exception as err:
+            if not await asyncio.to_thread(store.is_synced, collection_name, child_uid):
+                raise
+            _LOGGER.warning("Sync of %s failed, serving stored data: %s", _INTERVAL_LABELS[collection_name], err)
+        return store
+
+    async def _get_stored_intervals(
+        self,
+        collection_name: CollectionName,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        extra_fields: tuple[str, ...] = (),
+    ) -> list[dict]:
+        """Sync the interval store incrementally and answer the range query from it."""
+        store = await self._sync_interval_store(collection_name, child_uid)
+        entries = await asyncio.to_thread(store.query, collection_name, child_uid, start_timestamp, end_timestamp)
+        return [_interval_event(collection_name, entry, is_multi, extra_fields) for entry, is_multi in entries]
+
+    async def _get_intervals(
+        self,
+        collection_name: CollectionName,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        extra_fields: tuple[str, ...] = (),
+    ) -> list[dict]:
+        """Fetch interval events of one tracker, running both queries concurrently.
+
+        Results are merged in start order. With an interval store, the range is answered from the store instead.
+        """
+        events = []
+        try:
+            if self._interval_store is not None:
+                events.extend(await self._get_stored_intervals(
+                    collection_name, child_uid, start_timestamp, end_timestamp, extra_fields
+                ))
+                return events
+
+            regular, multi = await asyncio.gather(
+                self._fetch_regular_events(collection_name, child_uid, start_timestamp, end_timestamp, extra_fields),
+                self._fetch_multi_entry_events(
+                    collection_name, child_uid, start_timestamp, end_timestamp, extra_fields
+                ),
+            )
+            events = _merge_by_start(regular, multi)
+        except Exception as err:
+            _LOGGER.error("Error fetching %s: %s", _INTERVAL_LABELS[collection_name], err)
+
+        return events
+
+    async def get_sleep_intervals(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, extra_fields: Iterable[str] = ()
+    ) -> list[dict]:
+        """Fetch sleep intervals from Firestore for a date range."""
+        return await self._get_intervals("sleep", child_uid, start_timestamp, end_timestamp, tuple(extra_fields))
+
+    async def get_feed_intervals(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, extra_fields: Iterable[str] = ()
+    ) -> list[dict]:
+        """Fetch feeding intervals from Firestore for a date range."""
+        return await self._get_intervals("feed", child_uid, start_timestamp, end_timestamp, tuple(extra_fields))
+
+    async def get_diaper_intervals(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, extra_fields: Iterable[str] = ()
+    ) -> list[dict]:
+        """Fetch diaper intervals from Firestore for a date range."""
+        return await self._get_intervals("diaper", child_uid, start_timestamp, end_timestamp, tuple(extra_fields))
+
+    async def get_health_entries(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, extra_fields: Iterable[str] = ()
+    ) -> list[dict]:
+        """Fetch health/growth entries from Firestore for a date range."""
+        return await self._get_intervals("health", child_uid, start_timestamp, end_timestamp, tuple(extra_fields))
+
+    async def _get_intervals_page(
+        self,
+        collection_name: CollectionName,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        page_size: int,
+        cursor: str | None,
+        extra_fields: tuple[str, ...] = (),
+    ) -> IntervalPage:
+        """Fetch one page of interval events of one tracker from Firestore.
+
+        See HuckleberryAPI._get_intervals_page.
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+
+        intervals_ref = await self._intervals_ref(collection_name, child_uid)
+        query = intervals_ref.where(
+            filter=firestore.FieldFilter("start", ">=", start_timestamp)
+        ).where(
+            filter=firestore.FieldFilter("start", "<", end_timestamp)
+        ).order_by("start").order_by("__name__").select(_interval_select_fields(collection_name, extra_fields))
+
+        last_start = None
+        if cursor is not None:
+            last_start, last_doc_id = _decode_page_cursor(collection_name, cursor)
+            query = query.start_after({"start": last_start, "__name__": last_doc_id})
+
+        docs = [doc async for doc in query.limit(page_size).stream()]
+        regular = []
+        for doc in docs:
+            data = doc.to_dict()
+            if data and not data.get("multi"):
+                regular.append(_interval_event(collection_name, data, False, extra_fields))
+
+        next_cursor = None
+        if len(docs) == page_size:
+            page_end = docs[-1].get("start")
+            next_cursor = _encode_page_cursor(collection_name, page_end, docs[-1].id)
+
+        # Multi-entry events in (previous page end, this page end]
+        starts, multi_entries = await self._update_multi_entry_index(collection_name, child_uid)
+        low = bisect_left(starts, start_timestamp) if last_start is None else bisect_right(starts, last_start)
+        high = bisect_left(starts, end_timestamp) if next_cursor is None else bisect_right(starts, page_end)
+        multi = [_interval_event(collection_name, entry, True, extra_fields) for entry in multi_entries[low:high]]
+
+        return {
+            "events": _merge_by_start(regular, multi),
+            "next_cursor": next_cursor,
+        }
+
+    async def get_sleep_intervals_page(
+        self,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        page_size: int = 100,
+        cursor: str | None = None,
+        extra_fields: Iterable[str] = (),
+    ) -> IntervalPage:
+        """Fetch one page of sleep intervals, in start order."""
+        return await self._get_intervals_page(
+            "sleep", child_uid, start_timestamp, end_timestamp, page_size, cursor, tuple(extra_fields)
+        )
+
+    async def get_feed_intervals_page(
+        self,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        page_size: int = 100,
+        cursor: str | None = None,
+        extra_fields: Iterable[str] = (),
+    ) -> IntervalPage:
+        """Fetch one page of feeding intervals, in start order."""
+        return await self._get_intervals_page(
+            "feed", child_uid, start_timestamp, end_timestamp, page_size, cursor, tuple(extra_fields)
+        )
+
+    async def get_diaper_intervals_page(
+        self,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        page_size: int = 100,
+        cursor: str | None = None,
+        extra_fields: Iterable[str] = (),
+    ) -> IntervalPage:
+        """Fetch one page of diaper intervals, in start order."""
+        return await self._get_intervals_page(
+            "diaper", child_uid, start_timestamp, end_timestamp, page_size, cursor, tuple(extra_fields)
+        )
+
+    async def get_health_entries_page(
+        self,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        page_size: int = 100,
+        cursor: str | None = None,
+        extra_fields: Iterable[str] = (),
+    ) -> IntervalPage:
+        """Fetch one page of health entries, in start order."""
+        return await self._get_intervals_page(
+            "health", child_uid, start_timestamp, end_timestamp, page_size, cursor, tuple(extra_fields)
+        )
+
+    async def _iter_intervals(
+        self,
+        collection_name: CollectionName,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        extra_fields: tuple[str, ...] = (),
+    ) -> AsyncIterator[dict]:
+        """Yield interval events of one tracker in start order while the query streams.
+
+        Unlike _get_intervals, errors are raised to the caller.
+        """
+        if self._interval_store is not None:
+            store = await self._sync_interval_store(collection_name, child_uid)
+            rows = store.iter_query(
+                collection_name, child_uid, start_timestamp, end_timestamp, batch_size=_STORE_BATCH_SIZE
+            )
+            while True:
+                # One thread hop per stored batch instead of loading the whole range.
+                batch = await asyncio.to_thread(list, itertools.islice(rows, _STORE_BATCH_SIZE))
+                if not batch:
+                    return
+                for entry, is_multi in batch:
+                    yield _interval_event(collection_name, entry, is_multi, extra_fields)
+
+        index = await self._update_multi_entry_index(collection_name, child_uid)
+        multi_events = (
+            _interval_event(collection_name, entry, True, extra_fields)
+            for entry in _iter_index_range(index, start_timestamp, end_timestamp)
+        )
+        async for event in _merge_async_by_start(
+            self._stream_regular_events(collection_name, child_uid, start_timestamp, end_timestamp, extra_fields),
+            _aiter(multi_events),
+        ):
+            yield event
+
+    def iter_sleep_intervals(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, extra_fields: Iterable[str] = ()
+    ) -> AsyncIterator[dict]:
+        """Yield sleep intervals in start order while they stream from Firestore."""
+        return self._iter_intervals("sleep", child_uid, start_timestamp, end_timestamp, tuple(extra_fields))
+
+    def iter_feed_intervals(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, extra_fields: Iterable[str] = ()
+    ) -> AsyncIterator[dict]:
+        """Yield feeding intervals in start order while they stream from Firestore."""
+        return self._iter_intervals("feed", child_uid, start_timestamp, end_timestamp, tuple(extra_fields))
+
+    def iter_diaper_intervals(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, extra_fields: Iterable[str] = ()
+    ) -> AsyncIterator[dict]:
+        """Yield diaper intervals in start order while they stream from Firestore."""
+        return self._iter_intervals("diaper", child_uid, start_timestamp, end_timestamp, tuple(extra_fields))
+
+    def iter_health_entries(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, extra_fields: Iterable[str] = ()
+    ) -> AsyncIterator[dict]:
+        """Yield health entries in start order while they stream from Firestore."""
+        return self._iter_intervals("health", child_uid, start_timestamp, end_timestamp, tuple(extra_fields))
+
+    async def iter_timeline(
+        self,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        collections: Iterable[CollectionName] = CALENDAR_COLLECTIONS,
+        extra_fields: Iterable[str] = (),
+    ) -> AsyncIterator[tuple[CollectionName, dict]]:
+        """Yield events of all trackers as one chronologically ordered stream.
+
+        See HuckleberryAPI.iter_timeline.
+        """
+        extra = tuple(extra_fields)
+        streams = [
+            _tag_events_async(
+                collection_name,
+                self._iter_intervals(collection_name, child_uid, start_timestamp, end_timestamp, extra),
+            )
+            for collection_name in collections
+        ]
+        async for item in _merge_async_by_start(*streams, key=_tagged_event_start):
+            yield item
+
+    def _deliver(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        listener_key: str,
+        callback: Callable[[Any], Any],
+        data: Any,
+        merge: Callable[[Any, Any], Any] | None = None,
+    ) -> bool:
+        """Schedule a listener callback on the event loop, through the dispatcher if one is set.
+
+        Returns:
+            False if the dispatcher dropped the update
+        """
+        if self._listener_dispatcher is None:
+            loop.call_soon_threadsafe(callback, data)
+            return True
+        return self._listener_dispatcher.submit(
+            listener_key, functools.partial(_call_on_loop, loop, callback), data, merge
+        )
+
+    async def _setup_listener(
+        self, collection_name: CollectionName, child_uid: str, callback: Callable[[TDocumentData], None]
+    ) -> None:
+        """Set up real-time listener for a Firestore document.
+
+        Callbacks are invoked on the event loop that set up the listener.
+        """
+        _LOGGER.info("Setting up real-time listener for %s/%s", collection_name, child_uid)
+
+        await self._ensure_authenticated()
+        # A new registration gets the current document even if an earlier one already saw it
+        self._forget_deliveries(f"{collection_name}_{child_uid}")
+        deliver = functools.partial(self._deliver, asyncio.get_running_loop())
+        # Opening a watch (and closing the one it replaces) blocks, so it runs in a worker thread
+        self._get_listener_client()
+        await asyncio.to_thread(self._watch_document, collection_name, child_uid, callback, deliver)
+
+        _LOGGER.info("Real-time %s listener active for child %s", collection_name, child_uid)
+
+    async def setup_realtime_listener(
+        self, child_uid: str, callback: Callable[[SleepDocumentData], None]
+    ) -> None:
+        """Set up real-time listener for sleep document changes."""
+        await self._setup_listener("sleep", child_uid, callback)
+
+    async def setup_feed_listener(
+        self, child_uid: str, callback: Callable[[FeedDocumentData], None]
+    ) -> None:
+        """Set up real-time listener for feed document changes."""
+        await self._setup_listener("feed", child_uid, callback)
+
+    async def setup_health_listener(
+        self, child_uid: str, callback: Callable[[HealthDocumentData], None]
+    ) -> None:
+        """Set up real-time listener for health document changes."""
+        await self._setup_listener("health", child_uid, callback)
+
+    async def setup_diaper_listener(
+        self, child_uid: str, callback: Callable[[DiaperDocumentData], None]
+    ) -> None:
+        """Set up real-time listener for diaper document changes."""
+        await self._setup_listener("diaper", child_uid, callback)
+
+    async def setup_delta_listener(
+        self,
+        collection_name: CollectionName,
+        child_uid: str,
+        callback: Callable[[dict[str, FieldChange]], None],
+        paths: Iterable[str] | None = None,
+    ) -> None:
+        """Set up real-time listener delivering only the changed fields of a tracker document.
+
+        See HuckleberryAPI.setup_delta_listener.
+        """
+        await self._setup_listener(collection_name, child_uid, _delta_callback(callback, paths))
+
+    async def setup_interval_listener(
+        self,
+        collection_name: CollectionName,
+        child_uid: str,
+        callback: Callable[[list[IntervalChange]], None],
+        lookback: float = 86400.0,
+    ) -> None:
+        """Set up real-time listener for the intervals of a tracker.
+
+        See HuckleberryAPI.setup_interval_listener. Callbacks are invoked on the event loop.
+        """
+        _LOGGER.info("Setting up interval listener for %s/%s", collection_name, child_uid)
+
+        await self._ensure_authenticated()
+        self._forget_deliveries(f"{collection_name}_intervals_{child_uid}")
+        deliver = functools.partial(self._deliver, asyncio.get_running_loop())
+        self._get_listener_client()
+        await asyncio.to_thread(self._watch_intervals, collection_name, child_uid, callback, lookback, deliver)
+
+        _LOGGER.info("Interval %s listener active for child %s", collection_name, child_uid)
+
+    async def start_listener_watchdog(
+        self,
+        check_interval: float = 30.0,
+        stall_timeout: float = 3600.0,
+        retry_interval: float = 5.0,
+        max_backoff: float = 300.0,
+    ) -> None:
+        """Start a background task that restarts dead or stalled watch streams.
+
+        See HuckleberryAPI.start_listener_watchdog. The task runs on the current event loop,
+        which also receives the callbacks of restarted listeners.
+        """
+        if self._watchdog_task is not None and not self._watchdog_task.done():
+            return
+
+        self._watchdog_task = asyncio.get_running_loop().create_task(
+            self._run_listener_watchdog(check_interval, stall_timeout, retry_interval, max_backoff),
+            name="huckleberry-listener-watchdog",
+        )
+        _LOGGER.info("Started listener watchdog")
+
+    async def stop_listener_watchdog(self) -> None:
+        """Stop the listener watchdog, if running."""
+        task = self._watchdog_task
+        if task is None:
+            return
+
+        self._watchdog_task = None
+        if task is not asyncio.current_task():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        _LOGGER.info("Stopped listener watchdog")
+
+    async def _run_listener_watchdog(
+        self, check_interval: float, stall_timeout: float, retry_interval: float, max_backoff: float
+    ) -> None:
+        """Check loop of the listener watchdog."""
+        while True:
+            await asyncio.sleep(check_interval)
+            # Re-opening a watch blocks, so it runs in a worker thread; callbacks go to this loop
+            deliver = functools.partial(self._deliver, asyncio.get_running_loop())
+            for listener_key in self._listener_restarts_due(stall_timeout, retry_interval, max_backoff):
+                try:
+                    await asyncio.to_thread(self._restart_listener, listener_key, deliver)
+                except Exception as err:
+                    _LOGGER.warning("Failed to restart listener %s: %s", listener_key, err)
+
+    async def restart_listeners(self, max_concurrency: int = 8, stagger: float = 0.5) -> ListenerRestartResult:
+        """Re-open every watch stream, e.g. after a network change.
+
+        See HuckleberryAPI.restart_listeners. Each watch is re-opened in a worker thread,
+        at most max_concurrency at once; callbacks are delivered on the current event loop.
+        """
+        await self._ensure_authenticated()
+        with self._listener_lock:
+            keys = list(self._listeners)
+        started = time.monotonic()
+        deliver = functools.partial(self._deliver, asyncio.get_running_loop())
+        self._get_listener_client()
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def restart(listener_key: str) -> bool:
+            async with semaphore:
+                await asyncio.sleep(random.uniform(0, stagger))
+                try:
+                    await asyncio.to_thread(self._restart_listener, listener_key, deliver)
+                except Exception as err:
+                    _LOGGER.warning("Failed to restart listener %s: %s", listener_key, err)
+                    return False
+                return True
+
+        results = await asyncio.gather(*(restart(key) for key in keys))
+        failed = results.count(False)
+
+        duration = time.monotonic() - started
+        _LOGGER.info("Restarted %d of %d listeners in %.3fs", len(keys) - failed, len(keys), duration)
+        return {"restarted": len(keys) - failed, "failed": failed, "duration_sec": duration}
+
+    async def stop_all_listeners(self) -> None:
+        """Stop all active real-time listeners.
+
+        Closing a watch joins its thread, so they are closed in a worker thread.
+        """
+        _LOGGER.info("Stopping all real-time listeners")
+        await asyncio.to_thread(self._stop_listeners)
@@ -0,0 +1,69 @@
+"""Readers for history files passed to import_history()."""
+from __future__ import annotations
+
+import csv
+import json
+import os
+from pathlib import Path
+from typing import Iterator, cast
+
+from .types import HistoryImportEntry
+
+_FLOAT_FIELDS = frozenset({"start", "offset", "amount", "weight", "height", "head"})
+_BOOL_FIELDS = frozenset({"diaper_rash"})
+_TRUE_VALUES = frozenset({"1", "true", "yes", "y"})
+
+
+def read_history_csv(path: str | os.PathLike[str]) -> Iterator[HistoryImportEntry]:
+    """Read history entries from a CSV file.
+
+    The header row names HistoryImportEntry keys (e.g. `type,start,mode,amount`).
+    Empty cells are treated as missing values.
+
+    Args:
+        path: Path of the CSV file (`~` is expanded).
+    """
+    with Path(path).expanduser().open(newline="", encoding="utf-8") as file:
+        for line_number, row in enumerate(csv.DictReader(file), start=2):
+            try:
+                yield _entry_from_row(row)
+            except ValueError as err:
+                raise ValueError(f"{path}:{line_number}: {err}") from err
+
+
+def read_history_jsonl(path: str | os.PathLike[str]) -> Iterator[HistoryImportEntry]:
+    """Read history entries from a JSON Lines file with one JSON object per line.
+
+    Args:
+        path: Path of the JSONL file (`~` is expanded).
+    """
+    with Path(path).expanduser().open(encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError as err:
+                raise ValueError(f"{path}:{line_number}: {err}") from err
+            if not isinstance(entry, dict):
+                raise ValueError(f"{path}:{line_number}: expected a JSON object")
+            yield cast(HistoryImportEntry, entry)
+
+
+def _entry_from_row(row: dict[str, str | None]) -> HistoryImportEntry:
+    """Convert a CSV row of strings into a history entry."""
+    entry: dict = {}
+    for key, value in row.items():
+        if key is None or value is None or not value.strip():
+            continue
+        value = value.strip()
+        if key in _FLOAT_FIELDS:
+            try:
+                entry[key] = float(value)
+            except ValueError:
+                raise ValueError(f"{key} is not a number: {value!r}") from None
+        elif key in _BOOL_FIELDS:
+            entry[key] = value.lower() in _TRUE_VALUES
+        else:
+            entry[key] = value
+    return cast(HistoryImportEntry, entry)
@@ -0,0 +1,289 @@
+"""Local SQLite mirror of interval history for Huckleberry API."""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Iterator
+
+# Re-read documents updated slightly before the watermark, so writes from
+# devices with a lagging clock are not missed
+SYNC_OVERLAP_SEC = 300.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS intervals (
+    collection TEXT NOT NULL,
+    child_uid TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    entry_key TEXT NOT NULL,
+    start REAL NOT NULL,
+    is_multi INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (collection, child_uid, doc_id, entry_key)
+);
+CREATE INDEX IF NOT EXISTS intervals_by_start ON intervals (collection, child_uid, start);
+CREATE TABLE IF NOT EXISTS sync_state (
+    collection TEXT NOT NULL,
+    child_uid TEXT NOT NULL,
+    watermark REAL,
+    synced_at REAL NOT NULL,
+    reconciled_at REAL,
+    PRIMARY KEY (collection, child_uid)
+);
+"""
+
+
+class SQLiteIntervalStore:
+    """Interval store backed by a SQLite database in WAL mode.
+
+    Mirrors `{collection}/{child_uid}/intervals` (and `health/{child_uid}/data`)
+    so range queries are answered locally. Multi-entry documents are stored
+    as one row per nested entry. The store is synced incrementally by the
+    `lastUpdated` field of interval documents, so changes to documents without
+    `lastUpdated` are not picked up after their first sync. Deleted documents
+    are dropped by a periodic reconciliation against the document IDs in
+    Firestore (every reconcile_interval seconds).
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        min_sync_interval: float = 30.0,
+        reconcile_interval: float = 3600.0,
+    ) -> None:
+        """Initialize the store.
+
+        Args:
+            path: Path of the database file (`~` is expanded), or ":memory:".
+            min_sync_interval: Seconds during which a synced tracker is served
+                from the store without checking Firestore for changes. Writes
+                made through the client end this period for the written tracker.
+            reconcile_interval: Seconds between ID-only listings of a tracker
+                that drop documents deleted in Firestore.
+        """
+        self._path = str(path) if str(path) == ":memory:" else str(Path(path).expanduser())
+        self.min_sync_interval = min_sync_interval
+        self.reconcile_interval = reconcile_interval
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(sync_state)")}
+            if "reconciled_at" not in columns:
+                # Databases created before reconciliation was added
+                self._conn.execute("ALTER TABLE sync_state ADD COLUMN reconciled_at REAL")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def get_watermark(self, collection: str, child_uid: str) -> float | None:
+        """Get the `lastUpdated` value to sync from, or None if the tracker was never synced."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT watermark FROM sync_state WHERE collection = ? AND child_uid = ?",
+                (collection, child_uid),
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0] - SYNC_OVERLAP_SEC if row[0] is not None else 0.0
+
+    def is_synced(self, collection: str, child_uid: str) -> bool:
+        """Check whether a tracker was synced at least once."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM sync_state WHERE collection = ? AND child_uid = ?",
+                (collection, child_uid),
+            ).fetchone()
+        return row is not None
+
+    def is_fresh(self, collection: str, child_uid: str) -> bool:
+        """Check whether a tracker was synced within min_sync_interval."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT synced_at FROM sync_state WHERE collection = ? AND child_uid = ?",
+                (collection, child_uid),
+            ).fetchone()
+        return row is not None and time.time() - row[0] < self.min_sync_interval
+
+    def mark_stale(self, collection: str, child_uid: str) -> None:
+        """Make the next read of a tracker check Firestore for changes, e.g. after a local write."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE sync_state SET synced_at = 0 WHERE collection = ? AND child_uid = ?",
+                (collection, child_uid),
+            )
+
+    def needs_reconcile(self, collection: str, child_uid: str) -> bool:
+        """Check whether a synced tracker was not reconciled within reconcile_interval."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT reconciled_at FROM sync_state WHERE collection = ? AND child_uid = ?",
+                (collection, child_uid),
+            ).fetchone()
+        return row is not None and (row[0] is None or time.time() - row[0] >= self.reconcile_interval)
+
+    def document_ids(self, collection: str, child_uid: str) -> set[str]:
+        """Get the IDs of the stored documents of a tracker."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT doc_id FROM intervals WHERE collection = ? AND child_uid = ?",
+                (collection, child_uid),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def retain_documents(self, collection: str, child_uid: str, doc_ids: Iterable[str]) -> int:
+        """Drop stored documents that are not in doc_ids and mark the tracker as reconciled.
+
+        Args:
+            collection: Tracker collection name.
+            child_uid: Child unique identifier.
+            doc_ids: IDs of all documents that currently exist in Firestore.
+
+        Returns:
+            Number of documents dropped.
+        """
+        removed = [
+            (collection, child_uid, doc_id)
+            for doc_id in self.document_ids(collection, child_uid) - set(doc_ids)
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM intervals WHERE collection = ? AND child_uid = ? AND doc_id = ?", removed
+            )
+            self._conn.execute(
+                "UPDATE sync_state SET reconciled_at = ? WHERE collection = ? AND child_uid = ?",
+                (time.time(), collection, child_uid),
+            )
+        return len(removed)
+
+    def apply_documents(self, collection: str, child_uid: str, documents: Iterable[tuple[str, dict]]) -> int:
+        """Upsert fetched interval documents and mark the tracker as synced.
+
+        Args:
+            collection: Tracker collection name.
+            child_uid: Child unique identifier.
+            documents: (document ID, document data) pairs.
+
+        Returns:
+            Number of documents applied.
+        """
+        rows = []
+        doc_ids = []
+        watermark = None
+        for doc_id, data in documents:
+            doc_ids.append((collection, child_uid, doc_id))
+            last_updated = data.get("lastUpdated")
+            if isinstance(last_updated, (int, float)) and (watermark is None or last_updated > watermark):
+                watermark = last_updated
+            rows.extend(_rows_from_document(collection, child_uid, doc_id, data))
+
+        with self._lock, self._conn:
+            # Multi-entry documents may have lost entries, so replace all rows of each document
+            self._conn.executemany(
+                "DELETE FROM intervals WHERE collection = ? AND child_uid = ? AND doc_id = ?", doc_ids
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO intervals VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.execute(
+                """
+                INSERT INTO sync_state (collection, child_uid, watermark, synced_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (collection, child_uid) DO UPDATE SET
+                    watermark = MAX(COALESCE(watermark, excluded.watermark), COALESCE(excluded.watermark, watermark)),
+                    synced_at = excluded.synced_at
+                """,
+                (collection, child_uid, watermark, time.time()),
+            )
+        return len(doc_ids)
+
+    def query(
+        self, collection: str, child_uid: str, start_timestamp: float, end_timestamp: float
+    ) -> list[tuple[dict, bool]]:
+        """Get stored entries with start in [start_timestamp, end_timestamp), ordered by start.
+
+        Returns:
+            (entry data, is multi-entry) pairs.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT data, is_multi FROM intervals
+                WHERE collection = ? AND child_uid = ? AND start >= ? AND start < ?
+                ORDER BY start
+                """,
+                (collection, child_uid, start_timestamp, end_timestamp),
+            ).fetchall()
+        return [(json.loads(data), bool(is_multi)) for data, is_multi in rows]
+
+    def iter_query(
+        self,
+        collection: str,
+        child_uid: str,
+        start_timestamp: float,
+        end_timestamp: float,
+        batch_size: int = 500,
+    ) -> Iterator[tuple[dict, bool]]:
+        """Like query(), but reads the range in batches of batch_size rows."""
+        last_start, last_rowid = start_timestamp, -1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    """
+                    SELECT rowid, start, data, is_multi FROM intervals
+                    WHERE collection = ? AND child_uid = ? AND start >= ? AND start < ?
+                        AND (start > ? OR rowid > ?)
+                    ORDER BY start, rowid
+                    LIMIT ?
+                    """,
+                    (collection, child_uid, last_start, end_timestamp, last_start, last_rowid, batch_size),
+                ).fetchall()
+            for _, _, data, is_multi in rows:
+                yield json.loads(data), bool(is_multi)
+            if len(rows) < batch_size:
+                return
+            last_rowid, last_start = rows[-1][0], rows[-1][1]
+
+    def clear(self, collection: str | None = None, child_uid: str | None = None) -> None:
+        """Remove stored intervals, so the next read does a full sync.
+
+        Args:
+            collection: Only clear this tracker collection.
+            child_uid: Only clear this child.
+        """
+        conditions = []
+        params = []
+        if collection is not None:
+            conditions.append("collection = ?")
+            params.append(collection)
+        if child_uid is not None:
+            conditions.append("child_uid = ?")
+            params.append(child_uid)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM intervals{where}", params)
+            self._conn.execute(f"DELETE FROM sync_state{where}", params)
+
+
+def _rows_from_document(collection: str, child_uid: str, doc_id: str, data: dict) -> list[tuple]:
+    """Flatten an interval document into store rows; multi-entry documents give one row per entry."""
+    if data.get("multi"):
+        entries = data.get("data")
+        if not isinstance(entries, dict):
+            return []
+        return [
+            (collection, child_uid, doc_id, key, entry["start"], 1, json.dumps(entry, default=str))
+            for key, entry in entries.items()
+            if isinstance(entry, dict) and isinstance(entry.get("start"), (int, float))
+        ]
+
+    if not isinstance(data.get("start"), (int, float)):
+        return []
+    return [(collection, child_uid, doc_id, "", data["start"], 0, json.dumps(data, default=str))]
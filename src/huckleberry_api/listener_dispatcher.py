@@ -0,0 +1,150 @@
+"""Delivery of listener callbacks off the Firestore watch threads."""
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+from .types import ListenerDispatcherStats
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ListenerDispatcher:
+    """Bounded queue of listener updates delivered by a pool of worker threads.
+
+    Updates are keyed by listener (one document each). An update for a key that is
+    still pending replaces the queued one, so a slow callback only sees the latest
+    data. Updates of one key are never delivered concurrently. When the queue is
+    full, updates for keys that are not already queued are dropped.
+    """
+
+    def __init__(self, max_pending: int = 1000, workers: int = 1) -> None:
+        """Initialize the dispatcher.
+
+        Args:
+            max_pending: Most distinct keys waiting for delivery.
+            workers: Number of worker threads calling callbacks (started on first use).
+        """
+        if max_pending < 1 or workers < 1:
+            raise ValueError("max_pending and workers must be at least 1")
+        self.max_pending = max_pending
+        self.workers = workers
+        self._pending: OrderedDict[str, tuple[Callable[[Any], Any], Any]] = OrderedDict()
+        self._running: set[str] = set()
+        self._condition = threading.Condition()
+        self._threads: list[threading.Thread] = []
+        self._closed = False
+        self._delivered = 0
+        self._coalesced = 0
+        self._dropped = 0
+        self._errors = 0
+
+    def submit(
+        self,
+        key: str,
+        callback: Callable[[Any], Any],
+        data: Any,
+        merge: Callable[[Any, Any], Any] | None = None,
+    ) -> bool:
+        """Queue callback(data) for delivery.
+
+        Args:
+            key: Listener key; a pending update of the same key is coalesced with this one
+            callback: Function to call with data
+            data: Update to deliver
+            merge: Combines (pending data, data) when coalescing, e.g. to concatenate change
+                lists; by default the pending data is replaced
+
+        Returns:
+            False if the update was dropped because the queue is full or the dispatcher is closed
+        """
+        with self._condition:
+            if self._closed:
+                return False
+            if key in self._pending:
+                self._coalesced += 1
+                if merge is not None:
+                    data = merge(self._pending[key][1], data)
+            elif len(self._pending) >= self.max_pending:
+                self._dropped += 1
+                _LOGGER.warning("Listener queue full, dropping update for %s", key)
+                return False
+            self._pending[key] = (callback, data)
+            if len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._work, name=f"huckleberry-listener-{len(self._threads)}", daemon=True
+                )
+                self._threads.append(thread)
+                thread.start()
+            self._condition.notify()
+            return True
+
+    def _next(self) -> tuple[str, Callable[[Any], Any], Any] | None:
+        """Take the oldest pending update whose key is not being delivered, waiting for one."""
+        with self._condition:
+            while True:
+                for key in self._pending:
+                    if key not in self._running:
+                        callback, data = self._pending.pop(key)
+                        self._running.add(key)
+                        return key, callback, data
+                if self._closed:
+                    return None
+                self._condition.wait()
+
+    def _work(self) -> None:
+        """Deliver pending updates until closed."""
+        while True:
+            item = self._next()
+            if item is None:
+                return
+            key, callback, data = item
+            failed = False
+            try:
+                callback(data)
+            except Exception as err:
+                failed = True
+                _LOGGER.error("Listener callback for %s failed: %s", key, err)
+            with self._condition:
+                self._running.discard(key)
+                if failed:
+                    self._errors += 1
+                else:
+                    self._delivered += 1
+                # Another update of this key may have been waiting for it
+                self._condition.notify_all()
+
+    def discard(self, keys: set[str] | None = None) -> None:
+        """Drop pending updates of the given keys, or of all keys."""
+        with self._condition:
+            for key in list(self._pending):
+                if keys is None or key in keys:
+                    del self._pending[key]
+
+    def stats(self) -> ListenerDispatcherStats:
+        """Get queue depth and delivery counters."""
+        with self._condition:
+            return {
+                "pending": len(self._pending),
+                "max_pending": self.max_pending,
+                "workers": self.workers,
+                "delivered": self._delivered,
+                "coalesced": self._coalesced,
+                "dropped": self._dropped,
+                "errors": self._errors,
+            }
+
+    def close(self, timeout: float | None = None) -> None:
+        """Stop the workers after the pending updates are delivered.
+
+        Args:
+            timeout: Seconds to wait for each worker, or None to wait until done.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout)
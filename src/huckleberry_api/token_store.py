@@ -0,0 +1,94 @@
+"""Persistent token storage for Huckleberry API."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Protocol
+
+from .types import StoredTokens
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TokenStore(Protocol):
+    """Storage for Firebase tokens, keyed by account email.
+
+    Lets a new process reuse a still-valid session instead of signing in
+    with email/password again.
+    """
+
+    def load(self, key: str) -> StoredTokens | None:
+        """Load tokens for an account, or None if nothing is stored."""
+        ...
+
+    def save(self, key: str, tokens: StoredTokens) -> None:
+        """Save tokens for an account."""
+        ...
+
+    def clear(self, key: str) -> None:
+        """Remove stored tokens for an account."""
+        ...
+
+
+class FileTokenStore:
+    """Token store backed by a JSON file holding tokens of any number of accounts.
+
+    The file is written atomically and readable by the owner only.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        """Initialize the store.
+
+        Args:
+            path: Path of the JSON file (`~` is expanded). Created on first save.
+        """
+        self._path = Path(path).expanduser()
+        self._lock = threading.Lock()
+
+    def _read(self) -> dict[str, StoredTokens]:
+        """Read all stored accounts, ignoring a missing or corrupt file."""
+        try:
+            with self._path.open(encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as err:
+            _LOGGER.warning("Ignoring unreadable token store %s: %s", self._path, err)
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _write(self, data: dict[str, StoredTokens]) -> None:
+        """Atomically replace the file contents."""
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self._path.parent, prefix=f".{self._path.name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(data, file)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self._path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def load(self, key: str) -> StoredTokens | None:
+        """Load tokens for an account, or None if nothing is stored."""
+        with self._lock:
+            return self._read().get(key)
+
+    def save(self, key: str, tokens: StoredTokens) -> None:
+        """Save tokens for an account."""
+        with self._lock:
+            data = self._read()
+            data[key] = tokens
+            self._write(data)
+
+    def clear(self, key: str) -> None:
+        """Remove stored tokens for an account."""
+        with self._lock:
+            data = self._read()
+            if data.pop(key, None) is not None:
+                self._write(data)
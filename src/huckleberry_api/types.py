@@ -16,6 +16,8 @@ UnitsSystem = Literal["metric", "imperial"]
 WeightUnits = Literal["kg", "lbs"]
 HeightUnits = Literal["cm", "in"]
 HeadUnits = Literal["hcm", "hin"]  # head cm, head inches
+DiaperAmount = Literal["little", "medium", "big"]
+HistoryEntryType = Literal["diaper", "bottle", "growth"]
 
 
 class ChildData(TypedDict):
@@ -69,6 +71,135 @@ class GrowthData(TypedDict):
     timestamp_sec: NotRequired[float | None]
 
 
+class StoredTokens(TypedDict):
+    """Firebase session persisted by a TokenStore.
+
+    Used to skip email/password sign-in when a previous run left a valid session.
+    """
+    id_token: str
+    refresh_token: str
+    user_uid: str
+    token_expires_at: float
+
+
+class TokenRefresherStats(TypedDict):
+    """Timing and failure statistics of the background token refresher.
+
+    Timestamps are Unix seconds; durations are seconds.
+    """
+    running: bool
+    refresh_count: int
+    failure_count: int
+    consecutive_failures: int
+    last_refresh_at: float | None
+    last_refresh_duration_sec: float | None
+    last_error: str | None
+    next_refresh_at: float | None
+
+
+class IntervalPage(TypedDict):
+    """One page of interval events returned by the get_*_page methods.
+
+    next_cursor is an opaque continuation token for the following page,
+    or None when the range is exhausted.
+    """
+    events: list[dict]
+    next_cursor: str | None
+
+
+class HistoryImportEntry(TypedDict):
+    """One past event for import_history().
+
+    start is a Unix timestamp in seconds. offset is the timezone offset in
+    minutes (negative for UTC+); when missing, the client timezone offset at
+    start is used. Which other keys apply depends on type:
+    - diaper: mode (required), pee_amount, poo_amount, color, consistency, diaper_rash, notes
+    - bottle: amount (required), bottle_type, units ("ml" or "oz")
+    - growth: weight, height, head (at least one), units ("metric" or "imperial")
+    """
+    type: HistoryEntryType
+    start: float
+    offset: NotRequired[float]
+    mode: NotRequired[DiaperMode]
+    pee_amount: NotRequired[DiaperAmount]
+    poo_amount: NotRequired[DiaperAmount]
+    color: NotRequired[PooColor]
+    consistency: NotRequired[PooConsistency]
+    diaper_rash: NotRequired[bool]
+    notes: NotRequired[str]
+    amount: NotRequired[float]
+    bottle_type: NotRequired[BottleType]
+    units: NotRequired[VolumeUnits | UnitsSystem]
+    weight: NotRequired[float]
+    height: NotRequired[float]
+    head: NotRequired[float]
+
+
+class HistoryImportResult(TypedDict):
+    """Outcome of import_history().
+
+    failed counts entries whose interval write still failed after retries.
+    """
+    written: int
+    failed: int
+
+
+class FieldChange(TypedDict):
+    """Old and new value of one field path, delivered by delta listeners.
+
+    A value is None when the field is missing on that side.
+    """
+    old: Any
+    new: Any
+
+
+class IntervalChange(TypedDict):
+    """One added, modified or removed interval delivered by interval listeners.
+
+    id is the interval document ID (shared by the entries of a multi-entry
+    document) and event has the same keys as the get_*_intervals events.
+    """
+    type: Literal["added", "modified", "removed"]
+    id: str
+    event: dict
+
+
+class ListenerStatus(TypedDict):
+    """Health of one watch stream, as returned by get_listener_status().
+
+    Timestamps are Unix seconds. last_activity_at is the last snapshot or
+    heartbeat (resume token progress seen by the watchdog). restarts counts
+    watchdog restarts; consecutive_restarts those without a snapshot since.
+    """
+    alive: bool
+    opened_at: float
+    last_activity_at: float
+    restarts: int
+    consecutive_restarts: int
+    next_restart_at: float | None
+
+
+class ListenerRestartResult(TypedDict):
+    """Outcome of restart_listeners()."""
+    restarted: int
+    failed: int
+    duration_sec: float
+
+
+class ListenerDispatcherStats(TypedDict):
+    """Queue statistics of a ListenerDispatcher.
+
+    Counters are totals since the dispatcher was created.
+    """
+    pending: int
+    max_pending: int
+    workers: int
+    delivered: int
+    coalesced: int
+    dropped: int
+    errors: int
+
+
 class LastSleepData(TypedDict):
     """Data for prefs.lastSleep."""
     start: float
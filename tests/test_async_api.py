@@ -0,0 +1,102 @@
+"""Async client tests for Huckleberry API."""
+import asyncio
+import os
+import time
+from typing import Any, AsyncIterator
+
+import pytest
+import pytest_asyncio
+
+from huckleberry_api import AsyncHuckleberryAPI
+
+
+@pytest_asyncio.fixture
+async def async_api() -> AsyncIterator[AsyncHuckleberryAPI]:
+    """Create async API instance with credentials from environment."""
+    email = os.getenv("HUCKLEBERRY_EMAIL")
+    password = os.getenv("HUCKLEBERRY_PASSWORD")
+    timezone = os.getenv("HUCKLEBERRY_TIMEZONE")
+
+    if not email or not password or not timezone:
+        pytest.skip("HUCKLEBERRY_EMAIL, HUCKLEBERRY_PASSWORD, and HUCKLEBERRY_TIMEZONE environment variables required")
+
+    async with AsyncHuckleberryAPI(email=email, password=password, timezone=timezone) as api_instance:
+        await api_instance.authenticate()
+        yield api_instance
+
+
+class TestAsyncClient:
+    """Test async client functionality."""
+
+    @pytest.mark.asyncio
+    async def test_authenticate_and_get_children(self, async_api: AsyncHuckleberryAPI) -> None:
+        """Test authentication and children retrieval."""
+        assert async_api.id_token is not None
+        assert async_api.refresh_token is not None
+
+        children = await async_api.get_children()
+        assert len(children) > 0
+        assert "uid" in children[0]
+
+    @pytest.mark.asyncio
+    async def test_start_and_cancel_sleep(self, async_api: AsyncHuckleberryAPI, child_uid: str) -> None:
+        """Test starting and canceling sleep."""
+        await async_api.start_sleep(child_uid)
+        await asyncio.sleep(1)
+
+        client = await async_api._get_firestore_client()
+        data = (await client.collection("sleep").document(child_uid).get()).to_dict()
+        assert data is not None
+        assert data["timer"]["active"] is True
+
+        await async_api.cancel_sleep(child_uid)
+        await asyncio.sleep(1)
+
+        data = (await client.collection("sleep").document(child_uid).get()).to_dict()
+        assert data is not None
+        assert data["timer"]["active"] is False
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calendar_queries(self, async_api: AsyncHuckleberryAPI, child_uid: str) -> None:
+        """Test many concurrent operations sharing one event loop."""
+        now = int(time.time())
+        results = await asyncio.gather(
+            *(async_api.get_sleep_intervals(child_uid, now - 86400 * (i + 1), now) for i in range(10))
+        )
+
+        assert len(results) == 10
+        for intervals in results:
+            assert isinstance(intervals, list)
+
+    @pytest.mark.asyncio
+    async def test_iter_timeline(self, async_api: AsyncHuckleberryAPI, child_uid: str) -> None:
+        """Test that the streamed timeline matches the calendar events in start order."""
+        now = int(time.time())
+        events = await async_api.get_calendar_events(child_uid, now - 7 * 86400, now + 60)
+
+        timeline = [item async for item in async_api.iter_timeline(child_uid, now - 7 * 86400, now + 60)]
+        starts = [event["start"] for _, event in timeline]
+        assert starts == sorted(starts)
+        for collection_name, collection_events in events.items():
+            assert [event for name, event in timeline if name == collection_name] == collection_events
+
+    @pytest.mark.asyncio
+    async def test_feed_listener(self, async_api: AsyncHuckleberryAPI, child_uid: str) -> None:
+        """Test feeding listener delivers updates on the event loop."""
+        updates: list[Any] = []
+        loop = asyncio.get_running_loop()
+
+        def callback(data: Any) -> None:
+            assert asyncio.get_running_loop() is loop
+            updates.append(data)
+
+        await async_api.setup_feed_listener(child_uid, callback)
+        await asyncio.sleep(2)
+
+        await async_api.start_feeding(child_uid, side="left")
+        await asyncio.sleep(2)
+
+        await async_api.cancel_feeding(child_uid)
+        await async_api.stop_all_listeners()
+
+        assert len(updates) > 0
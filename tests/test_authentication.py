@@ -2,7 +2,7 @@
 import time
 import pytest
 
-from huckleberry_api import HuckleberryAPI
+from huckleberry_api import FileTokenStore, HuckleberryAPI
 
 
 class TestAuthentication:
@@ -22,6 +22,53 @@ class TestAuthentication:
         with pytest.raises((RuntimeError, requests.exceptions.HTTPError)):
             invalid_api.authenticate()
 
+    def test_authenticate_with_injected_session(self) -> None:
+        """Test that auth traffic goes through a caller-provided session."""
+        import os
+
+        import requests
+        email = os.getenv("HUCKLEBERRY_EMAIL")
+        password = os.getenv("HUCKLEBERRY_PASSWORD")
+        if not email or not password:
+            pytest.skip("HUCKLEBERRY_EMAIL and HUCKLEBERRY_PASSWORD environment variables required")
+
+        calls: list[str] = []
+        session = requests.Session()
+        session.hooks["response"].append(lambda response, *args, **kwargs: calls.append(response.url))
+
+        session_api = HuckleberryAPI(email=email, password=password, timezone="UTC", session=session)
+        session_api.authenticate()
+        session_api.refresh_auth_token()
+        session_api.close()
+
+        assert len(calls) == 2
+        # Injected session is owned by the caller and stays open
+        assert session.adapters
+
+    def test_token_store_skips_password_sign_in(self, api: HuckleberryAPI, tmp_path) -> None:
+        """Test that stored tokens are reused by a new client without password sign-in."""
+        store = FileTokenStore(tmp_path / "tokens.json")
+        first = HuckleberryAPI(email=api.email, password=api.password, timezone="UTC", token_store=store)
+        first.authenticate()
+
+        # Wrong password proves the session comes from the store
+        second = HuckleberryAPI(email=api.email, password="wrong-password", timezone="UTC", token_store=store)
+        second.maintain_session()
+        assert second.id_token == first.id_token
+        assert second.user_uid == first.user_uid
+        assert len(second.get_children()) > 0
+
+        # Expired stored token is refreshed instead of signing in again
+        stored = store.load(api.email)
+        assert stored is not None
+        stored["token_expires_at"] = time.time() - 100
+        store.save(api.email, stored)
+
+        third = HuckleberryAPI(email=api.email, password="wrong-password", timezone="UTC", token_store=store)
+        third.maintain_session()
+        assert third.token_expires_at is not None
+        assert third.token_expires_at > time.time() + 3000
+
     def test_token_refresh(self, api: HuckleberryAPI) -> None:
         """Test token refresh functionality."""
         # Wait 1 second to ensure we get a new token (Firebase may return same token if too fresh)
@@ -31,6 +78,50 @@ class TestAuthentication:
         assert api.id_token is not None
         assert api.id_token != original_token
 
+    def test_token_refresh_keeps_client_and_listeners(self, api: HuckleberryAPI) -> None:
+        """Test that token refresh swaps the token without recreating the client or listeners."""
+        child_uid = api.get_children()[0]["uid"]
+        client = api._firestore_client
+        api.setup_realtime_listener(child_uid, lambda data: None)
+        watch = api._listeners[f"sleep_{child_uid}"]
+        try:
+            time.sleep(1)
+            api.refresh_auth_token()
+
+            assert api._firestore_client is client
+            assert api._listeners[f"sleep_{child_uid}"] is watch
+            assert api._credentials is not None
+            assert api._credentials.token == api.id_token
+            # Existing client keeps working with the new token
+            assert len(api.get_children()) > 0
+        finally:
+            api.stop_all_listeners()
+
+    def test_background_token_refresher(self, api: HuckleberryAPI) -> None:
+        """Test that the background refresher renews the token ahead of expiry."""
+        original_token = api.id_token
+        # Pretend the token is about to enter the refresh window
+        api.token_expires_at = time.time() + 601
+        api.start_token_refresher(lead_time=600, jitter=0)
+        try:
+            deadline = time.time() + 30
+            while api.get_token_refresher_stats()["refresh_count"] == 0 and time.time() < deadline:
+                time.sleep(0.5)
+
+            stats = api.get_token_refresher_stats()
+            assert stats["running"] is True
+            assert stats["refresh_count"] == 1
+            assert stats["failure_count"] == 0
+            assert stats["last_refresh_duration_sec"] is not None
+            assert api.id_token != original_token
+            assert api.token_expires_at is not None
+            # Next run is scheduled ahead of the new expiry
+            assert stats["next_refresh_at"] is not None
+            assert stats["next_refresh_at"] > time.time() + 2000
+        finally:
+            api.stop_token_refresher()
+        assert api.get_token_refresher_stats()["running"] is False
+
     def test_maintain_session(self, api: HuckleberryAPI) -> None:
         """Test maintain_session ensures token validity."""
         original_token = api.id_token
@@ -2,7 +2,9 @@
 import time
 from datetime import datetime, timezone
 
-from huckleberry_api import HuckleberryAPI
+import pytest
+
+from huckleberry_api import HuckleberryAPI, SQLiteIntervalStore
 
 
 class TestCalendarIntervals:
@@ -125,6 +127,141 @@ class TestCalendarIntervals:
         assert isinstance(events["diaper"], list)
         assert isinstance(events["health"], list)
 
+    def test_extra_fields(self, api: HuckleberryAPI, child_uid: str) -> None:
+        """Test that extra_fields adds document fields outside the default mask."""
+        api.log_diaper(child_uid, mode="pee")
+        time.sleep(1)
+
+        now = datetime.now(timezone.utc)
+        start_ts = int(now.timestamp()) - 3600
+        end_ts = int(now.timestamp()) + 60
+
+        default = api.get_diaper_intervals(child_uid, start_ts, end_ts)
+        extended = api.get_diaper_intervals(child_uid, start_ts, end_ts, extra_fields=["offset"])
+
+        assert len(extended) == len(default)
+        assert all("offset" not in interval for interval in default)
+        assert any("offset" in interval for interval in extended)
+
+    def test_calendar_events_match_individual_queries(self, api: HuckleberryAPI, child_uid: str) -> None:
+        """Test that concurrent calendar fetch returns the same events as individual queries."""
+        now = int(datetime.now(timezone.utc).timestamp())
+        start_ts = now - 86400
+        end_ts = now + 60
+
+        events = api.get_calendar_events(child_uid, start_ts, end_ts)
+
+        assert events["sleep"] == api.get_sleep_intervals(child_uid, start_ts, end_ts)
+        assert events["feed"] == api.get_feed_intervals(child_uid, start_ts, end_ts)
+        assert events["diaper"] == api.get_diaper_intervals(child_uid, start_ts, end_ts)
+        assert events["health"] == api.get_health_entries(child_uid, start_ts, end_ts)
+
+    def test_intervals_ordered_by_start(self, api: HuckleberryAPI, child_uid: str) -> None:
+        """Test that regular and multi-entry events come back merged in start order."""
+        end_ts = int(time.time()) + 60
+        events = api.get_calendar_events(child_uid, 0, end_ts)
+
+        for collection_events in events.values():
+            starts = [event["start"] for event in collection_events]
+            assert starts == sorted(starts)
+
+    def test_iter_intervals_match_lists(self, api: HuckleberryAPI, child_uid: str) -> None:
+        """Test that streaming iterators yield the same events as the list methods."""
+        now = int(time.time())
+        start_ts = now - 7 * 86400
+        end_ts = now + 60
+
+        assert list(api.iter_sleep_intervals(child_uid, start_ts, end_ts)) == api.get_sleep_intervals(
+            child_uid, start_ts, end_ts
+        )
+        assert list(api.iter_feed_intervals(child_uid, start_ts, end_ts)) == api.get_feed_intervals(
+            child_uid, start_ts, end_ts
+        )
+        assert list(api.iter_diaper_intervals(child_uid, start_ts, end_ts)) == api.get_diaper_intervals(
+            child_uid, start_ts, end_ts
+        )
+        assert list(api.iter_health_entries(child_uid, start_ts, end_ts)) == api.get_health_entries(
+            child_uid, start_ts, end_ts
+        )
+
+    def test_iter_timeline(self, api: HuckleberryAPI, child_uid: str) -> None:
+        """Test that the timeline merges all trackers in start order."""
+        now = int(time.time())
+        events = api.get_calendar_events(child_uid, now - 7 * 86400, now + 60)
+
+        timeline = list(api.iter_timeline(child_uid, now - 7 * 86400, now + 60))
+        starts = [event["start"] for _, event in timeline]
+        assert starts == sorted(starts)
+        assert len(timeline) == sum(len(collection_events) for collection_events in events.values())
+        for collection_name, collection_events in events.items():
+            assert [event for name, event in timeline if name == collection_name] == collection_events
+
+    def test_paginated_intervals_cover_range(self, api: HuckleberryAPI, child_uid: str) -> None:
+        """Test that following page cursors returns every event of the range exactly once."""
+        now = int(time.time())
+        start_ts = now - 30 * 86400
+        end_ts = now + 60
+
+        events = []
+        cursor = None
+        for _ in range(1000):
+            page = api.get_diaper_intervals_page(child_uid, start_ts, end_ts, page_size=3, cursor=cursor)
+            events.extend(page["events"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        def by_start(items: list[dict]) -> list[tuple]:
+            return sorted((item["start"], item["mode"]) for item in items)
+
+        assert by_start(events) == by_start(api.get_diaper_intervals(child_uid, start_ts, end_ts))
+
+    def test_invalid_page_cursor(self, api: HuckleberryAPI, child_uid: str) -> None:
+        """Test that malformed or foreign cursors are rejected."""
+        with pytest.raises(ValueError):
+            api.get_sleep_intervals_page(child_uid, 0, int(time.time()), cursor="not-a-cursor")
+
+    def test_multi_entry_cache_reused(self, api: HuckleberryAPI, child_uid: str) -> None:
+        """Test that repeated reads reuse parsed multi-entry documents."""
+        first = api.get_feed_intervals(child_uid, 0, int(time.time()) + 60)
+        cached = dict(api._multi_entry_cache.get(("feed", child_uid), {}))
+
+        second = api.get_feed_intervals(child_uid, 0, int(time.time()) + 60)
+        assert second == first
+        # Unchanged documents keep the same parsed event lists
+        for doc_id, (update_time, events) in api._multi_entry_cache.get(("feed", child_uid), {}).items():
+            assert cached[doc_id][0] == update_time
+            assert cached[doc_id][1] is events
+
+    def test_interval_store_matches_firestore(self, api: HuckleberryAPI, child_uid: str, tmp_path) -> None:
+        """Test that reads answered from the local interval store match direct Firestore reads."""
+        now = int(datetime.now(timezone.utc).timestamp())
+        start_ts = now - 7 * 86400
+        end_ts = now + 60
+
+        store = SQLiteIntervalStore(tmp_path / "intervals.db", min_sync_interval=0)
+        stored_api = HuckleberryAPI(
+            email=api.email, password=api.password, timezone="UTC", interval_store=store
+        )
+        try:
+            def by_start(events: list[dict]) -> list[dict]:
+                return sorted(events, key=lambda event: event["start"])
+
+            # First read does the full sync, second one an incremental sync
+            for _ in range(2):
+                events = stored_api.get_calendar_events(child_uid, start_ts, end_ts)
+                assert by_start(events["sleep"]) == by_start(api.get_sleep_intervals(child_uid, start_ts, end_ts))
+                assert by_start(events["diaper"]) == by_start(api.get_diaper_intervals(child_uid, start_ts, end_ts))
+
+            # New interval is picked up by the incremental sync
+            api.log_diaper(child_uid, mode="pee")
+            time.sleep(1)
+            diapers = stored_api.get_diaper_intervals(child_uid, start_ts, int(time.time()) + 60)
+            assert by_start(diapers) == by_start(api.get_diaper_intervals(child_uid, start_ts, int(time.time()) + 60))
+        finally:
+            stored_api.close()
+            store.close()
+
     def test_date_range_filtering(self, api: HuckleberryAPI, child_uid: str) -> None:
         """Test that date range filtering works correctly."""
         # Query for a range far in the past (should return empty or fewer results)
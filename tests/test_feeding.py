@@ -87,6 +87,24 @@ class TestFeedingTracking:
         # Cancel to cleanup
         api.cancel_feeding(child_uid)
 
+    def test_pause_feeding_clears_active_side(self, api: HuckleberryAPI, child_uid: str) -> None:
+        """Test pausing feeding clears the active side and keeps the last side in one update."""
+        api.start_feeding(child_uid, side="right")
+        time.sleep(2)
+
+        api.pause_feeding(child_uid)
+        time.sleep(1)
+
+        feed_doc = api._get_firestore_client().collection("feed").document(child_uid).get()
+        data = feed_doc.to_dict()
+        assert data is not None
+        assert data["timer"]["paused"] is True
+        assert "activeSide" not in data["timer"]
+        assert data["timer"]["lastSide"] == "right"
+
+        # Cancel to cleanup
+        api.cancel_feeding(child_uid)
+
     def test_resume_feeding_with_explicit_side(self, api: HuckleberryAPI, child_uid: str) -> None:
         """Test resuming feeding with explicit side parameter."""
         # Start feeding on left
@@ -143,3 +161,28 @@ class TestFeedingTracking:
         assert "start" in interval_data
         assert "mode" in interval_data
         assert interval_data["mode"] == "breast"
+
+    def test_blind_timer_writes(self, api: HuckleberryAPI, child_uid: str) -> None:
+        """Test that blind transitions accumulate durations with server-side increments."""
+        blind_api = HuckleberryAPI(api.email, api.password, str(api._timezone), blind_timer_writes=True)
+        blind_api.authenticate()
+        try:
+            blind_api.start_feeding(child_uid, side="left")
+            # Blind writes use the timer of a running listener
+            blind_api.setup_feed_listener(child_uid, lambda data: None)
+            time.sleep(2)
+            blind_api.switch_feeding_side(child_uid)
+            time.sleep(1)
+            blind_api.pause_feeding(child_uid)
+            time.sleep(1)
+
+            feed_doc = api._get_firestore_client().collection("feed").document(child_uid).get()
+            data = feed_doc.to_dict()
+            assert data is not None
+            assert data["timer"]["paused"] is True
+            assert "activeSide" not in data["timer"]
+            assert data["timer"]["leftDuration"] >= 2
+            assert data["timer"]["rightDuration"] >= 1
+        finally:
+            blind_api.cancel_feeding(child_uid)
+            blind_api.close()
@@ -0,0 +1,57 @@
+"""Bulk history import tests for Huckleberry API."""
+import time
+
+import pytest
+
+from huckleberry_api import HuckleberryAPI, read_history_csv, read_history_jsonl
+
+
+class TestHistoryImport:
+    """Test bulk history import functionality."""
+
+    def test_read_history_csv(self, tmp_path) -> None:
+        """Test that CSV cells are converted and empty cells are dropped."""
+        path = tmp_path / "history.csv"
+        path.write_text(
+            "type,start,mode,amount,diaper_rash\n"
+            "diaper,1700000000,poo,,yes\n"
+            "bottle,1700003600,,90,\n",
+            encoding="utf-8",
+        )
+
+        entries = list(read_history_csv(path))
+
+        assert entries == [
+            {"type": "diaper", "start": 1700000000.0, "mode": "poo", "diaper_rash": True},
+            {"type": "bottle", "start": 1700003600.0, "amount": 90.0},
+        ]
+
+    def test_read_history_jsonl(self, tmp_path) -> None:
+        """Test reading JSON Lines, skipping blank lines and rejecting non-objects."""
+        path = tmp_path / "history.jsonl"
+        path.write_text('{"type": "growth", "start": 1700000000, "weight": 4.2}\n\n[1]\n', encoding="utf-8")
+
+        entries = read_history_jsonl(path)
+
+        assert next(entries) == {"type": "growth", "start": 1700000000, "weight": 4.2}
+        with pytest.raises(ValueError):
+            next(entries)
+
+    def test_import_history(self, api: HuckleberryAPI, child_uid: str) -> None:
+        """Test importing past entries with explicit timestamps."""
+        start = int(time.time()) - 30 * 86400
+
+        result = api.import_history(child_uid, [
+            {"type": "diaper", "start": start, "mode": "pee"},
+            {"type": "bottle", "start": start + 60, "amount": 90.0, "units": "ml"},
+            {"type": "growth", "start": start + 120, "weight": 4.2},
+        ])
+
+        assert result == {"written": 3, "failed": 0}
+        diapers = api.get_diaper_intervals(child_uid, start, start + 1)
+        assert any(interval["mode"] == "pee" for interval in diapers)
+
+    def test_import_history_invalid_entry(self, api: HuckleberryAPI, child_uid: str) -> None:
+        """Test that an invalid entry fails the import before anything is written."""
+        with pytest.raises(ValueError):
+            api.import_history(child_uid, [{"type": "diaper", "start": time.time()}])
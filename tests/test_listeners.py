@@ -1,8 +1,9 @@
 """Real-time listener tests for Huckleberry API."""
+import threading
 import time
 from typing import Any
 
-from huckleberry_api import HuckleberryAPI
+from huckleberry_api import HuckleberryAPI, ListenerDispatcher
 
 
 class TestRealtimeListeners:
@@ -131,3 +132,243 @@ class TestRealtimeListeners:
         last_update = updates[-1]
         assert "prefs" in last_update
         assert "lastDiaper" in last_update.get("prefs", {})
+
+    def test_root_document_mirror(self, api: HuckleberryAPI, child_uid: str) -> None:
+        """Test that the mirror follows listener snapshots and this client's own writes."""
+        mirror_api = HuckleberryAPI(api.email, api.password, str(api._timezone), mirror_root_documents=True)
+        mirror_api.authenticate()
+        try:
+            mirror_api.setup_feed_listener(child_uid, lambda data: None)
+            mirror_api.setup_health_listener(child_uid, lambda data: None)
+            time.sleep(2)
+
+            feed_path = f"feed/{child_uid}"
+            assert feed_path in mirror_api._root_mirror
+
+            # Own writes are visible immediately, without waiting for the snapshot
+            mirror_api.start_feeding(child_uid, side="left")
+            assert mirror_api._root_mirror[feed_path]["timer"]["active"] is True
+            mirror_api.pause_feeding(child_uid)
+            assert mirror_api._root_mirror[feed_path]["timer"]["paused"] is True
+
+            mirror_api.log_growth(child_uid, weight=4.2, units="metric")
+            assert mirror_api.get_growth_data(child_uid)["weight"] == 4.2
+
+            # Writes of other clients arrive through the listener
+            api.resume_feeding(child_uid)
+            time.sleep(2)
+            assert mirror_api._root_mirror[feed_path]["timer"]["paused"] is False
+        finally:
+            mirror_api.cancel_feeding(child_uid)
+            mirror_api.close()
+
+    def test_multiplexed_listeners(self, api: HuckleberryAPI, child_uid: str) -> None:
+        """Test that multiplexed listeners share one watch stream per collection."""
+        multiplex_api = HuckleberryAPI(api.email, api.password, str(api._timezone), multiplex_listeners=True)
+        multiplex_api.authenticate()
+        sleep_updates: list[Any] = []
+        feed_updates: list[Any] = []
+        try:
+            multiplex_api.setup_realtime_listener(child_uid, sleep_updates.append)
+            multiplex_api.setup_feed_listener(child_uid, feed_updates.append)
+            time.sleep(2)
+            assert sorted(multiplex_api._listeners) == ["feed_multiplex_0", "sleep_multiplex_0"]
+
+            api.start_sleep(child_uid)
+            time.sleep(2)
+
+            assert sleep_updates and sleep_updates[-1]["timer"]["active"] is True
+            assert feed_updates
+        finally:
+            api.cancel_sleep(child_uid)
+            multiplex_api.close()
+
+    def test_delta_listener(self, api: HuckleberryAPI, child_uid: str) -> None:
+        """Test that delta listeners deliver only changed fields matching the paths."""
+        deltas: list[Any] = []
+
+        api.setup_delta_listener("sleep", child_uid, deltas.append, paths=["timer.*"])
+        time.sleep(2)
+        deltas.clear()
+
+        api.start_sleep(child_uid)
+        time.sleep(2)
+        api.cancel_sleep(child_uid)
+        api.stop_all_listeners()
+
+        assert deltas
+        assert all(path.startswith("timer.") for delta in deltas for path in delta)
+        assert deltas[0]["timer.active"]["new"] is True
+
+    def test_interval_listener(self, api: HuckleberryAPI, child_uid: str) -> None:
+        """Test that interval listeners deliver newly added intervals."""
+        changes: list[Any] = []
+
+        api.setup_interval_listener("diaper", child_uid, changes.extend, lookback=3600)
+        time.sleep(2)
+        changes.clear()
+
+        api.log_diaper(child_uid, mode="pee")
+        time.sleep(2)
+        api.stop_all_listeners()
+
+        added = [change for change in changes if change["type"] == "added"]
+        assert added
+        assert added[-1]["event"]["mode"] == "pee"
+        assert added[-1]["event"]["start"] >= time.time() - 60
+
+    def test_interval_listener_multi_entry(self, api: HuckleberryAPI, child_uid: str) -> None:
+        """Test that interval listeners deliver the recent entries of multi-entry documents."""
+        changes: list[Any] = []
+        now = time.time()
+        doc_ref = api._intervals_ref("diaper", child_uid).document(f"test-multi-{int(now)}")
+
+        api.setup_interval_listener("diaper", child_uid, changes.extend, lookback=3600)
+        time.sleep(2)
+        changes.clear()
+
+        try:
+            doc_ref.set({
+                "multi": True,
+                "lastUpdated": now,
+                "data": {
+                    "recent": {"start": now - 60, "mode": "pee", "offset": 0},
+                    "old": {"start": now - 7200, "mode": "poo", "offset": 0},
+                },
+            })
+            time.sleep(2)
+        finally:
+            doc_ref.delete()
+            api.stop_all_listeners()
+
+        added = [change for change in changes if change["type"] == "added" and change["id"] == doc_ref.id]
+        assert [change["event"]["mode"] for change in added] == ["pee"]
+
+    def test_reopened_listener_skips_unchanged_snapshot(self, api: HuckleberryAPI, child_uid: str) -> None:
+        """Test that re-opening a watch does not deliver the unchanged document again."""
+        updates: list[Any] = []
+
+        api.setup_feed_listener(child_uid, updates.append)
+        time.sleep(2)
+        assert len(updates) == 1
+
+        # Re-open the watch the way listener recovery does
+        api._watch_document("feed", child_uid, updates.append)
+        time.sleep(2)
+        assert len(updates) == 1
+
+        api.start_feeding(child_uid, side="left")
+        time.sleep(2)
+        api.cancel_feeding(child_uid)
+        api.stop_all_listeners()
+
+        assert len(updates) >= 2
+        assert updates[1]["timer"]["active"] is True
+
+    def test_watchdog_restarts_dead_watch(self, api: HuckleberryAPI, child_uid: str) -> None:
+        """Test that the watchdog re-opens only the watch that died."""
+        updates: list[Any] = []
+
+        api.setup_realtime_listener(child_uid, updates.append)
+        api.setup_feed_listener(child_uid, lambda data: None)
+        time.sleep(2)
+        feed_watch = api._listeners[f"feed_{child_uid}"]
+
+        api._listeners[f"sleep_{child_uid}"].close()
+        api.start_listener_watchdog(check_interval=0.5)
+        try:
+            time.sleep(3)
+            status = api.get_listener_status()
+            assert status[f"sleep_{child_uid}"]["alive"] is True
+            assert status[f"sleep_{child_uid}"]["restarts"] == 1
+            assert status[f"feed_{child_uid}"]["restarts"] == 0
+            assert api._listeners[f"feed_{child_uid}"] is feed_watch
+
+            # The restarted watch still delivers new changes
+            api.start_sleep(child_uid)
+            time.sleep(2)
+            assert updates[-1]["timer"]["active"] is True
+        finally:
+            api.stop_listener_watchdog()
+            api.cancel_sleep(child_uid)
+            api.stop_all_listeners()
+
+    def test_restart_listeners(self, api: HuckleberryAPI, child_uid: str) -> None:
+        """Test that restarting all listeners re-opens every watch without re-delivering data."""
+        updates: list[Any] = []
+
+        api.setup_realtime_listener(child_uid, updates.append)
+        api.setup_feed_listener(child_uid, updates.append)
+        api.setup_interval_listener("sleep", child_uid, updates.append)
+        time.sleep(2)
+        delivered = len(updates)
+        before = dict(api._listeners)
+
+        result = api.restart_listeners(max_concurrency=2, stagger=0.2)
+        time.sleep(2)
+
+        assert result["restarted"] == len(before)
+        assert result["failed"] == 0
+        assert result["duration_sec"] >= 0
+        assert all(api._listeners[key] is not watch for key, watch in before.items())
+        assert len(updates) == delivered
+        api.stop_all_listeners()
+
+
+class TestListenerDispatcher:
+    """Test callback dispatch off the watch threads."""
+
+    def test_coalesces_pending_updates(self) -> None:
+        """Test that only the latest pending update of a key is delivered."""
+        release = threading.Event()
+        delivered: list[Any] = []
+        dispatcher = ListenerDispatcher(max_pending=10, workers=1)
+
+        def slow(data: Any) -> None:
+            release.wait(5)
+            delivered.append(data)
+
+        try:
+            dispatcher.submit("feed_child", slow, 1)
+            time.sleep(0.2)  # Worker is now blocked delivering 1
+            for value in (2, 3, 4):
+                dispatcher.submit("feed_child", delivered.append, value)
+            assert dispatcher.stats()["pending"] == 1
+            release.set()
+        finally:
+            dispatcher.close(timeout=5)
+
+        assert delivered == [1, 4]
+        stats = dispatcher.stats()
+        assert stats["coalesced"] == 2
+        assert stats["delivered"] == 2
+
+    def test_drops_new_keys_when_full(self) -> None:
+        """Test that a full queue drops updates of new keys and counts them."""
+        release = threading.Event()
+        dispatcher = ListenerDispatcher(max_pending=1, workers=1)
+        try:
+            dispatcher.submit("sleep_a", lambda data: release.wait(5), None)
+            time.sleep(0.2)
+            assert dispatcher.submit("sleep_b", lambda data: None, None) is True
+            assert dispatcher.submit("sleep_c", lambda data: None, None) is False
+            assert dispatcher.submit("sleep_b", lambda data: None, None) is True
+            assert dispatcher.stats()["dropped"] == 1
+            release.set()
+        finally:
+            dispatcher.close(timeout=5)
+
+    def test_failing_callback_counted(self) -> None:
+        """Test that callback errors are logged and counted without stopping the worker."""
+        delivered: list[Any] = []
+        dispatcher = ListenerDispatcher()
+
+        def fail(data: Any) -> None:
+            raise ValueError("boom")
+
+        dispatcher.submit("diaper_a", fail, None)
+        dispatcher.submit("diaper_b", delivered.append, "ok")
+        dispatcher.close(timeout=5)
+
+        assert delivered == ["ok"]
+        assert dispatcher.stats()["errors"] == 1